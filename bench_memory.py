@@ -0,0 +1,150 @@
+"""
+메모리 상한 벤치마크 (v12.8)
+
+합성 리포트 N건을 수집 → 중복 제거 → 분석 → 추출 → 요약 경로로 흘려보내며
+tracemalloc으로 파이썬 힙 피크를 측정한다. 네트워크/LLM 없이 실행되며,
+본문 추출은 고정 크기 텍스트를, 요약은 짧은 지연 후 1줄 요약을 돌려주는 대역으로 바꾼다.
+
+경로:
+  - materialized: 이전 방식 (전체 목록 str()/eval() 핸드오프, 처리 중 리포트 수 제한 없음)
+  - streaming:    generator 연결 + 처리 중 리포트 수 제한 (run_backfill과 같은 구성)
+
+N을 늘려도 streaming 피크가 거의 일정하면(요약 보관분만 증가) 정상.
+
+사용 예:
+    python bench_memory.py                         # N = 200, 800, 3200
+    python bench_memory.py -n 500 -n 5000 --text-kb 64
+    python bench_memory.py --json bench_memory.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import run_daily_briefing as rdb
+
+BROKERS = ["미래에셋증권", "신한투자증권", "KB증권", "하나증권", "NH투자증권"]
+SECTORS = ["반도체", "2차전지", "자동차", "조선", "바이오", "인터넷", "건설", "화학"]
+CATEGORIES = ["종목분석", "산업분석", "투자정보", "경제분석"]
+
+
+def iter_synthetic(n: int):
+    """합성 리포트 generator (10%는 중복 행)"""
+    for i in range(n):
+        j = i - 1 if i % 10 == 9 else i
+        yield {
+            "source": "네이버",
+            "category": CATEGORIES[j % len(CATEGORIES)],
+            "title": f"{SECTORS[j % len(SECTORS)]} 업황 점검: 실적 Preview 및 목표주가 상향 #{j}",
+            "company": BROKERS[j % len(BROKERS)],
+            "date": f"2025.10.{20 + j % 5:02d}",
+            "url": f"https://finance.naver.com/research/company_read.naver?nid={80000 + j}",
+            "pdf_url": f"https://stock.pstatic.net/stock-research/company/{j}.pdf",
+        }
+
+
+def install_stand_ins(text_kb: int, llm_sec: float):
+    """본문 추출/LLM 요약 대역 (추출은 즉시, 요약은 llm_sec 지연 → LLM 대기열에 본문이 쌓이는 상황 재현)"""
+    body = "가" * (text_kb * 1024)
+
+    def fetch(self, report, level="full"):
+        return body + report["title"], "PDF"  # 리포트마다 별도 문자열
+
+    def summarize(self, report, text, source_type, idx, total, level="full"):
+        time.sleep(llm_sec)
+        return {"title": report["title"], "company": report["company"], "category": report["category"],
+                "summary": f"- 결론(View): {report['title'][:20]} - 근거: {len(text)}자"}
+
+    rdb.ReportSummarizerTool._fetch_report_text = fetch
+    rdb.ReportSummarizerTool._summarize_text = summarize
+
+
+def run_materialized(n: int) -> int:
+    """이전 방식: 전체 목록 → str → 분석/요약 (처리 중 리포트 수 제한 없음)"""
+    reports = list(iter_synthetic(n))
+    unique = list(rdb.iter_unique(eval(str(reports))))
+    rdb.PythonAnalyzerTool()._run(str(unique))
+    tool = rdb.ReportSummarizerTool()
+    summaries = [s for _, _, s in tool.iter_summaries(enumerate(unique), len(unique), window=0)]
+    return len(summaries)
+
+
+def run_streaming(n: int) -> int:
+    """generator 연결: 수집 → 중복 제거 → 날짜별 분석 누적 → 요약 (요약만 보관)"""
+    analyzers = {}
+
+    def analyzed(reports):
+        for idx, report in enumerate(reports):
+            analyzers.setdefault(report["date"], rdb.ReportAnalyzer()).add(report)
+            yield idx, report
+
+    by_day = {}
+    tool = rdb.ReportSummarizerTool()
+    for idx, report, summary in tool.iter_summaries(analyzed(rdb.iter_unique(iter_synthetic(n)))):
+        by_day.setdefault(report["date"], []).append((idx, summary))
+    return sum(len(v) for v in by_day.values())
+
+
+PATHS = {"materialized": run_materialized, "streaming": run_streaming}
+
+
+def measure(path: str, n: int) -> dict:
+    rdb.metrics.reset(run_date="bench_memory")
+    rdb.deadline.reset(0)
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = PATHS[path](n)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"path": path, "n": n, "summaries": count, "peak_kb": round(peak / 1024, 1),
+            "peak_kb_per_report": round(peak / 1024 / n, 2), "elapsed_sec": round(elapsed, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Briefing 메모리 상한 벤치마크 (tracemalloc)")
+    parser.add_argument("-n", type=int, action="append", default=[], help="리포트 수 (여러 번 지정 가능)")
+    parser.add_argument("--text-kb", type=int, default=32, help="리포트당 추출 본문 크기(KB)")
+    parser.add_argument("--llm-sec", type=float, default=0.01, help="요약 1건 지연(초)")
+    parser.add_argument("--path", choices=sorted(PATHS), action="append", default=[], help="측정할 경로")
+    parser.add_argument("--json", default="", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    sizes = args.n or [200, 800, 3200]
+    paths = args.path or ["materialized", "streaming"]
+    logging.disable(logging.CRITICAL)
+    install_stand_ins(args.text_kb, args.llm_sec)
+
+    results = []
+    # 요약 경로가 아카이브/원장/종목 사전 캐시를 작업 디렉터리에 쓰므로 임시 디렉터리에서 실행
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"{'path':<14}{'reports':>9}{'peak(KB)':>12}{'KB/report':>11}{'elapsed(s)':>12}")
+            for path in paths:
+                for n in sizes:
+                    r = measure(path, n)
+                    results.append(r)
+                    print(f"{r['path']:<14}{r['n']:>9}{r['peak_kb']:>12.1f}{r['peak_kb_per_report']:>11.2f}"
+                          f"{r['elapsed_sec']:>12.2f}")
+        finally:
+            rdb.pools.shutdown()
+            rdb.archive.close()
+            rdb.ledger.close()
+            os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "text_kb": args.text_kb, "llm_sec": args.llm_sec,
+                       "inflight_reports": rdb.INFLIGHT_REPORTS, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
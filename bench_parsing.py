@@ -0,0 +1,337 @@
+"""
+파싱/추출 핫패스 마이크로벤치마크 (v12.1)
+
+bench_corpus/ 의 고정 입력(네이버/한경 목록 HTML, 리포트 상세 HTML, 샘플 PDF)으로
+네트워크 없이 개별 함수만 반복 실행해 ops/sec, 평균 지연, 메모리 피크를 측정한다.
+
+대상:
+  - 네이버/한경 목록 페이지 행 파싱 (_parse_list_page)
+  - HTML 본문 선택자 cascade (_extract_body_text)
+  - 같은 목록/본문을 v13.8까지의 html.parser 전체 파싱으로 (*_htmlparser) vs lxml 표만 파싱/XPath (v13.9)
+  - PDF 페이지 텍스트 추출 (_pdf_bytes_to_text)
+  - 정형 필드 추출 (field_extractor.extract: 투자의견/목표주가/EPS)
+  - 추출 요약 (presummarizer.condense: 면책 문구 제거 + 문장 순위화 + 토큰 예산)
+  - 키워드 분석 (PythonAnalyzerTool._run)
+  - URL 차단/오류 페이지/광고/키워드 제외 규칙: 호출마다 패턴 목록 순회(v13.7까지) vs 컴파일된 rules (v13.8)
+  - 단계 간 str()/eval() 핸드오프
+
+사용 예:
+    python bench_parsing.py                     # 전체 실행
+    python bench_parsing.py -k naver -k html    # 이름에 naver 또는 html 포함된 벤치만
+    python bench_parsing.py --min-time 1.0 --json bench_parsing.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import run_daily_briefing as rdb
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_corpus")
+NAVER_DATES = ["2025.10.27", "25.10.27"]
+HANKYUNG_DATES = ["2025.10.27", "25.10.27"]
+
+
+def _read(name: str, mode: str = "r"):
+    path = os.path.join(CORPUS_DIR, name)
+    if "b" in mode:
+        with open(path, "rb") as f:
+            return f.read()
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _synthetic_reports(n: int = 300) -> list:
+    """키워드 분석/핸드오프용 합성 리포트 (제목 패턴은 실제 목록과 유사)"""
+    sectors = ["반도체", "2차전지", "자동차", "조선", "바이오", "인터넷", "건설", "화학"]
+    brokers = ["미래에셋증권", "신한투자증권", "KB증권", "하나증권", "NH투자증권"]
+    categories = ["종목분석", "산업분석", "투자정보", "경제분석"]
+    reports = []
+    for i in range(n):
+        sector = sectors[i % len(sectors)]
+        reports.append({
+            "source": "네이버" if i % 3 else "한경컨센서스",
+            "category": categories[i % len(categories)],
+            "title": f"{sector} 업황 점검: 3Q25 실적 Preview 및 목표주가 상향 #{i}",
+            "company": brokers[i % len(brokers)],
+            "date": "2025.10.27",
+            "url": f"https://finance.naver.com/research/company_read.naver?nid={80000 + i}",
+            "pdf_url": f"https://stock.pstatic.net/stock-research/company/{i}.pdf" if i % 4 else None,
+        })
+    return reports
+
+
+# ----------------------------------------------------------
+# 📋 벤치마크 등록
+# ----------------------------------------------------------
+BENCHMARKS = {}
+
+
+def bench(name: str):
+    """setup 함수를 등록 (setup은 반복 실행할 무인자 callable을 반환)"""
+    def deco(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return deco
+
+
+@bench("naver_parse_company_list")
+def _naver_company():
+    tool = rdb.NaverResearchScraperTool()
+    html = _read("naver_company_list.html")
+    return lambda: tool._parse_list_page(html, "종목분석", dates=NAVER_DATES)
+
+
+@bench("naver_parse_invest_list")
+def _naver_invest():
+    tool = rdb.NaverResearchScraperTool()
+    html = _read("naver_invest_list.html")
+    return lambda: tool._parse_list_page(html, "투자정보", dates=NAVER_DATES)
+
+
+@bench("hankyung_parse_list")
+def _hankyung():
+    tool = rdb.HankyungScraperTool()
+    html = _read("hankyung_list.html")
+    return lambda: tool._parse_list_page(html, dates=HANKYUNG_DATES)
+
+
+@bench("html_body_naver")
+def _html_naver():
+    tool = rdb.ReportSummarizerTool()
+    html = _read("read_naver.html")
+    return lambda: tool._extract_body_text(html, company="미래에셋증권")
+
+
+@bench("html_body_fallback")
+def _html_fallback():
+    tool = rdb.ReportSummarizerTool()
+    html = _read("read_shinhan.html")
+    return lambda: tool._extract_body_text(html, company="신한투자증권")
+
+
+def _with_parser(parser: str, fn):
+    """HTML_PARSER를 바꿔 실행 (v13.9 이전 경로: html.parser로 문서 전체 파싱 + BeautifulSoup 선택자)"""
+    def run():
+        saved, rdb.HTML_PARSER = rdb.HTML_PARSER, parser
+        try:
+            return fn()
+        finally:
+            rdb.HTML_PARSER = saved
+    return run
+
+
+@bench("naver_parse_company_list_htmlparser")
+def _naver_company_htmlparser():
+    return _with_parser("html.parser", _naver_company())
+
+
+@bench("hankyung_parse_list_htmlparser")
+def _hankyung_htmlparser():
+    return _with_parser("html.parser", _hankyung())
+
+
+@bench("html_body_naver_htmlparser")
+def _html_naver_htmlparser():
+    return _with_parser("html.parser", _html_naver())
+
+
+@bench("html_body_fallback_htmlparser")
+def _html_fallback_htmlparser():
+    return _with_parser("html.parser", _html_fallback())
+
+
+@bench("pdf_page_extract")
+def _pdf():
+    tool = rdb.ReportSummarizerTool()
+    pdf_bytes = _read("sample_report.pdf", "rb")
+    return lambda: tool._pdf_bytes_to_text(pdf_bytes)
+
+
+@bench("fields_extract")
+def _fields():
+    pdf_text = rdb.ReportSummarizerTool()._pdf_bytes_to_text(_read("sample_report.pdf", "rb"))
+    return lambda: rdb.field_extractor.extract(pdf_text)
+
+
+@bench("presummarize_pdf")
+def _presummarize():
+    pdf_text = rdb.ReportSummarizerTool()._pdf_bytes_to_text(_read("sample_report.pdf", "rb"))
+    rdb.count_tokens(pdf_text)  # 토크나이저 로드는 측정에서 제외
+    return lambda: rdb.presummarizer.condense(pdf_text)
+
+
+@bench("analyzer_keywords")
+def _analyzer():
+    tool = rdb.PythonAnalyzerTool()
+    reports_str = str(_synthetic_reports())
+    return lambda: tool._run(reports_str)
+
+
+def _rule_inputs() -> tuple:
+    """규칙 벤치 입력: 목록 페이지 링크, PDF URL, 상세 페이지 본문, 제목 단어"""
+    import re
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(_read("naver_company_list.html") + _read("naver_invest_list.html"), "html.parser")
+    hrefs = [a.get("href", "") for a in soup.find_all("a")]
+    reports = _synthetic_reports()
+    pdf_urls = [r["pdf_url"] for r in reports if r["pdf_url"]] + [r["url"] for r in reports]
+    body = re.sub(r"\s+", " ", BeautifulSoup(_read("read_naver.html"), "html.parser").get_text(" "))
+    texts = [body[:3500], body[:400], body[:200]]
+    words = [w for r in reports for w in rdb.ReportAnalyzer.WORD_PATTERN.findall(r["title"])]
+    return hrefs, pdf_urls, texts, words
+
+
+@bench("rules_loops")
+def _rules_loops():
+    """v13.7까지의 방식: 호출/행마다 패턴 목록을 만들고 re.search로 순회"""
+    import re
+    hrefs, pdf_urls, texts, words = _rule_inputs()
+    date_pattern = re.compile(r"(\d{1,2}월|\d{1,2}일|20\d{2}|\d{2}\.\d{2}|\d{4}\.\d{2}\.\d{2})")
+    number_pattern = re.compile(r'^\d+$')
+
+    def run():
+        for href in hrefs:
+            excluded_patterns = ["/chart/", "/quote/", "/news/"]
+            excluded_patterns.append("/item/")
+            excluded_patterns.append("/frgn/")
+            any(pattern in href for pattern in excluded_patterns)
+        for url in pdf_urls:
+            valid = [r'stock\.pstatic\.net/stock-research/.*\.pdf', r'pstatic\.net/stock-research/.*\.pdf']
+            any(re.search(p, url) for p in valid)
+            for pattern in [r'/(item|chart|quote|news|frgn)/', r'finance\.naver\.com/item/', r'\.frgn\.naver',
+                            r'/item/frgn']:
+                if re.search(pattern, url, re.I):
+                    break
+        for text in texts:
+            for pattern in [r"방문하시려는 페이지의 주소가 잘못", r"페이지의 주소가 변경", r"삭제되었거나",
+                            r"네이버 :: 세상의 모든 지식"]:
+                if re.search(pattern, text, re.IGNORECASE):
+                    break
+            for pattern in [r"네이버 주식거래연결.*빠른 주문.*도와드립니다", r"^.{0,100}주석.*결론.*참고.*$"]:
+                if re.findall(pattern, text, re.IGNORECASE | re.DOTALL) and len(text) < 500:
+                    break
+        for w in words:
+            date_pattern.search(w) or number_pattern.match(w)
+    return run
+
+
+@bench("rules_compiled")
+def _rules_compiled():
+    """v13.8: EXTRACTION_RULES 그룹별 alternation 1개 + URL/단어 memo"""
+    hrefs, pdf_urls, texts, words = _rule_inputs()
+    rules = rdb.rules
+
+    def run():
+        for href in hrefs:
+            rules.match("list_url_block", href) or rules.match("list_url_block_stock", href)
+        for url in pdf_urls:
+            rdb.source_for_pdf(url)
+            rules.match("pdf_blocked", url)
+        for text in texts:
+            rules.match("html_error", text)
+            len(text) < 500 and rules.match("html_ad", text)
+        for w in words:
+            rules.match("keyword_exclude", w)
+    return run
+
+
+@bench("handoff_str")
+def _handoff_str():
+    reports = _synthetic_reports()
+    return lambda: str(reports)
+
+
+@bench("handoff_eval")
+def _handoff_eval():
+    reports_str = str(_synthetic_reports())
+    return lambda: eval(reports_str)
+
+
+# ----------------------------------------------------------
+# ⏱️ 실행기
+# ----------------------------------------------------------
+class _NoSleepTime:
+    """run_daily_briefing 모듈의 time.sleep 생략 (PDF 임시 파일 핸들 대기 등이 측정에 섞이지 않도록)"""
+
+    def sleep(self, seconds):
+        pass
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def run_one(name: str, fn, min_time: float) -> dict:
+    """warm-up 1회 → 반복 횟수 자동 결정(min_time 이상) → tracemalloc 1회로 메모리 피크 측정"""
+    fn()
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        # 측정 시간이 짧으면 목표 시간에 맞춰 반복 횟수 확대 (최소 2배)
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.1))
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean = elapsed / loops
+    return {
+        "name": name,
+        "loops": loops,
+        "mean_ms": round(mean * 1000, 3),
+        "ops_per_sec": round(1 / mean, 1) if mean else 0.0,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Briefing 파싱/추출 마이크로벤치마크")
+    parser.add_argument("-k", action="append", default=[], help="이름 부분 일치 필터 (여러 번 지정 가능)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="벤치마크별 최소 측정 시간(초)")
+    parser.add_argument("--json", default="", help="결과 JSON 저장 경로")
+    parser.add_argument("--list", action="store_true", help="벤치마크 목록만 출력")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHMARKS if not args.k or any(k in n for k in args.k)]
+    if args.list:
+        print("\n".join(names))
+        return
+    if not names:
+        print(f"[WARN] 일치하는 벤치마크 없음: {args.k}")
+        sys.exit(1)
+
+    rdb.time = _NoSleepTime()
+    logging.disable(logging.CRITICAL)  # 핫패스 내 로그 포맷팅이 측정에 섞이지 않도록
+    results = []
+    # PDF 추출은 작업 디렉터리에 임시 파일을 쓰므로 임시 디렉터리에서 실행
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            print(f"{'benchmark':<36}{'loops':>8}{'mean(ms)':>12}{'ops/sec':>12}{'peak(KB)':>12}")
+            for name in names:
+                r = run_one(name, BENCHMARKS[name](), args.min_time)
+                results.append(r)
+                print(f"{r['name']:<36}{r['loops']:>8}{r['mean_ms']:>12.3f}{r['ops_per_sec']:>12.1f}{r['peak_kb']:>12.1f}")
+        finally:
+            os.chdir(cwd)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "min_time": args.min_time, "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"\n[OK] 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+"""
+전체 파이프라인 기록/재생 벤치마크 하네스 (v12.0)
+
+1) record : 실제 네이버/한경 응답(목록, 상세, PDF, iframe HTML)을 fixture 아카이브에 저장
+            (OpenAI/Notion은 가짜 서버 사용 → 비용/업로드 없음)
+2) replay : 저장된 아카이브를 로컬 HTTP stand-in으로 재생하고, 가짜 OpenAI(지연/429 주입)와
+            가짜 Notion 서버로 run_daily_briefing()을 오프라인 전체 실행 → 단계별 지연/처리량 측정
+3) compare: 두 replay 결과(JSON)를 단계별로 비교 (커밋 간 성능 비교용)
+
+사용 예:
+    python bench_replay.py record --fixtures replay_fixtures/2025-10-27
+    python bench_replay.py replay --fixtures replay_fixtures/2025-10-27 --llm-latency 0.4 --llm-429-rate 0.05 --result before.json
+    python bench_replay.py compare before.json after.json
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+import requests
+
+_original_request = requests.sessions.Session.request
+
+
+# ----------------------------------------------------------
+# 📦 Fixture 아카이브
+# ----------------------------------------------------------
+class FixtureArchive:
+    """index.json + bodies/<sha1>.bin 구조의 응답 아카이브 (본문은 해시로 중복 제거)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.http = {}     # "METHOD url" → {status, headers, body} 또는 {error}
+        self.browser = {}  # url → {current_url, title, body, frames}
+        self.meta = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        with open(self.index_path, encoding="utf-8") as f:
+            data = json.load(f)
+        self.meta = data.get("meta", {})
+        self.http = data.get("http", {})
+        self.browser = data.get("browser", {})
+        return self
+
+    def save(self):
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            data = {"meta": self.meta, "http": self.http, "browser": self.browser}
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+    def put_body(self, body: bytes) -> str:
+        digest = hashlib.sha1(body).hexdigest()
+        path = os.path.join(self.root, "bodies", digest + ".bin")
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+        return digest
+
+    def get_body(self, digest: str) -> bytes:
+        with open(os.path.join(self.root, "bodies", digest + ".bin"), "rb") as f:
+            return f.read()
+
+    def record_http(self, method: str, url: str, entry: dict):
+        with self._lock:
+            self.http[f"{method.upper()} {url}"] = entry
+
+    def record_browser(self, url: str, entry: dict):
+        with self._lock:
+            self.browser[url] = entry
+
+
+# ----------------------------------------------------------
+# ⏺ 기록 모드: requests + Selenium 가로채기
+# ----------------------------------------------------------
+def _is_local(url: str) -> bool:
+    host = urlparse(url).hostname or ""
+    return host in ("127.0.0.1", "localhost")
+
+
+def install_recorder(archive: FixtureArchive):
+    """requests.Session.request를 감싸 소스 사이트 응답을 아카이브에 저장"""
+
+    def recording_request(self, method, url, *args, **kwargs):
+        if _is_local(url):
+            return _original_request(self, method, url, *args, **kwargs)
+        try:
+            res = _original_request(self, method, url, *args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            archive.record_http(method, url, {"error": type(e).__name__})
+            raise
+        body = res.content  # stream=True여도 여기서 전체 본문 수신
+        headers = {k: v for k, v in res.headers.items()
+                   if k.lower() in ("content-type", "etag", "last-modified", "cache-control")}
+        archive.record_http(method, url, {"status": res.status_code, "headers": headers,
+                                          "body": archive.put_body(body)})
+        return res
+
+    requests.sessions.Session.request = recording_request
+
+
+class RecordingDriver:
+    """실제 WebDriver를 감싸 페이지 이탈(get/back/quit) 직전에 문서와 iframe 트리를 저장"""
+
+    def __init__(self, driver, archive: FixtureArchive):
+        self._driver = driver
+        self._archive = archive
+        self._requested_url = None
+
+    def __getattr__(self, name):
+        return getattr(self._driver, name)
+
+    def _capture_frames(self, depth: int = 0) -> list:
+        frames = []
+        if depth > 1:
+            return frames
+        try:
+            elements = self._driver.find_elements("tag name", "iframe")
+        except Exception:
+            return frames
+        for el in elements:
+            try:
+                src = el.get_attribute("src")
+                self._driver.switch_to.frame(el)
+                html = self._driver.page_source
+                inner = self._capture_frames(depth + 1)
+                self._driver.switch_to.parent_frame()
+                frames.append({"src": src, "body": self._archive.put_body(html.encode("utf-8")),
+                               "frames": inner})
+            except Exception:
+                try:
+                    self._driver.switch_to.parent_frame()
+                except Exception:
+                    pass
+        return frames
+
+    def _snapshot(self):
+        if not self._requested_url:
+            return
+        try:
+            self._driver.switch_to.default_content()
+            html = self._driver.page_source
+            self._archive.record_browser(self._requested_url, {
+                "current_url": self._driver.current_url,
+                "title": self._driver.title,
+                "body": self._archive.put_body(html.encode("utf-8")),
+                "frames": self._capture_frames(),
+            })
+        except Exception as e:
+            print(f"[RECORD] 브라우저 스냅샷 실패: {e}")
+
+    def get(self, url):
+        self._snapshot()
+        self._requested_url = url
+        return self._driver.get(url)
+
+    def back(self):
+        self._snapshot()
+        self._requested_url = None
+        return self._driver.back()
+
+    def quit(self):
+        self._snapshot()
+        self._requested_url = None
+        return self._driver.quit()
+
+
+# ----------------------------------------------------------
+# ▶ 재생 모드: 로컬 stand-in + 가짜 WebDriver
+# ----------------------------------------------------------
+class _QuietHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def make_standin_handler(archive: FixtureArchive):
+    """/http?m=GET&u=<원본 URL> → 기록된 응답, /browser?u=<원본 URL> → 기록된 문서 JSON"""
+
+    class StandinHandler(_QuietHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            qs = parse_qs(parsed.query)
+            url = qs.get("u", [""])[0]
+            if parsed.path == "/http":
+                entry = archive.http.get(f"{qs.get('m', ['GET'])[0]} {url}")
+                if entry is None:
+                    return self._send(404, b"not recorded")
+                if "error" in entry:
+                    return self._send(599, b"", {"X-Replay-Error": entry["error"]})
+                return self._send(entry["status"], archive.get_body(entry["body"]), entry["headers"])
+            if parsed.path == "/browser":
+                entry = archive.browser.get(url)
+                if entry is None:
+                    return self._send(404, b"{}")
+                return self._send(200, json.dumps(_resolve_frames(archive, entry)).encode("utf-8"),
+                                  {"Content-Type": "application/json"})
+            self._send(404, b"")
+
+        do_POST = do_GET
+
+    return StandinHandler
+
+
+def _resolve_frames(archive: FixtureArchive, entry: dict) -> dict:
+    resolved = dict(entry)
+    resolved["html"] = archive.get_body(entry["body"]).decode("utf-8", errors="replace")
+    resolved["frames"] = [_resolve_frames(archive, f) for f in entry.get("frames", [])]
+    return resolved
+
+
+def install_replayer(standin_base: str):
+    """소스 사이트 요청을 로컬 stand-in으로 우회 (로컬 가짜 서버 요청은 그대로 통과)"""
+
+    def replay_request(self, method, url, *args, **kwargs):
+        if _is_local(url):
+            return _original_request(self, method, url, *args, **kwargs)
+        local = f"{standin_base}/http?m={method.upper()}&u={quote(url, safe='')}"
+        res = _original_request(self, method, local, *args, **kwargs)
+        if res.status_code == 599:
+            raise requests.exceptions.ConnectionError(f"[replay] {res.headers.get('X-Replay-Error')}: {url}")
+        return res
+
+    requests.sessions.Session.request = replay_request
+
+
+class _FakeElement:
+    def __init__(self, frame: dict):
+        self.frame = frame
+
+    def get_attribute(self, name):
+        return self.frame.get("src") if name == "src" else None
+
+
+class _FakeSwitchTo:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def frame(self, element):
+        self._driver._frame_stack.append(element.frame)
+
+    def parent_frame(self):
+        if self._driver._frame_stack:
+            self._driver._frame_stack.pop()
+
+    def default_content(self):
+        self._driver._frame_stack.clear()
+
+
+class FakeDriver:
+    """기록된 문서를 stand-in에서 받아 Selenium WebDriver처럼 동작"""
+
+    def __init__(self, standin_base: str):
+        self._base = standin_base
+        self._doc = {"html": "<html></html>", "title": "", "current_url": "about:blank", "frames": []}
+        self._history = []
+        self._frame_stack = []
+        self.switch_to = _FakeSwitchTo(self)
+
+    def _current(self) -> dict:
+        return self._frame_stack[-1] if self._frame_stack else self._doc
+
+    def get(self, url):
+        res = _original_request(requests.Session(), "GET", f"{self._base}/browser?u={quote(url, safe='')}")
+        doc = res.json() if res.status_code == 200 else {}
+        self._history.append(self._doc)
+        self._frame_stack.clear()
+        self._doc = {"html": doc.get("html", "<html><title>404 Not Found</title></html>"),
+                     "title": doc.get("title", ""), "current_url": doc.get("current_url", url),
+                     "frames": doc.get("frames", [])}
+
+    def back(self):
+        if self._history:
+            self._doc = self._history.pop()
+        self._frame_stack.clear()
+
+    @property
+    def page_source(self):
+        return self._current()["html"]
+
+    @property
+    def title(self):
+        return self._doc["title"]
+
+    @property
+    def current_url(self):
+        return self._doc["current_url"]
+
+    def find_elements(self, by=None, value=None):
+        if value and "frame" in str(value).lower():
+            return [_FakeElement(f) for f in self._current().get("frames", [])]
+        return []
+
+    def implicitly_wait(self, seconds):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        return {}
+
+    def quit(self):
+        pass
+
+
+# ----------------------------------------------------------
+# 🤖 가짜 OpenAI / Notion 서버
+# ----------------------------------------------------------
+class FakeApiState:
+    def __init__(self, latency: float, rate_429: float, seed: int):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.throttled = 0
+        self.pages = 0
+
+    def should_throttle(self) -> bool:
+        with self._lock:
+            self.calls += 1
+            hit = self._rng.random() < self.rate_429
+            self.throttled += hit
+            return hit
+
+
+def make_fake_api_handler(state: FakeApiState):
+    """POST /v1/chat/completions (가짜 OpenAI), POST /v1/pages (가짜 Notion)"""
+
+    class FakeApiHandler(_QuietHandler):
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path.endswith("/chat/completions"):
+                return self._chat(payload)
+            if self.path.endswith("/pages"):
+                with state._lock:
+                    state.pages += 1
+                    page_no = state.pages
+                return self._send(200, json.dumps({"object": "page", "id": f"replay-page-{page_no}"}).encode(),
+                                  {"Content-Type": "application/json"})
+            self._send(404, b"{}")
+
+        def _chat(self, payload: dict):
+            if state.should_throttle():
+                body = {"error": {"message": "Rate limit reached (replay)", "type": "requests",
+                                  "code": "rate_limit_exceeded"}}
+                return self._send(429, json.dumps(body).encode(),
+                                  {"Content-Type": "application/json", "retry-after-ms": "50"})
+            time.sleep(state.latency)
+            prompt = "".join(m.get("content", "") for m in payload.get("messages", []))
+            digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+            content = f"- 결론(View): [replay {digest}] - 근거: 재생 벤치마크용 고정 응답"
+            prompt_tokens = max(1, len(prompt) // 2)
+            completion_tokens = len(content) // 2
+            body = {
+                "id": f"chatcmpl-replay-{digest}", "object": "chat.completion", "created": int(time.time()),
+                "model": payload.get("model", "replay"),
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                          "total_tokens": prompt_tokens + completion_tokens},
+            }
+            self._send(200, json.dumps(body, ensure_ascii=False).encode("utf-8"),
+                       {"Content-Type": "application/json"})
+
+    return FakeApiHandler
+
+
+def start_server(handler_cls) -> tuple:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler_cls)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class _ScaledTime:
+    """run_daily_briefing 모듈의 time.sleep만 배율 조정 (실사이트용 대기 시간 제거)"""
+
+    def __init__(self, scale: float):
+        self._scale = scale
+
+    def sleep(self, seconds):
+        if self._scale > 0:
+            time.sleep(seconds * self._scale)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def _import_pipeline(api_base: str, mode: str):
+    """가짜 API 주소를 환경 변수로 지정한 뒤 파이프라인 모듈 import"""
+    os.environ["OPENAI_BASE_URL"] = f"{api_base}/v1"
+    os.environ["OPENAI_API_KEY"] = os.environ.get("BENCH_OPENAI_API_KEY", "replay")
+    os.environ["NOTION_API_BASE"] = f"{api_base}/v1"
+    os.environ["NOTION_API_KEY"] = "replay"
+    os.environ["NOTION_DATABASE_ID"] = "replay"
+    if mode:
+        os.environ["BRIEFING_PIPELINE_MODE"] = mode
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import run_daily_briefing
+    return run_daily_briefing
+
+
+def _recorded_run_date(meta: dict) -> dict:
+    """기록 당일 날짜로 실행 날짜 고정 (다른 날 재생해도 동일 리포트 처리) → run_daily_briefing() 인자"""
+    if not meta.get("run_date"):
+        return {}
+    return {"run_date": datetime.strptime(meta["run_date"], "%Y-%m-%d"), "dates": meta["target_dates"]}
+
+
+# ----------------------------------------------------------
+# 🚀 명령
+# ----------------------------------------------------------
+def cmd_record(args):
+    archive = FixtureArchive(args.fixtures)
+    state = FakeApiState(latency=0.0, rate_429=0.0, seed=0)
+    api_server, api_base = start_server(make_fake_api_handler(state))
+    rdb = _import_pipeline(api_base, args.mode)
+
+    install_recorder(archive)
+    real_factory = rdb.create_selenium_driver
+    rdb.create_selenium_driver = lambda *a, **kw: RecordingDriver(real_factory(*a, **kw), archive)
+    now = datetime.now()
+    archive.meta = {"run_date": now.strftime("%Y-%m-%d"), "today_display": now.strftime("%Y.%m.%d"),
+                    "target_dates": rdb.resolve_target_dates(now), "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+    workdir = tempfile.mkdtemp(prefix="briefing_record_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        rdb.run_daily_briefing(**_recorded_run_date(archive.meta))
+    finally:
+        os.chdir(cwd)
+        archive.save()
+        api_server.shutdown()
+    print(f"\n[RECORD] HTTP {len(archive.http)}건, 브라우저 문서 {len(archive.browser)}건 → {args.fixtures}")
+
+
+def cmd_replay(args):
+    archive = FixtureArchive(args.fixtures).load()
+    standin, standin_base = start_server(make_standin_handler(archive))
+    state = FakeApiState(latency=args.llm_latency, rate_429=args.llm_429_rate, seed=args.seed)
+    api_server, api_base = start_server(make_fake_api_handler(state))
+    rdb = _import_pipeline(api_base, args.mode)
+
+    install_replayer(standin_base)
+    rdb.create_selenium_driver = lambda *a, **kw: FakeDriver(standin_base)
+    rdb.time = _ScaledTime(args.sleep_scale)
+
+    # 캐시/디버그 파일이 이전 실행 결과에 영향을 주지 않도록 임시 작업 디렉터리에서 실행
+    workdir = tempfile.mkdtemp(prefix="briefing_replay_")
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    start = time.perf_counter()
+    try:
+        rdb.run_daily_briefing(**_recorded_run_date(archive.meta))
+    finally:
+        os.chdir(cwd)
+        standin.shutdown()
+        api_server.shutdown()
+    elapsed = time.perf_counter() - start
+
+    data = rdb.metrics.to_dict()
+    n_reports = len(data.get("reports", {}))
+    result = {
+        "fixtures": args.fixtures, "mode": rdb.PIPELINE_MODE, "elapsed_sec": round(elapsed, 3),
+        "reports": n_reports, "reports_per_min": round(n_reports / elapsed * 60, 2) if elapsed else 0,
+        "llm": {"latency": args.llm_latency, "rate_429": args.llm_429_rate,
+                "calls": state.calls, "throttled": state.throttled},
+        "stages": data.get("stages", {}), "tokens": data.get("tokens", {}), "failures": data.get("failures", {}),
+        "deadline": data.get("deadline", {}),
+    }
+    with open(args.result, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\n[REPLAY] {n_reports}건 / {elapsed:.2f}초 ({result['reports_per_min']} reports/min), "
+          f"LLM 호출 {state.calls}회 (429 {state.throttled}회) → {args.result}")
+
+
+def cmd_compare(args):
+    with open(args.base, encoding="utf-8") as f:
+        base = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+
+    def delta(a, b):
+        return f"{(b - a) / a * 100:+.1f}%" if a else "n/a"
+
+    print(f"{'항목':<26}{'base':>10}{'new':>10}{'변화':>10}")
+    print(f"{'elapsed_sec':<26}{base['elapsed_sec']:>10.2f}{new['elapsed_sec']:>10.2f}"
+          f"{delta(base['elapsed_sec'], new['elapsed_sec']):>10}")
+    print(f"{'reports_per_min':<26}{base['reports_per_min']:>10.2f}{new['reports_per_min']:>10.2f}"
+          f"{delta(base['reports_per_min'], new['reports_per_min']):>10}")
+    for stage in sorted(set(base["stages"]) | set(new["stages"])):
+        a = base["stages"].get(stage, {}).get("total_sec", 0.0)
+        b = new["stages"].get(stage, {}).get("total_sec", 0.0)
+        print(f"{stage:<26}{a:>10.2f}{b:>10.2f}{delta(a, b):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Briefing 기록/재생 벤치마크")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="실제 소스 사이트 응답을 fixture 아카이브로 기록")
+    rec.add_argument("--fixtures", required=True, help="아카이브 디렉터리")
+    rec.add_argument("--mode", default="", help="BRIEFING_PIPELINE_MODE (batch/streaming)")
+    rec.set_defaults(func=cmd_record)
+
+    rep = sub.add_parser("replay", help="기록된 아카이브로 전체 파이프라인 오프라인 실행")
+    rep.add_argument("--fixtures", required=True, help="아카이브 디렉터리")
+    rep.add_argument("--mode", default="", help="BRIEFING_PIPELINE_MODE (batch/streaming)")
+    rep.add_argument("--llm-latency", type=float, default=0.5, help="가짜 OpenAI 응답 지연(초)")
+    rep.add_argument("--llm-429-rate", type=float, default=0.0, help="가짜 OpenAI 429 주입 비율 (0~1)")
+    rep.add_argument("--sleep-scale", type=float, default=0.0, help="파이프라인 내 time.sleep 배율 (0: 생략)")
+    rep.add_argument("--seed", type=int, default=42, help="429 주입 난수 시드")
+    rep.add_argument("--result", default="replay_result.json", help="결과 JSON 경로")
+    rep.set_defaults(func=cmd_replay)
+
+    cmp_ = sub.add_parser("compare", help="두 replay 결과 비교")
+    cmp_.add_argument("base")
+    cmp_.add_argument("new")
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+시작(import) 시간 벤치마크 (v12.2)
+
+새 인터프리터에서 `python -X importtime -c "import run_daily_briefing"`를 반복 실행해
+모듈 import 누적 시간과 가장 오래 걸린 하위 import, 무거운 모듈(fitz/pandas/openai/crewai/
+selenium/webdriver_manager)이 import 시점에 로드되는지 확인한다.
+
+사용 예:
+    python bench_startup.py                   # 5회 측정, 중앙값 출력
+    python bench_startup.py --runs 10 --top 15
+    python bench_startup.py --json bench_startup.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+MODULE = "run_daily_briefing"
+HEAVY_MODULES = ("fitz", "pandas", "openai", "crewai", "selenium", "webdriver_manager")
+# "import time:       self [us] |  cumulative | imported package"
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_importtime(module: str) -> list:
+    """import 1회 실행 → [(self_us, cumulative_us, depth, name)]"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, encoding="utf-8", errors="replace",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import 실패:\n{proc.stderr[-2000:]}")
+    entries = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            # 패키지명 앞 공백 2칸당 1단계 (1칸은 구분자)
+            depth = (len(m.group(3)) - 1) // 2
+            entries.append((int(m.group(1)), int(m.group(2)), depth, m.group(4)))
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Daily Briefing 시작 시간 벤치마크 (-X importtime)")
+    parser.add_argument("--runs", type=int, default=5, help="측정 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 하위 import 개수")
+    parser.add_argument("--module", default=MODULE, help="측정할 모듈")
+    parser.add_argument("--json", default="", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    totals, last = [], []
+    for _ in range(max(1, args.runs)):
+        entries = run_importtime(args.module)
+        total = next((cum for _, cum, depth, name in entries if depth == 0 and name == args.module), 0)
+        totals.append(total)
+        last = entries
+
+    # 대상 모듈의 직접 하위 import (depth 1) 중 누적 시간 상위
+    children = sorted((e for e in last if e[2] == 1), key=lambda e: e[1], reverse=True)[:args.top]
+    loaded = sorted({name.split(".")[0] for _, _, _, name in last} & set(HEAVY_MODULES))
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"[STARTUP] {args.module} import: 중앙값 {median_ms:.1f}ms "
+          f"(최소 {min(totals) / 1000:.1f} / 최대 {max(totals) / 1000:.1f}ms, {len(totals)}회)")
+    print(f"\n{'하위 import':<36}{'cumulative(ms)':>16}{'self(ms)':>12}")
+    for self_us, cum_us, _, name in children:
+        print(f"{name:<36}{cum_us / 1000:>16.1f}{self_us / 1000:>12.1f}")
+    print(f"\n[STARTUP] import 시점에 로드된 무거운 모듈: {', '.join(loaded) if loaded else '없음'}")
+
+    if args.json:
+        result = {
+            "module": args.module, "runs": len(totals), "python": sys.version.split()[0],
+            "median_ms": round(median_ms, 1), "samples_ms": [round(t / 1000, 1) for t in totals],
+            "top_imports": [{"name": n, "cumulative_ms": round(c / 1000, 1), "self_ms": round(s / 1000, 1)}
+                            for s, c, _, n in children],
+            "heavy_modules_loaded": loaded,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"[OK] 결과 저장: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 # ==========================================================
-# CrewAI Daily Briefing v11.6 (통합 개선 안정화 버전 - 결론/근거 구조 명확화)
+# CrewAI Daily Briefing v14.1 (통합 개선 안정화 버전 - 처리 원장/증분 실행)
 # Phase 1 (긴급): PDF 필터 강화, 신한투자 HTML 검증, 인코딩 수정
 # Phase 2 (구조): Mobile UA 전역화, meta refresh 추적(재시도 제한), iframe JS 처리
 # Phase 3 (최적화): PDF 캐싱, 중복 제거, 로깅 개선
@@ -9,12 +9,45 @@
 # v11.4: 이벤트 캘린더 삭제, 투자 시사점/주목 포인트로 통합 (이벤트 정보 자연스러운 융합)
 # v11.5: 종목별 리스크/유의사항 제거, 거시 리포트 미기재 표현 최소화, 투자 시사점 종합 요약으로 변경
 # v11.6: 리포트 요약 시 결론(View)과 근거 명확히 구분, 섹터별 결론+근거 구조 추가
+# v11.7: 스트리밍 파이프라인 모드 (수집→중복제거→추출→요약 단계 중첩, bounded queue 백프레셔)
+# v11.8: 단계별/리포트별 계측 (시간, 전송 바이트, 토큰, 캐시 적중, 실패 사유) → run_metrics_<날짜>.json
+# v11.9: print → 레벨 기반 logging (단계별 logger, 리포트 컨텍스트, 실패 리포트만 상세 trace 덤프)
+# v12.0: Notion API 주소 설정화 (bench_replay.py 기록/재생 오프라인 벤치마크 지원)
+# v12.1: 목록 행 파싱/HTML 본문 선택자/PDF 페이지 추출을 메서드로 분리 (bench_parsing.py 마이크로벤치마크)
+# v12.2: 무거운 모듈 지연 import, OpenAI 클라이언트 팩토리, 실행 날짜를 실행 시점에 결정 (bench_startup.py)
+# v12.3: 마감 시간 스케줄러 (우선순위 처리, 남은 예산에 따라 full → 정적 HTML → 제목 요약 → 생략)
+# v12.4: 자원별 실행 풀 (RAM 기준 브라우저 수, 호스트별 HTTP 동시성, LLM 동시 호출, Notion 3 req/s)
+# v12.5: naver/pstatic/hankyung/openai별 AIMD 동시성 제어 (고정 워커 수/대기 시간 대체, 상태는 run_metrics에 기록)
+# v12.6: 기간 백필 (python run_daily_briefing.py backfill --from --to, 리포트당 1회 요약, 날짜별 브리핑/Notion)
+# v12.7: SQLite 작업 큐 분산 모드 (backfill --queue 코디네이터 + worker 프로세스, 임대/가시성 타임아웃/재시도)
+# v12.8: 수집/중복 제거/추출을 generator로 연결, DataFrame 대신 누적 분석기, 처리 중 리포트 수 제한 (bench_memory.py)
+# v12.9: 투자의견/목표주가/이전 목표주가/EPS/영업이익 정규식 추출 → 요약 레코드 "fields" → 최종 브리핑에 [정형] 한 줄
+# v13.0: 요약 입력 추출 요약 (면책 문구 제거, TF-IDF TextRank 문장 순위, tiktoken 토큰 예산) - 앞 2000자 절단 대체
+# v13.1: 리포트 아카이브 (SQLite: 리포트/요약/정형 필드/본문/날짜별 키워드/실행 계측 누적, archive 조회 CLI)
+# v13.2: 날짜별 키워드 색인으로 5/20일 기준 대비 급증(z-score/lift)/신규/이탈 키워드 → 최종 브리핑/Notion Top Keywords
+# v13.3: 아카이브 본문/요약 BM25 전문 검색 (한/영 토크나이저, mmap 세그먼트 파일 + 병합, search CLI)
+# v13.4: 종목×증권사 목표주가/투자의견 이력 색인 → 직전 대비 변화율/의견 변경/경과일을 [이력] 줄로 (LLM 추정 대체)
+# v13.5: KRX 종목 사전 Aho-Corasick 태깅 (제목+본문 1회 스캔) → 종목분석을 종목별로 미리 묶고 정렬해 프롬프트 구성
+# v13.6: 소스 어댑터 레지스트리 (목록 URL/행 파서/PDF whitelist·보정/본문 선택자/예의 설정) + 공용 수집 엔진, 한경 PDF 허용
+# v13.7: 도메인/증권사별 본문 선택자·fallback 적중 통계 누적 → 과거 승자 선택자 우선, 적중 없는 fallback 생략 (selectors CLI)
+# v13.8: URL 차단/404·오류/광고/키워드 제외 정규식을 EXTRACTION_RULES 한 곳에 선언 → 그룹별 alternation 1회 컴파일, URL memo, 규칙 적중 계수
+# v13.9: lxml 파서 + 목록 표/링크/meta만 파싱(SoupStrainer), 본문 선택자는 lxml XPath (BeautifulSoup 트리는 fallback 때만), 탐색당 page_source 1회
+# v14.0: 목록/상세 HTML 디스크 캐시 (ETag/Last-Modified 조건부 GET, 검증자 없으면 본문 해시) → 변경 없는 페이지는 파싱 결과 재사용
+# v14.1: 리포트 처리 원장 (SQLite: 출처+nid/URL+증권사+제목 → discovered/extracted/summarized/published/failed) + 증분 실행 (--incremental, ledger CLI)
 # ==========================================================
 import sys
 import os  # 인코딩 설정 전에 먼저 import
+import abc  # 도구/소스 어댑터 필수 메서드
 import hashlib  # Phase 3: PDF 캐싱용
 import logging  # Phase 3: 로깅 개선용
+from collections import OrderedDict, deque  # v11.9: 리포트별 trace 링 버퍼
 import json  # Phase 3: 캐시 저장용
+import queue  # v11.7: 스트리밍 파이프라인용
+import threading  # v11.7: 스트리밍 파이프라인용
+import contextvars  # v11.8: 리포트별 계측 컨텍스트
+from contextlib import contextmanager  # v11.8: 단계 타이머
+import functools  # v13.8: URL 정규화/PDF 보정 memo
+import importlib.util  # v13.9: lxml 설치 여부 확인 (import 없이)
 
 # Windows Unicode 인코딩 강제 설정 (Phase 1)
 if sys.platform == "win32":
@@ -23,22 +56,14 @@ if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
 
-import re, time, fitz, requests, pandas as pd
+import re, time, requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from collections import Counter
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from dotenv import load_dotenv
-from openai import OpenAI
-from crewai.tools import BaseTool
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from urllib.parse import urljoin  # v10.4: URL 정규화
+from urllib.parse import urljoin, urlparse  # v10.4: URL 정규화 / v12.4: 호스트별 동시성 제한
+# v12.2: fitz / pandas / openai / crewai / selenium / webdriver_manager는 사용 시점에 import (시작 시간 단축)
 
 # ----------------------------------------------------------
 # 0️⃣ 환경 설정
@@ -51,28 +76,157 @@ NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
 # 하이브리드 모델: gpt-4o-mini (압축) + gpt-5-mini (브리핑)
 LLM_SUMMARY = "gpt-4o-mini"  # 리포트 요약용 (빠르고 저렴)
 LLM_BRIEFING = os.getenv("OPENAI_MODEL_NAME", "gpt-5-mini")  # 브리핑 생성용
-client = OpenAI(api_key=OPENAI_API_KEY)
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def get_openai_client():
+    """OpenAI 클라이언트 (v12.2: 첫 LLM 호출 시 생성, 이후 재사용)"""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_client_lock:
+            if _openai_client is None:
+                from openai import OpenAI
+                _openai_client = OpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
 
 HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
                          "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36"}
+# v12.0: 재생 벤치마크(bench_replay.py)에서 가짜 Notion 서버로 교체 가능 (OpenAI는 OPENAI_BASE_URL 사용)
+NOTION_API_BASE = os.getenv("NOTION_API_BASE", "https://api.notion.com/v1")
 NOTION_HEADERS = {"Authorization": f"Bearer {NOTION_API_KEY}",
                   "Notion-Version": "2022-06-28",
                   "Content-Type": "application/json"}
 
-today_display = datetime.now().strftime("%Y.%m.%d")
-today_file = datetime.now().strftime("%Y-%m-%d")
+# v12.2: 실행 날짜는 import 시점이 아니라 run_daily_briefing() 시작 시 set_run_date()로 결정
+today_display = ""
+today_file = ""
+target_dates = []
 
 # 프로덕션 모드: 오늘 날짜만 수집
 TEST_MODE_RECENT_DAYS = False  # True: 최근 3일 (테스트), False: 오늘만 (프로덕션)
-if TEST_MODE_RECENT_DAYS:
-    # 4자리 연도와 2자리 연도 둘 다 생성
-    target_dates_full = [(datetime.now() - timedelta(days=i)).strftime("%Y.%m.%d") for i in range(3)]
-    target_dates_short = [(datetime.now() - timedelta(days=i)).strftime("%y.%m.%d") for i in range(3)]
-    target_dates = target_dates_full + target_dates_short  # 둘 다 허용
-    print(f"[TEST] 최근 3일치 리포트 수집 모드: {', '.join(target_dates_full)}")
-else:
-    target_dates = [today_display, datetime.now().strftime("%y.%m.%d")]
-    print(f"[PROD] 오늘 날짜만 수집: {today_display}")
+
+def resolve_target_dates(run_date: datetime) -> list:
+    """수집 대상 날짜 목록 (4자리/2자리 연도 둘 다 허용)"""
+    if TEST_MODE_RECENT_DAYS:
+        days = [run_date - timedelta(days=i) for i in range(3)]
+        return [d.strftime("%Y.%m.%d") for d in days] + [d.strftime("%y.%m.%d") for d in days]
+    return [run_date.strftime("%Y.%m.%d"), run_date.strftime("%y.%m.%d")]
+
+def normalize_date(value: str) -> str:
+    """리포트 날짜 문자열 (25.10.27 / 2025.10.27 / 2025-10-27) → YYYY-MM-DD (인식 불가 시 "") - v12.6"""
+    m = re.match(r"^(\d{2}|\d{4})[.\-/](\d{1,2})[.\-/](\d{1,2})$", (value or "").strip())
+    if not m:
+        return ""
+    year = int(m.group(1))
+    year = year + 2000 if year < 100 else year
+    return f"{year:04d}-{int(m.group(2)):02d}-{int(m.group(3)):02d}"
+
+def days_in_range(start: datetime, end: datetime, weekdays_only: bool = True) -> list:
+    """start~end(포함) 날짜 목록 (v12.6: 백필용)"""
+    days = []
+    day = start
+    while day <= end:
+        if not weekdays_only or day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return days
+
+def set_run_date(run_date: datetime = None, dates: list = None) -> list:
+    """실행 날짜 확정 → today_display / today_file / target_dates 갱신 후 target_dates 반환"""
+    global today_display, today_file
+    run_date = run_date or datetime.now()
+    today_display = run_date.strftime("%Y.%m.%d")
+    today_file = run_date.strftime("%Y-%m-%d")
+    target_dates[:] = dates or resolve_target_dates(run_date)
+    if TEST_MODE_RECENT_DAYS:
+        print(f"[TEST] 최근 3일치 리포트 수집 모드: {', '.join(target_dates[:len(target_dates) // 2])}")
+    else:
+        print(f"[PROD] 오늘 날짜만 수집: {today_display}")
+    return target_dates
+
+# v11.7: 파이프라인 모드 (batch: 단계별 순차 실행, streaming: 단계 중첩 실행)
+PIPELINE_MODE = os.getenv("BRIEFING_PIPELINE_MODE", "batch")
+PIPELINE_QUEUE_SIZE = int(os.getenv("BRIEFING_QUEUE_SIZE", "8"))  # 단계 간 큐 크기 (백프레셔)
+EXTRACT_WORKERS = int(os.getenv("BRIEFING_EXTRACT_WORKERS", "4"))  # 본문 추출 워커 수
+SUMMARY_WORKERS = int(os.getenv("BRIEFING_SUMMARY_WORKERS", "4"))  # LLM 요약 워커 수
+
+# v12.6: 백필 (기간 지정 수집 → 리포트당 1회 요약 → 날짜별 브리핑/Notion)
+SUMMARY_CACHE_FILE = os.getenv("BRIEFING_SUMMARY_CACHE", "summary_cache.json")
+SUMMARY_CACHE_DAYS = float(os.getenv("BRIEFING_SUMMARY_CACHE_DAYS", "30"))  # 이 기간 동안 재사용 안 된 요약은 삭제 (0: 보관)
+BACKFILL_MAX_PAGES = int(os.getenv("BRIEFING_BACKFILL_MAX_PAGES", "30"))  # 카테고리별 목록 최대 페이지
+BACKFILL_DAY_WORKERS = int(os.getenv("BRIEFING_BACKFILL_DAY_WORKERS", "3"))  # 날짜별 브리핑 동시 생성 수
+
+# v12.7: 분산 작업 큐 (SQLite 파일, 여러 프로세스/공유 디렉터리의 다른 머신에서 worker 실행)
+QUEUE_VISIBILITY_SEC = float(os.getenv("BRIEFING_QUEUE_VISIBILITY_SEC", "600"))  # 임대 만료 → 다른 worker가 재처리
+QUEUE_MAX_ATTEMPTS = int(os.getenv("BRIEFING_QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_SEC = float(os.getenv("BRIEFING_QUEUE_POLL_SEC", "1.0"))
+ENQUEUE_BATCH = 200  # v12.8: 코디네이터가 한 트랜잭션에 등록할 작업 수
+
+# v13.1: 리포트 아카이브 (SQLite 파일, 빈 값이면 비활성)
+ARCHIVE_PATH = os.getenv("BRIEFING_ARCHIVE", "briefing_archive.db")
+ARCHIVE_TEXT = os.getenv("BRIEFING_ARCHIVE_TEXT", "1") != "0"  # 추출 본문도 저장 (zlib 압축)
+ARCHIVE_BATCH = 100  # 한 트랜잭션에 기록할 리포트 수
+# v14.1: 리포트 처리 원장 (빈 값이면 비활성) + 증분 실행 (새/실패 리포트만 처리, 기존 요약과 병합)
+LEDGER_PATH = os.getenv("BRIEFING_LEDGER", "report_ledger.db")
+INCREMENTAL = os.getenv("BRIEFING_INCREMENTAL", "0") == "1"
+LEDGER_MAX_ATTEMPTS = int(os.getenv("BRIEFING_LEDGER_MAX_ATTEMPTS", "3"))  # 실패 리포트 재시도 상한
+# v13.2: 키워드 추세 (아카이브의 날짜별 키워드 색인 기준, 짧은/긴 기준 기간은 직전 리포트 발행일 수)
+TREND_SHORT_DAYS, TREND_LONG_DAYS = (int(x) for x in os.getenv("BRIEFING_TREND_WINDOWS", "5,20").split(","))
+TREND_MIN_DAYS = int(os.getenv("BRIEFING_TREND_MIN_DAYS", "3"))  # 기준 날짜가 이보다 적으면 추세 생략
+TREND_Z = float(os.getenv("BRIEFING_TREND_Z", "2.0"))  # 급증 판정 z-score
+# v13.3: 전문 검색 색인 디렉터리 (빈 값이면 비활성, 아카이브가 꺼져 있으면 색인할 데이터 없음)
+SEARCH_INDEX_DIR = os.getenv("BRIEFING_SEARCH_INDEX", "search_index")
+SEARCH_MAX_SEGMENTS = int(os.getenv("BRIEFING_SEARCH_MAX_SEGMENTS", "8"))  # 넘으면 작은 세그먼트부터 병합
+# v13.5: 종목 사전 (CSV: 종목코드,종목명,별칭|별칭) + 컴파일된 Aho-Corasick 자동자 캐시
+ENTITY_FILE = os.getenv("BRIEFING_ENTITY_FILE", "krx_entities.csv")
+ENTITY_CACHE = os.getenv("BRIEFING_ENTITY_CACHE", "entity_automaton.pkl")
+ENTITY_SCAN_CHARS = 3000  # 본문에서 종목을 찾는 앞부분 길이
+# 일반 명사와 같은 종목명 (사전 매칭에서 제외, 네이버 종목 링크로 받은 종목코드는 그대로 사용)
+ENTITY_STOPWORDS = os.getenv("BRIEFING_ENTITY_STOPWORDS",
+                             "대상,전방,동방,태양,국보,세방,한창,선진,신원,우진,진도,삼일,대창,유유")
+# v13.6: 수집할 소스 어댑터 (등록 이름, 쉼표 구분 - 순서대로 수집)
+SOURCES = [s.strip() for s in os.getenv("BRIEFING_SOURCES", "naver,hankyung").split(",") if s.strip()]
+# v13.7: 본문 선택자 적중 통계 (도메인/증권사별, 빈 값이면 저장 안 함)
+SELECTOR_STATS_FILE = os.getenv("BRIEFING_SELECTOR_STATS", "selector_stats.json")
+SELECTOR_FAST = 5  # 빠르게 시도할 앞쪽 선택자 수 (과거 승자가 앞으로 정렬됨)
+SELECTOR_SKIP_TRIES = int(os.getenv("BRIEFING_SELECTOR_SKIP_TRIES", "20"))  # 이만큼 시도해 적중 0이면 fallback 단계 생략
+SELECTOR_PROBE_EVERY = 10  # 생략 중인 fallback 단계도 이 횟수마다 한 번은 재시도
+# v13.9: HTML 파서 (lxml 설치 시 기본 lxml - 본문 선택자는 lxml XPath 빠른 경로, 그 외 html.parser)
+HTML_PARSER = os.getenv("BRIEFING_HTML_PARSER") or ("lxml" if importlib.util.find_spec("lxml") else "html.parser")
+# v14.0: 목록/상세 HTML 조건부 GET 캐시 디렉터리 (빈 값이면 비활성) + 이 일수 동안 확인 안 한 URL은 삭제 (0: 삭제 안 함)
+HTTP_CACHE_DIR = os.getenv("BRIEFING_HTTP_CACHE", "http_cache")
+HTTP_CACHE_DAYS = float(os.getenv("BRIEFING_HTTP_CACHE_DAYS", "14"))
+
+# v12.3: 마감 시간 (실행 시작부터 초, 0: 무제한) - 브리핑/Notion 업로드 몫은 RESERVE로 남겨둠
+DEADLINE_SEC = float(os.getenv("BRIEFING_DEADLINE_SEC", "2400"))
+DEADLINE_RESERVE_SEC = float(os.getenv("BRIEFING_DEADLINE_RESERVE_SEC", "300"))
+
+# v12.4: 자원별 실행 풀 (브라우저 / 호스트별 HTTP / LLM / Notion)
+BROWSER_SLOTS = int(os.getenv("BRIEFING_BROWSER_SLOTS", "0"))  # 동시 Chrome 수 (0: RAM 기준 자동)
+BROWSER_MB = int(os.getenv("BRIEFING_BROWSER_MB", "600"))  # Chrome 1개당 예상 메모리 (자동 산정용)
+HOST_LIMITS = os.getenv("BRIEFING_HOST_LIMITS",
+                        "finance.naver.com=2,stock.pstatic.net=4,ssl.pstatic.net=4,consensus.hankyung.com=2")
+HOST_DEFAULT_LIMIT = int(os.getenv("BRIEFING_HOST_DEFAULT_LIMIT", "4"))  # 목록에 없는 호스트
+FETCH_WORKERS = int(os.getenv("BRIEFING_FETCH_WORKERS", "8"))  # PDF/정적 HTML 작업 스레드 (호스트 제한은 별도)
+INFLIGHT_REPORTS = int(os.getenv("BRIEFING_INFLIGHT_REPORTS", "32"))  # v12.8: 배치 요약 시 동시에 처리 중인 리포트 상한 (0: 무제한)
+PDF_HEAD_CHARS, PDF_TAIL_CHARS = 6000, 4000  # v13.0: PDF 캐시에 보관할 앞 5쪽 / 마지막 3쪽 텍스트 길이
+SUMMARY_INPUT_TOKENS = int(os.getenv("BRIEFING_SUMMARY_INPUT_TOKENS", "600"))  # v13.0: 요약 프롬프트 본문 토큰 예산
+LLM_CONCURRENCY = int(os.getenv("BRIEFING_LLM_CONCURRENCY", "12"))  # 동시 LLM 호출 상한 (v12.5: AIMD 최대값)
+NOTION_RPS = float(os.getenv("BRIEFING_NOTION_RPS", "3"))  # Notion API 평균 3 req/s 제한
+
+# v12.5: 대상별 AIMD 동시성 제어 (0: 초기값 고정)
+AIMD_ENABLED = os.getenv("BRIEFING_AIMD", "1") != "0"
+AIMD_MAX_FACTOR = float(os.getenv("BRIEFING_AIMD_MAX_FACTOR", "3"))  # 호스트 상한 = 초기값 × 배수
+AIMD_LATENCY_FACTOR = float(os.getenv("BRIEFING_AIMD_LATENCY_FACTOR", "3"))  # 평균 대비 이 배수 초과 시 지연 급증
+# 대상별 요청 간 최소 간격(초) - 기존 고정 대기(네이버 카테고리 간 1초, 한경 0.5초)를 시작값이자 하한으로 유지
+AIMD_MIN_DELAYS = os.getenv("BRIEFING_AIMD_MIN_DELAY", "naver=1,hankyung=0.5")
+# 대상 → 호스트 접미사 (초기 동시성은 BRIEFING_HOST_LIMITS, openai는 4에서 시작해 LLM_CONCURRENCY까지)
+AIMD_TARGETS = {
+    "naver": ("finance.naver.com",),
+    "pstatic": ("pstatic.net",),
+    "hankyung": ("hankyung.com",),
+}
 
 # ----------------------------------------------------------
 # 🌐 Selenium 설정 (Phase 2: Mobile UA 전역 적용)
@@ -83,7 +237,12 @@ MOBILE_USER_AGENT = ("Mozilla/5.0 (Linux; Android 10; SM-G973F) "
                     "Chrome/124.0.0.0 Mobile Safari/537.36")
 
 def create_selenium_driver(force_mobile=False):
-    """Selenium 드라이버 생성 (Phase 2: Mobile UA 옵션)"""
+    """Selenium 드라이버 생성 (Phase 2: Mobile UA 옵션, v12.2: selenium은 첫 드라이버 생성 시 import)"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    from webdriver_manager.chrome import ChromeDriverManager
+    
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
@@ -94,7 +253,7 @@ def create_selenium_driver(force_mobile=False):
     # Phase 2: Mobile UA 조건부 적용
     if force_mobile:
         chrome_options.add_argument(f"user-agent={MOBILE_USER_AGENT}")
-        print(f"      [DEBUG] Mobile User-Agent 적용")
+        log_scrape.debug("Mobile User-Agent 적용")
     else:
         chrome_options.add_argument(f"user-agent={HEADERS['User-Agent']}")
     
@@ -102,329 +261,2423 @@ def create_selenium_driver(force_mobile=False):
     return webdriver.Chrome(service=service, options=chrome_options)
 
 # ----------------------------------------------------------
-# 1️⃣ 리포트 수집
+# 🧰 도구 베이스 (v12.2: crewai는 에이전트 연동 시에만 import)
 # ----------------------------------------------------------
-class NaverResearchScraperTool(BaseTool):
-    name: str = "Naver Research Scraper Tool"
-    description: str = "네이버 금융 리서치 리포트 수집"
+class BaseTool(abc.ABC):
+    """crewai.tools.BaseTool과 같은 name/description/_run 인터페이스의 경량 베이스
     
-    def _run(self) -> str:
-        """네이버 리서치 리포트 수집 (Selenium)"""
-        base_url = "https://finance.naver.com/research/"
-        categories = {
-            "투자정보": "invest_list.naver",
-            "종목분석": "company_list.naver",
-            "산업분석": "industry_list.naver",
-            "경제분석": "economy_list.naver"
-        }
-        reports = []
-        driver = create_selenium_driver()
-        print(f"\n[DEBUG] 네이버 수집 시작 - 날짜: {target_dates}")
+    파이프라인은 _run()을 직접 호출하므로 crewai가 필요 없다. CrewAI 에이전트에 넘길 때만
+    to_crewai()로 변환한다 (이때 crewai import).
+    """
+    name: str = ""
+    description: str = ""
+    
+    def run(self, *args, **kwargs):
+        return self._run(*args, **kwargs)
+    
+    @abc.abstractmethod
+    def _run(self, *args, **kwargs):
+        """도구 본체 (하위 클래스 필수 구현)"""
+    
+    def to_crewai(self):
+        """crewai.tools.BaseTool 인스턴스로 변환 (_run 위임)"""
+        from crewai.tools import BaseTool as CrewAIBaseTool
+        tool = self
+        
+        class _CrewAITool(CrewAIBaseTool):
+            name: str = tool.name
+            description: str = tool.description
+            
+            def _run(self, *args, **kwargs):
+                return tool._run(*args, **kwargs)
+        
+        return _CrewAITool()
+
+# ----------------------------------------------------------
+# 📊 실행 계측 (v11.8: 단계별 시간/바이트/토큰/캐시/실패 사유)
+# ----------------------------------------------------------
+METRICS_DIR = os.getenv("BRIEFING_METRICS_DIR", ".")
+
+# 현재 처리 중인 리포트 (워커 스레드별로 설정 → 하위 함수 계측이 리포트에 귀속됨)
+_current_report = contextvars.ContextVar("current_report", default=None)
+
+def report_ref(report: dict) -> str:
+    """리포트 원문 참조: 네이버 nid (목록 페이지 번호 등 다른 파라미터는 무시), 없으면 fragment 뺀 URL"""
+    url = report.get("url") or report.get("pdf_url") or ""
+    m = re.search(r"[?&]nid=(\d+)", url)
+    return m.group(1) if m else url.split("#")[0]
+
+def report_id(report: dict) -> str:
+    """리포트 식별자 (출처 + nid/URL + 날짜 + 증권사 + 제목 해시)
+
+    요약 캐시/아카이브/작업 큐의 키 - 제목만으로는 "Daily ..." 같은 반복 제목이 다른 날 리포트와 겹치므로
+    원문 참조와 날짜를 포함한다.
+    """
+    key = (f"{report.get('source', '')}|{report_ref(report)}|{normalize_date(report.get('date', ''))}|"
+           f"{report.get('company', '')}|{report.get('title', '')}")
+    return hashlib.md5(key.encode("utf-8")).hexdigest()[:12]
+
+class RunMetrics:
+    """실행 1회의 계측 데이터 (스레드 안전)"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self, run_date: str = ""):
+        with self._lock:
+            self.run_date = run_date
+            self.started_at = time.time()
+            self.stages = {}    # 단계명 → {count, total_sec, max_sec, bytes}
+            self.reports = {}   # report_id → {title, company, source_type, stages: {단계명: sec}}
+            self.tokens = {}    # 모델명 → {calls, prompt_tokens, completion_tokens, total_tokens}
+            self.cache = {}     # 캐시명 → {hit, miss}
+            self.failures = Counter()  # "단계:사유" → 횟수
+            self.extra = {}     # 큐 지표 등 부가 정보
+    
+    def _stage_entry(self, name: str) -> dict:
+        return self.stages.setdefault(name, {"count": 0, "total_sec": 0.0, "max_sec": 0.0, "bytes": 0})
+    
+    def _report_entry(self, report: dict) -> dict:
+        rid = report_id(report)
+        if rid not in self.reports:
+            self.reports[rid] = {"title": report.get("title", ""), "company": report.get("company", ""),
+                                 "source": report.get("source", ""), "stages": {}, "bytes": 0}
+        return self.reports[rid]
+    
+    def record(self, name: str, seconds: float, nbytes: int = 0):
+        """단계 소요 시간 기록 (현재 리포트 컨텍스트가 있으면 리포트별로도 누적)"""
+        report = _current_report.get()
+        with self._lock:
+            entry = self._stage_entry(name)
+            entry["count"] += 1
+            entry["total_sec"] += seconds
+            entry["max_sec"] = max(entry["max_sec"], seconds)
+            entry["bytes"] += nbytes
+            if report is not None:
+                r = self._report_entry(report)
+                r["stages"][name] = round(r["stages"].get(name, 0.0) + seconds, 3)
+                r["bytes"] += nbytes
+    
+    @contextmanager
+    def stage(self, name: str):
+        """with metrics.stage("pdf_parse"): ... 형태의 단계 타이머"""
+        start = time.perf_counter()
         try:
-            for cat, path in categories.items():
-                url = base_url + path
-                print(f"\n[DEBUG] {cat} 페이지 접속: {url}")
-                driver.get(url)
-                time.sleep(3)  # 로딩 대기 시간 증가
-                
-                # 페이지 소스 저장 (디버깅용)
-                page_source = driver.page_source
-                if "table" not in page_source.lower():
-                    print(f"   ⚠️ {cat}: 페이지 소스에 'table' 없음")
-                    continue
-                
-                soup = BeautifulSoup(page_source, "html.parser")
-                
-                # 다양한 선택자 시도
-                rows = soup.select("table.type_1 tbody tr")
-                if not rows:
-                    rows = soup.select("table tbody tr")
-                if not rows:
-                    rows = soup.select("tbody tr")
-                if not rows:
-                    rows = soup.find_all("tr")
-                
-                print(f"[DEBUG] {cat}: {len(rows)}개 row 발견")
-                for i, row in enumerate(rows):
-                    cols = row.find_all("td")
-                    if len(cols) < 4: 
-                        continue
-                    
-                    # 컬럼 구조 분석 (종목명, 제목, 증권사, 첨부, 작성일, 조회수)
-                    # 제목은 보통 cols[0] 또는 cols[1]
-                    title_tag = cols[0].find("a")
-                    if not title_tag and len(cols) > 1:
-                        title_tag = cols[1].find("a")
-                    
-                    # 증권사는 보통 cols[1] 또는 cols[2]
-                    company = cols[2].get_text(strip=True) if len(cols) > 2 else "N/A"
-                    if not company or company == "":
-                        company = cols[1].get_text(strip=True) if len(cols) > 1 else "N/A"
-                    
-                    # 날짜 찾기: 뒤에서 두 번째 컬럼 (작성일)
-                    date = ""
-                    if len(cols) >= 6:  # 6개 컬럼: [종목명, 제목, 증권사, 첨부, 작성일, 조회수]
-                        date = cols[4].get_text(strip=True)  # 작성일 (5번째, 0-indexed)
-                    elif len(cols) >= 5:  # 5개 컬럼: [제목, 증권사, 첨부, 작성일, 조회수]
-                        date = cols[3].get_text(strip=True)  # 작성일
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def add_bytes(self, name: str, nbytes: int):
+        report = _current_report.get()
+        with self._lock:
+            self._stage_entry(name)["bytes"] += nbytes
+            if report is not None:
+                self._report_entry(report)["bytes"] += nbytes
+    
+    def add_usage(self, model: str, usage):
+        """OpenAI resp.usage 토큰 수 누적"""
+        with self._lock:
+            entry = self.tokens.setdefault(model, {"calls": 0, "prompt_tokens": 0,
+                                                   "completion_tokens": 0, "total_tokens": 0})
+            entry["calls"] += 1
+            if usage is not None:
+                entry["prompt_tokens"] += getattr(usage, "prompt_tokens", 0) or 0
+                entry["completion_tokens"] += getattr(usage, "completion_tokens", 0) or 0
+                entry["total_tokens"] += getattr(usage, "total_tokens", 0) or 0
+    
+    def cache_event(self, name: str, hit: bool):
+        with self._lock:
+            entry = self.cache.setdefault(name, {"hit": 0, "miss": 0})
+            entry["hit" if hit else "miss"] += 1
+    
+    def failure(self, stage: str, reason: str):
+        report = _current_report.get()
+        with self._lock:
+            self.failures[f"{stage}:{reason}"] += 1
+            if report is not None:
+                self._report_entry(report).setdefault("failures", []).append(f"{stage}:{reason}")
+    
+    def set_report_source(self, report: dict, source_type: str):
+        with self._lock:
+            self._report_entry(report)["source_type"] = source_type
+    
+    def set_report_level(self, report: dict, level: str):
+        with self._lock:
+            self._report_entry(report)["level"] = level
+    
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "run_date": self.run_date,
+                "started_at": datetime.fromtimestamp(self.started_at).isoformat(timespec="seconds"),
+                "elapsed_sec": round(time.time() - self.started_at, 3),
+                "stages": {k: {**v, "total_sec": round(v["total_sec"], 3), "max_sec": round(v["max_sec"], 3),
+                               "avg_sec": round(v["total_sec"] / v["count"], 3) if v["count"] else 0}
+                           for k, v in self.stages.items()},
+                "tokens": dict(self.tokens),
+                "cache": dict(self.cache),
+                "failures": dict(self.failures),
+                "reports": dict(self.reports),
+                **self.extra,
+            }
+    
+    def write(self, path: str = None) -> str:
+        path = path or os.path.join(METRICS_DIR, f"run_metrics_{self.run_date or today_file}.json")
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            log.warning("계측 파일 저장 실패: %s", e)
+        return path
+    
+    def summary_table(self) -> str:
+        data = self.to_dict()
+        lines = [f"{'단계':<24}{'횟수':>6}{'합계(s)':>10}{'평균(s)':>9}{'최대(s)':>9}{'KB':>10}"]
+        for name, st in sorted(data["stages"].items(), key=lambda kv: -kv[1]["total_sec"]):
+            lines.append(f"{name:<24}{st['count']:>6}{st['total_sec']:>10.2f}{st['avg_sec']:>9.2f}"
+                         f"{st['max_sec']:>9.2f}{st['bytes'] / 1024:>10.1f}")
+        for model, tk in data["tokens"].items():
+            lines.append(f"[토큰] {model}: 호출 {tk['calls']}회, 입력 {tk['prompt_tokens']}, "
+                         f"출력 {tk['completion_tokens']}, 합계 {tk['total_tokens']}")
+        for name, c in data["cache"].items():
+            lines.append(f"[캐시] {name}: 적중 {c['hit']} / 미적중 {c['miss']}")
+        for reason, n in sorted(data["failures"].items(), key=lambda kv: -kv[1]):
+            lines.append(f"[실패] {reason}: {n}건")
+        lines.append(f"[전체] {data['elapsed_sec']:.1f}초")
+        return "\n".join(lines)
+
+metrics = RunMetrics()
+
+# ----------------------------------------------------------
+# 📝 로깅 (v11.9: 단계별 logger + 리포트 컨텍스트 + 실패 trace 링 버퍼)
+# ----------------------------------------------------------
+LOG_LEVEL = os.getenv("BRIEFING_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("BRIEFING_LOG_FORMAT", "text")  # text | json
+# 리포트당 보관 DEBUG 레코드 수 (0: 비활성) - 켜면 logger가 DEBUG로 내려가 핫루프의 isEnabledFor/지연 포맷팅 이득이
+# 사라지므로 기본은 끔 (실패 원인 조사 시에만 사용)
+TRACE_BUFFER_SIZE = int(os.getenv("BRIEFING_TRACE_BUFFER", "0"))
+
+log = logging.getLogger("briefing")
+log_scrape = logging.getLogger("briefing.scrape")
+log_pdf = logging.getLogger("briefing.pdf")
+log_html = logging.getLogger("briefing.html")
+log_llm = logging.getLogger("briefing.llm")
+log_pipeline = logging.getLogger("briefing.pipeline")
+log_trace = logging.getLogger("briefing.trace")
+
+class ReportContextFilter(logging.Filter):
+    """현재 처리 중인 리포트 정보를 로그 레코드에 부착"""
+    
+    def filter(self, record):
+        if not hasattr(record, "report_id"):
+            report = _current_report.get()
+            if report is None:
+                record.report_id, record.source, record.company, record.ctx = "-", "-", "-", ""
+            else:
+                record.report_id = report_id(report)
+                record.source = report.get("source", "-")
+                record.company = report.get("company", "-")
+                record.ctx = f" [{record.report_id}|{record.source}|{record.company}]"
+        return True
+
+class JsonLogFormatter(logging.Formatter):
+    """BRIEFING_LOG_FORMAT=json 일 때 한 줄 JSON 로그"""
+    
+    def format(self, record):
+        entry = {"ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), "level": record.levelname,
+                 "logger": record.name, "msg": record.getMessage(),
+                 "report_id": getattr(record, "report_id", "-"), "source": getattr(record, "source", "-"),
+                 "company": getattr(record, "company", "-")}
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+class ReportTraceBuffer(logging.Handler):
+    """리포트별 DEBUG 레코드 링 버퍼
+    
+    콘솔 레벨과 무관하게 리포트 컨텍스트가 있는 레코드를 포맷팅 없이 보관하고,
+    추출 실패 시에만 dump()로 상세 trace를 출력한다. 성공한 리포트는 discard()로 폐기.
+    """
+    
+    def __init__(self, per_report: int, max_reports: int = 64):
+        super().__init__(level=logging.DEBUG)
+        self.per_report = per_report
+        self.max_reports = max_reports
+        self._buffers = OrderedDict()
+        self._buf_lock = threading.Lock()
+        self.addFilter(ReportContextFilter())
+    
+    def emit(self, record):
+        if record.report_id == "-" or record.name == log_trace.name:
+            return
+        with self._buf_lock:
+            buf = self._buffers.get(record.report_id)
+            if buf is None:
+                buf = self._buffers[record.report_id] = deque(maxlen=self.per_report)
+                while len(self._buffers) > self.max_reports:
+                    self._buffers.popitem(last=False)
+            buf.append(record)
+    
+    def discard(self, report: dict):
+        with self._buf_lock:
+            self._buffers.pop(report_id(report), None)
+    
+    def dump(self, report: dict):
+        with self._buf_lock:
+            records = self._buffers.pop(report_id(report), None)
+        if not records:
+            return
+        log_trace.warning("---- 추출 실패 trace (%d줄): %.40s ----", len(records), report.get("title", ""))
+        for record in records:
+            log_trace.warning("  %s %s: %s", record.levelname, record.name, record.getMessage())
+
+trace_buffer = ReportTraceBuffer(TRACE_BUFFER_SIZE)
+
+def setup_logging(level: str = None):
+    """briefing.* logger 설정 (중복 호출 시 핸들러 재설정)"""
+    level = getattr(logging, (level or LOG_LEVEL), logging.INFO)
+    for handler in list(log.handlers):
+        log.removeHandler(handler)
+    
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(level)
+    console.addFilter(ReportContextFilter())
+    if LOG_FORMAT == "json":
+        console.setFormatter(JsonLogFormatter())
+    else:
+        console.setFormatter(logging.Formatter("%(asctime)s %(levelname)-7s %(name)s%(ctx)s %(message)s", "%H:%M:%S"))
+    log.addHandler(console)
+    
+    # 링 버퍼가 켜져 있으면 DEBUG 레코드를 생성(포맷팅은 dump 시에만), 꺼져 있으면 콘솔 레벨에서 차단
+    if TRACE_BUFFER_SIZE > 0:
+        log.addHandler(trace_buffer)
+        log.setLevel(min(level, logging.DEBUG))
+    else:
+        log.setLevel(level)
+    log.propagate = False
+
+# ----------------------------------------------------------
+# ⏱️ 마감 시간 스케줄러 (v12.3: 우선순위 + 리포트별 단계적 품질 저하)
+# ----------------------------------------------------------
+HIGH_VALUE_CATEGORIES = {"종목분석", "산업분석"}
+
+# 품질 단계: full(PDF → Selenium HTML) > static(PDF → 정적 HTML) > title(제목 기반 요약) > skip(요약 생략)
+LEVELS = ("full", "static", "title", "skip")
+
+class DeadlineScheduler:
+    """전체 시간 예산 안에서 리포트 처리 순서와 품질 단계를 결정 (스레드 안전)
+    
+    - 우선순위: PDF 있음 > 종목/산업분석 > PDF 캐시 적중 (미적중은 뒤로)
+    - 리포트를 꺼낼 때마다 남은 예산에서 뒤에 남은 리포트들의 제목 요약 몫을 뺀 시간과
+      단계별 예상 비용(EWMA)을 비교해 감당 가능한 가장 높은 단계를 선택
+      → 느린 페이지가 많아도 브리핑은 제시간에 생성
+    """
+    
+    # 단계별 본문 추출 예상 시간 초기값 (초) - 실행 중 관측값으로 갱신
+    DEFAULT_EXTRACT_SEC = {"full": 20.0, "static": 4.0, "title": 0.0}
+    DEFAULT_LLM_SEC = 3.0
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    
+    def reset(self, budget_sec: float = 0.0, reserve_sec: float = 0.0, workers: int = 4):
+        with self._lock:
+            self.started = time.monotonic()
+            self.budget_sec = budget_sec
+            self.reserve_sec = reserve_sec
+            self.workers = max(1, workers)
+            self.pending = 0
+            self.extract_sec = dict(self.DEFAULT_EXTRACT_SEC)
+            self.llm_sec = self.DEFAULT_LLM_SEC
+            self.levels = Counter()
+            self.degraded = []  # {report_id, title, company, level, remaining_sec}
+    
+    @property
+    def enabled(self) -> bool:
+        return self.budget_sec > 0
+    
+    def remaining(self) -> float:
+        """요약 단계에 쓸 수 있는 남은 시간 (무제한이면 inf)"""
+        if not self.enabled:
+            return float("inf")
+        return self.budget_sec - self.reserve_sec - (time.monotonic() - self.started)
+    
+    @staticmethod
+    def priority(report: dict) -> tuple:
+        """정렬 키 (작을수록 먼저)"""
+        pdf_url = report.get("pdf_url")
+        cached = bool(pdf_url) and hashlib.md5(pdf_url.encode("utf-8")).hexdigest() in _pdf_cache
+        return (0 if pdf_url else 1,
+                0 if report.get("category") in HIGH_VALUE_CATEGORIES else 1,
+                0 if cached else 1)
+    
+    def order(self, reports: list) -> list:
+        """우선순위 순으로 정렬한 (원래 인덱스, 리포트) 목록 + 대기 건수 등록"""
+        self.add_pending(len(reports))
+        return sorted(enumerate(reports), key=lambda item: self.priority(item[1]))
+    
+    def add_pending(self, n: int = 1):
+        with self._lock:
+            self.pending += n
+    
+    def release(self, n: int = 1):
+        """plan() 없이 끝난 리포트(요약 캐시/원장 재사용)의 대기 건수 해제"""
+        with self._lock:
+            self.pending = max(0, self.pending - n)
+    
+    def plan(self, report: dict) -> str:
+        """리포트 1건의 품질 단계 결정 (꺼낸 시점 기준)"""
+        remaining = self.remaining()
+        with self._lock:
+            self.pending = max(0, self.pending - 1)
+            # 뒤에 남은 리포트는 최소 제목 요약(title)이 가능하도록 예산을 남겨두고,
+            # 그 안에서 이 리포트(남은 것 중 우선순위 최상)에 가능한 가장 높은 단계 선택
+            tail = (self.pending // self.workers) * (self.extract_sec["title"] + self.llm_sec)
+            level = "title" if self.llm_sec <= remaining else "skip"
+            for candidate in LEVELS[:2]:
+                if self.extract_sec[candidate] + self.llm_sec + tail <= remaining:
+                    level = candidate
+                    break
+            self.levels[level] += 1
+            if level != "full":
+                self.degraded.append({"report_id": report_id(report), "title": report.get("title", ""),
+                                      "company": report.get("company", ""), "level": level,
+                                      "remaining_sec": round(remaining, 1)})
+        metrics.set_report_level(report, level)
+        if level != "full":
+            log_pipeline.info("[DEADLINE] 남은 %.0f초 → %s 단계로 처리: %.40s", remaining, level, report.get("title", ""))
+        return level
+    
+    def mark_skipped(self, report: dict, planned: str):
+        """추출 후 요약 시점에 예산이 소진되어 생략된 리포트 기록"""
+        with self._lock:
+            self.levels[planned] -= 1
+            self.levels["skip"] += 1
+            self.degraded = [d for d in self.degraded if d["report_id"] != report_id(report)]
+            self.degraded.append({"report_id": report_id(report), "title": report.get("title", ""),
+                                  "company": report.get("company", ""), "level": "skip",
+                                  "remaining_sec": round(self.remaining(), 1)})
+        metrics.set_report_level(report, "skip")
+    
+    def observe(self, level: str, extract_sec: float = None, llm_sec: float = None, alpha: float = 0.3):
+        """관측 시간으로 예상 비용 갱신 (지수 이동 평균)"""
+        with self._lock:
+            if extract_sec is not None and level in self.extract_sec:
+                self.extract_sec[level] += alpha * (extract_sec - self.extract_sec[level])
+            if llm_sec is not None:
+                self.llm_sec += alpha * (llm_sec - self.llm_sec)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "budget_sec": self.budget_sec,
+                "reserve_sec": self.reserve_sec,
+                "remaining_sec": round(self.remaining(), 1) if self.enabled else None,
+                "levels": dict(self.levels),
+                "estimates_sec": {**{k: round(v, 2) for k, v in self.extract_sec.items()},
+                                  "llm": round(self.llm_sec, 2)},
+                "degraded": list(self.degraded),
+            }
+
+deadline = DeadlineScheduler()
+
+# ----------------------------------------------------------
+# 🧵 자원별 실행 풀 (v12.4: 브라우저 / 호스트별 HTTP / LLM / Notion 분리)
+# ----------------------------------------------------------
+def _total_memory_mb() -> int:
+    """물리 메모리 (MB, 확인 불가 시 0)"""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+def _parse_host_limits(spec: str) -> dict:
+    limits = {}
+    for part in spec.split(","):
+        host, _, n = part.strip().partition("=")
+        if host and n.strip().isdigit():
+            limits[host] = max(1, int(n))
+    return limits
+
+def _parse_min_delays(spec: str) -> dict:
+    delays = {}
+    for part in spec.split(","):
+        name, _, sec = part.strip().partition("=")
+        try:
+            delays[name] = max(0.0, float(sec))
+        except ValueError:
+            continue
+    return delays
+
+class RateLimiter:
+    """최소 호출 간격 기반 rate limiter (스레드 안전)"""
+    
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+    
+    def acquire(self) -> float:
+        """다음 호출 가능 시점까지 대기 → 대기 시간 반환"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next - now)
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+class AimdController:
+    """대상별 AIMD(additive increase / multiplicative decrease) 동시성 제어기 (v12.5)
+    
+    - 정상 응답(지연 정상): 동시성 limit을 1/limit씩 증가 (limit개 성공마다 +1), 요청 간 대기는 절반으로 감소
+      (단 min_delay 아래로는 내려가지 않음 - 대기는 min_delay에서 시작)
+    - 429/5xx/타임아웃/지연 급증: limit을 절반으로, 요청 간 대기는 2배(Retry-After 있으면 그 값)로
+      (감소는 cooldown 간격당 1회 → 동시에 실패한 요청들이 limit을 연쇄적으로 깎지 않도록)
+    고정 max_workers / time.sleep() 대신 사용
+    """
+    
+    HISTORY_SIZE = 200
+    
+    def __init__(self, name: str, initial: float, max_limit: float, min_limit: float = 1.0,
+                 cooldown_sec: float = 1.0, max_delay: float = 10.0, min_delay: float = 0.0):
+        self.name = name
+        self.initial = float(initial)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit) if AIMD_ENABLED else float(initial)
+        self.cooldown_sec = cooldown_sec
+        self.max_delay = max_delay
+        self.min_delay = min(float(min_delay), max_delay)
+        self._cond = threading.Condition()
+        self.reset()
+    
+    def reset(self):
+        with self._cond:
+            self.limit = min(self.initial, self.max_limit)
+            self.in_flight = 0
+            self.delay = self.min_delay  # 요청 간 최소 간격 (초)
+            self._next_at = 0.0
+            self._last_decrease = 0.0
+            self.latency_ewma = None
+            self.samples = 0
+            self.counts = Counter()  # ok / throttled / error / slow
+            self.increases = 0
+            self.decreases = 0
+            self.peak_limit = self.limit
+            self.history = deque(maxlen=self.HISTORY_SIZE)  # (경과초, limit, 사유)
+            self._started = time.monotonic()
+            self._cond.notify_all()
+    
+    def acquire(self):
+        """동시성 여유가 생길 때까지 대기 후 요청 간 최소 간격만큼 pacing"""
+        with self._cond:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._cond.wait()
+            self.in_flight += 1
+            now = time.monotonic()
+            wait = max(0.0, self._next_at - now) if self.delay > 0 else 0.0
+            self._next_at = max(now, self._next_at) + self.delay
+        if wait > 0:
+            time.sleep(wait)
+    
+    def release(self, status=None, latency: float = None, retry_after: float = None):
+        """요청 결과 반영: status는 HTTP 코드 / "error"(예외) / None(성공)"""
+        with self._cond:
+            self.in_flight = max(0, self.in_flight - 1)
+            throttled = status == 429 or (isinstance(status, int) and status >= 500)
+            failed = status == "error"
+            slow = False
+            if latency is not None and not (throttled or failed):
+                if self.latency_ewma is not None and self.samples >= 5:
+                    slow = latency > self.latency_ewma * AIMD_LATENCY_FACTOR and latency > 1.0
+                if not slow:  # 급증 구간은 기준선에 섞지 않음
+                    self.latency_ewma = latency if self.latency_ewma is None else \
+                        self.latency_ewma + 0.2 * (latency - self.latency_ewma)
+                    self.samples += 1
+            reason = "throttled" if throttled else "error" if failed else "slow" if slow else "ok"
+            self.counts[reason] += 1
+            if reason == "ok":
+                self._increase()
+            else:
+                self._decrease(reason, retry_after)
+            self._cond.notify_all()
+    
+    def _increase(self):
+        if self.limit < self.max_limit:
+            before = int(self.limit)
+            self.limit = min(self.max_limit, self.limit + 1.0 / max(1.0, self.limit))
+            if int(self.limit) > before:
+                self.increases += 1
+                self._record("increase")
+            self.peak_limit = max(self.peak_limit, self.limit)
+        self.delay = max(self.min_delay, self.delay * 0.5 if self.delay > 0.05 else 0.0)
+    
+    def _decrease(self, reason: str, retry_after: float = None):
+        now = time.monotonic()
+        if retry_after:
+            self.delay = min(self.max_delay, max(self.delay, retry_after))
+            self._next_at = max(self._next_at, now + retry_after)
+        else:
+            self.delay = min(self.max_delay, max(0.25, self.min_delay, self.delay * 2))
+        if now - self._last_decrease < self.cooldown_sec:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * 0.5)
+        self.decreases += 1
+        self._record(reason)
+        log_pipeline.info("[AIMD] %s %s → 동시성 %.1f, 요청 간격 %.2f초", self.name, reason, self.limit, self.delay)
+    
+    def _record(self, reason: str):
+        self.history.append((round(time.monotonic() - self._started, 2), round(self.limit, 2), reason))
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": round(self.limit, 2),
+                "initial": self.initial,
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "peak_limit": round(self.peak_limit, 2),
+                "delay_sec": round(self.delay, 3),
+                "min_delay_sec": self.min_delay,
+                "latency_ewma_sec": round(self.latency_ewma, 3) if self.latency_ewma is not None else None,
+                "counts": dict(self.counts),
+                "increases": self.increases,
+                "decreases": self.decreases,
+                "history": list(self.history),
+            }
+
+class ResourcePools:
+    """자원 종류별 동시성 제한과 작업 스레드 풀
+    
+    - browser: 본문 추출용 동시 Chrome 수 (RAM / BROWSER_MB, 최대 4, 목록 수집용 1개 제외)
+    - host:    호스트별 동시 HTTP 요청 수 (v12.5: naver/pstatic/hankyung은 AIMD 제어)
+    - llm:     동시 LLM 호출 수 (v12.5: openai AIMD 제어)
+    - notion:  초당 요청 수
+    느린 Chrome 세션이 LLM 호출을 막지 않도록 배치 모드 요약은 fetch/browser/llm 풀을 거치는 작업 그래프로 실행
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        total_mb = _total_memory_mb()
+        # RAM의 절반을 Chrome에 배정, 네이버 목록 수집용 Chrome 1개 몫은 제외 (최대 4)
+        self.browser_slots = BROWSER_SLOTS or (max(1, min(4, total_mb // 2 // BROWSER_MB) - 1) if total_mb else 2)
+        self.host_limits = _parse_host_limits(HOST_LIMITS)
+        self._browser = threading.BoundedSemaphore(self.browser_slots)
+        self._hosts = {}
+        # v12.5: 대상별 AIMD 제어기 (초기값은 기존 고정 한도)
+        self.controllers = {"openai": AimdController("openai", min(4, LLM_CONCURRENCY), max(1, LLM_CONCURRENCY))}
+        min_delays = _parse_min_delays(AIMD_MIN_DELAYS)
+        for name, suffixes in AIMD_TARGETS.items():
+            initial = next((n for h, n in self.host_limits.items() if h.endswith(suffixes)), HOST_DEFAULT_LIMIT)
+            self.controllers[name] = AimdController(name, initial, max(initial, round(initial * AIMD_MAX_FACTOR)),
+                                                    min_delay=min_delays.get(name, 0.0))
+        self.notion = RateLimiter(NOTION_RPS)
+        self._executors = {}
+        self.reset_stats()
+    
+    def reset_stats(self):
+        with self._lock:
+            self.stats_by_class = {}  # 자원명 → {acquired, wait_sec, max_wait_sec, in_use, max_in_use}
+        for ctl in self.controllers.values():
+            ctl.reset()
+    
+    def controller_for(self, url: str):
+        """URL 호스트에 해당하는 AIMD 제어기 (없으면 None)"""
+        host = urlparse(url).hostname or ""
+        for name, suffixes in AIMD_TARGETS.items():
+            if host.endswith(suffixes):
+                return self.controllers[name]
+        return None
+    
+    def _stat(self, name: str) -> dict:
+        return self.stats_by_class.setdefault(name, {"acquired": 0, "wait_sec": 0.0, "max_wait_sec": 0.0,
+                                                     "in_use": 0, "max_in_use": 0})
+    
+    @contextmanager
+    def _slot(self, name: str, sem):
+        """with ... as outcome: AIMD 제어기면 outcome.status/retry_after와 소요 시간을 결과로 반영"""
+        start = time.perf_counter()
+        sem.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            st = self._stat(name)
+            st["acquired"] += 1
+            st["wait_sec"] += waited
+            st["max_wait_sec"] = max(st["max_wait_sec"], waited)
+            st["in_use"] += 1
+            st["max_in_use"] = max(st["max_in_use"], st["in_use"])
+        outcome = SlotOutcome()
+        work_start = time.perf_counter()
+        try:
+            yield outcome
+        except Exception as e:
+            outcome.fail(e)
+            raise
+        finally:
+            with self._lock:
+                self._stat(name)["in_use"] -= 1
+            if isinstance(sem, AimdController):
+                sem.release(outcome.status, time.perf_counter() - work_start, outcome.retry_after)
+            else:
+                sem.release()
+    
+    def browser(self):
+        """with pools.browser(): Chrome 생성~종료 구간"""
+        return self._slot("browser", self._browser)
+    
+    def llm(self):
+        return self._slot("llm", self.controllers["openai"])
+    
+    def host(self, url: str):
+        """with pools.host(url) as outcome: 호스트별 동시 요청 제한 (AIMD 대상이면 적응형)"""
+        host = urlparse(url).hostname or ""
+        ctl = self.controller_for(url)
+        if ctl is not None:
+            return self._slot(f"http:{host}", ctl)
+        with self._lock:
+            sem = self._hosts.get(host)
+            if sem is None:
+                sem = self._hosts[host] = threading.BoundedSemaphore(self.host_limits.get(host, HOST_DEFAULT_LIMIT))
+        return self._slot(f"http:{host}", sem)
+    
+    def notion_wait(self):
+        waited = self.notion.acquire()
+        with self._lock:
+            st = self._stat("notion")
+            st["acquired"] += 1
+            st["wait_sec"] += waited
+            st["max_wait_sec"] = max(st["max_wait_sec"], waited)
+    
+    def submit(self, name: str, fn, *args, **kwargs):
+        """자원 종류별 스레드 풀에 작업 제출 (fetch / browser / llm)"""
+        with self._lock:
+            executor = self._executors.get(name)
+            if executor is None:
+                size = {"fetch": FETCH_WORKERS, "browser": self.browser_slots, "llm": LLM_CONCURRENCY}[name]
+                executor = self._executors[name] = ThreadPoolExecutor(max_workers=max(1, size),
+                                                                      thread_name_prefix=f"pool-{name}")
+        return executor.submit(fn, *args, **kwargs)
+    
+    def shutdown(self):
+        with self._lock:
+            executors, self._executors = list(self._executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=True)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "browser_slots": self.browser_slots,
+                "llm_concurrency_max": LLM_CONCURRENCY,
+                "notion_rps": NOTION_RPS,
+                "host_limits": dict(self.host_limits),
+                "classes": {k: {**{f: v[f] for f in ("acquired", "max_in_use")},
+                                "wait_sec": round(v["wait_sec"], 3), "max_wait_sec": round(v["max_wait_sec"], 3)}
+                            for k, v in self.stats_by_class.items()},
+            }
+
+    def adaptive_stats(self) -> dict:
+        return {name: ctl.stats() for name, ctl in self.controllers.items()}
+
+class SlotOutcome:
+    """자원 슬롯 안에서 수행한 요청의 결과 (AIMD 제어기 입력)"""
+    
+    def __init__(self):
+        self.status = None       # HTTP 코드, "error"(예외), None(성공)
+        self.retry_after = None  # 초
+    
+    def fail(self, exc: Exception):
+        # openai.APIStatusError / requests.HTTPError는 상태 코드, 그 외(타임아웃/연결 오류)는 error
+        response = getattr(exc, "response", None)
+        code = getattr(exc, "status_code", None) or getattr(response, "status_code", None)
+        self.status = code if isinstance(code, int) else "error"
+        if response is not None and getattr(response, "headers", None) is not None:
+            self._read_retry_after(response.headers)
+    
+    def set_response(self, res):
+        self.status = res.status_code
+        self._read_retry_after(res.headers)
+    
+    def _read_retry_after(self, headers):
+        retry_ms = headers.get("retry-after-ms", "")  # OpenAI
+        retry_after = headers.get("Retry-After", "")
+        if retry_ms.replace(".", "", 1).isdigit():
+            self.retry_after = float(retry_ms) / 1000
+        elif retry_after.replace(".", "", 1).isdigit():
+            self.retry_after = float(retry_after)
+
+def is_retryable(status) -> bool:
+    return status in (429, "error") or (isinstance(status, int) and status >= 500)
+
+def chat_completion(stage: str, model: str, messages: list, attempts: int = 4):
+    """LLM 호출 (v12.5: SDK 내부 재시도 대신 openai AIMD 제어기가 429/5xx를 보고 동시성·간격을 조절한 뒤 재시도)"""
+    client = get_openai_client().with_options(max_retries=0)
+    for attempt in range(attempts):
+        try:
+            with pools.llm(), metrics.stage(stage):
+                return client.chat.completions.create(model=model, messages=messages)
+        except Exception as e:
+            outcome = SlotOutcome()
+            outcome.fail(e)
+            if attempt == attempts - 1 or not is_retryable(outcome.status):
+                raise
+            metrics.failure(stage, f"retry_{outcome.status}")
+            log_llm.debug("LLM 재시도 %d/%d (%s)", attempt + 1, attempts - 1, outcome.status)
+
+pools = ResourcePools()
+
+def http_get(url: str, **kwargs):
+    """호스트별 동시성 제한을 적용한 requests.get (본문까지 슬롯 안에서 수신)"""
+    with pools.host(url) as outcome:
+        res = requests.get(url, **kwargs)
+        res.content  # stream=True여도 본문 수신을 슬롯 안에서 완료
+        outcome.set_response(res)
+    return res
+
+# ----------------------------------------------------------
+# 💾 HTTP 캐시 (v14.0: 목록/상세 HTML 조건부 GET + 변경 없는 페이지는 파싱 결과 재사용)
+# ----------------------------------------------------------
+class HttpCache:
+    """URL별 본문/검증자/본문 해시/파싱 결과를 HTTP_CACHE_DIR에 저장하는 디스크 캐시
+
+    - get(): 저장된 ETag/Last-Modified로 If-None-Match/If-Modified-Since 요청 → 304면 저장된 본문으로 응답 구성
+      (검증자를 보내지 않는 서버는 본문 해시로 변경 여부 판단)
+    - parsed(): 본문 해시가 지난번 파싱 때와 같으면 저장된 결과 반환 (Selenium으로 렌더링한 목록도 해시로 판단)
+      parse() 안에서 incomplete()를 부르면(상세 조회 실패 등) 그 결과는 저장하지 않음 → 다음 실행에서 다시 파싱
+    URL당 <sha1>.json(메타+파싱 결과) / <sha1>.body(본문) 2개 파일, HTTP_CACHE_DAYS 동안 갱신 없으면 prune()에서 삭제
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._local = threading.local()  # parse() 실행 중 불완전 표시 (중첩 parsed() 호출은 바깥으로 전파)
+        self.run = Counter()  # new/changed/unchanged/not_modified/bypass, parse_reused/parse_miss/parse_incomplete
+
+    @property
+    def dir(self) -> str:
+        return HTTP_CACHE_DIR if self.path is None else self.path
+
+    def _files(self, url: str) -> tuple:
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.dir, key + ".json"), os.path.join(self.dir, key + ".body")
+
+    def _load(self, url: str) -> dict:
+        meta_file, _ = self._files(url)
+        try:
+            with open(meta_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, url: str, meta: dict, body: bytes = None):
+        meta_file, body_file = self._files(url)
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = f"{meta_file}.{threading.get_ident()}.tmp"
+        if body is not None:
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, body_file)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp, meta_file)
+
+    def _count(self, state: str):
+        with self._lock:
+            self.run[state] += 1
+
+    def get(self, url: str, headers: dict = None, **kwargs):
+        """http_get + 조건부 요청 (res.cache_state: new/changed/unchanged/not_modified/bypass, 304면 res.from_cache)"""
+        if not self.dir or kwargs.get("params") or kwargs.get("stream"):
+            res = http_get(url, headers=headers, **kwargs)
+            res.cache_state = "bypass"
+            return res
+        meta = self._load(url)
+        _, body_file = self._files(url)
+        headers = dict(headers or {})
+        if meta and os.path.exists(body_file):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        else:
+            meta = {}
+        res = http_get(url, headers=headers, **kwargs)
+        if res.status_code == 304 and meta:
+            with open(body_file, "rb") as f:
+                body = f.read()
+            res = self._cached_response(url, meta, body)
+            res.cache_state = "not_modified"
+            meta["checked_at"] = time.time()
+            self._save(url, meta)
+        elif res.status_code == 200:
+            digest = hashlib.sha1(res.content).hexdigest()
+            res.cache_state = "new" if not meta else "unchanged" if digest == meta.get("hash") else "changed"
+            validators = {"etag": res.headers.get("ETag", ""), "last_modified": res.headers.get("Last-Modified", "")}
+            if res.cache_state != "unchanged":
+                meta = {"url": url, "hash": digest, "encoding": res.encoding,
+                        "content_type": res.headers.get("Content-Type", ""), "parsed": {}}
+            meta.update(validators, checked_at=time.time())
+            self._save(url, meta, res.content if res.cache_state != "unchanged" else None)
+        else:
+            res.cache_state = "bypass"
+        self._count(res.cache_state)
+        metrics.cache_event("http", res.cache_state in ("unchanged", "not_modified"))
+        return res
+
+    @staticmethod
+    def _cached_response(url: str, meta: dict, body: bytes):
+        res = requests.models.Response()
+        res.status_code = 200
+        res.url = url
+        res._content = body
+        res.encoding = meta.get("encoding")
+        if meta.get("content_type"):
+            res.headers["Content-Type"] = meta["content_type"]
+        res.from_cache = True
+        return res
+
+    def parsed(self, url: str, text: str, key: str, parse):
+        """본문(text)이 지난번 파싱 때와 같으면 저장된 parse() 결과, 아니면 parse() 후 저장 (결과는 JSON 가능해야 함)
+
+        튜플은 리스트로 저장되므로 호출자는 언패킹해서 쓴다.
+        """
+        if not self.dir or not url:
+            return parse()
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        meta = self._load(url)
+        parsed = meta.get("parsed", {})
+        if meta.get("text_hash") == digest and key in parsed:
+            self._count("parse_reused")
+            return parsed[key]
+        outer = getattr(self._local, "incomplete", False)
+        self._local.incomplete = False
+        try:
+            value = parse()
+        finally:
+            incomplete = self._local.incomplete
+            self._local.incomplete = outer or incomplete
+        if incomplete:  # 하위 요청이 실패한 결과 → 저장하지 않음 (바깥 parsed()도 저장 안 함)
+            self._count("parse_incomplete")
+            return value
+        if meta.get("text_hash") != digest:
+            parsed = {}
+        parsed[key] = value
+        meta.update(url=url, text_hash=digest, parsed=parsed, checked_at=meta.get("checked_at", time.time()))
+        self._save(url, meta)
+        self._count("parse_miss")
+        return value
+
+    def incomplete(self):
+        """parse() 안에서 호출: 하위 요청 실패 등으로 결과가 불완전 → 이번 parsed() 결과는 저장하지 않음"""
+        self._local.incomplete = True
+
+    def prune(self, days: float = None) -> int:
+        """HTTP_CACHE_DAYS일 넘게 확인하지 않은 URL 삭제 → 삭제 수"""
+        days = HTTP_CACHE_DAYS if days is None else days
+        if not self.dir or not os.path.isdir(self.dir) or days <= 0:
+            return 0
+        cutoff = time.time() - days * 86400
+        removed = 0
+        for name in os.listdir(self.dir):
+            if not name.endswith(".json"):
+                continue
+            meta_file = os.path.join(self.dir, name)
+            try:
+                with open(meta_file, encoding="utf-8") as f:
+                    checked_at = json.load(f).get("checked_at", 0)
+            except (OSError, ValueError):
+                checked_at = 0
+            if checked_at < cutoff:
+                for path in (meta_file, meta_file[:-5] + ".body"):
+                    if os.path.exists(path):
+                        os.remove(path)
+                removed += 1
+        return removed
+
+    def reset_stats(self):
+        with self._lock:
+            self.run = Counter()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.run)
+
+http_cache = HttpCache()
+
+def transferred_bytes(res) -> int:
+    """실제 전송된 본문 크기 (304 → 캐시 본문으로 응답했으면 0)"""
+    return 0 if getattr(res, "from_cache", False) else len(res.content)
+
+# ----------------------------------------------------------
+# 📐 추출 규칙 (v13.8: URL 차단/404·오류 페이지/광고/키워드 제외 정규식을 한 곳에 선언 → 그룹별 1개 alternation)
+# ----------------------------------------------------------
+# 그룹: {"flags": i(대소문자 무시)/s(DOTALL), "memo": 입력별 결과 memo (짧은 URL/단어만), "rules": {규칙 이름: 정규식}}
+EXTRACTION_RULES = {
+    # v10.7: 네이버 목록 제목 링크 블랙리스트 (종목분석은 /item/ 허용 - PDF는 첨부 컬럼에 있음)
+    "list_url_block": {"memo": True, "rules": {
+        "chart": r"/chart/", "quote": r"/quote/", "news": r"/news/"}},
+    "list_url_block_stock": {"memo": True, "rules": {  # 종목분석이 아니면 추가 차단
+        "item": r"/item/", "frgn": r"/frgn/"}},
+    # Phase 1 (v11.0): 종목/차트 페이지 강력 차단 (PDF URL 선차단)
+    "pdf_blocked": {"flags": "i", "memo": True, "rules": {
+        "stock_page": r"/(?:item|chart|quote|news|frgn)/",   # 기존 패턴
+        "naver_item": r"finance\.naver\.com/item/",          # 네이버 종목 페이지
+        "frgn_page": r"\.frgn\.naver",                       # 외국인 페이지
+        "item_frgn": r"/item/frgn"}},                        # 종목 외국인 페이지
+    # v10.9: 404 페이지 감지 (Selenium 페이지 소스)
+    "html_404": {"rules": {
+        "not_found": r"페이지를 찾을 수 없습니다", "naver_notice": r"찾으시는 모든 정보", "http_404": r"404 Not Found"}},
+    # 본문으로 추출된 오류 페이지
+    "html_error": {"flags": "i", "rules": {
+        "wrong_address": r"방문하시려는 페이지의 주소가 잘못", "moved": r"페이지의 주소가 변경",
+        "deleted": r"삭제되었거나", "naver_home": r"네이버 :: 세상의 모든 지식"}},
+    # 광고/반복 문구가 본문의 대부분인 경우 (500자 미만에만 적용)
+    "html_ad": {"flags": "is", "rules": {
+        "naver_trading": r"네이버 주식거래연결.*빠른 주문.*도와드립니다",  # 연결된 광고 텍스트
+        "stub": r"^.{0,100}주석.*결론.*참고.*$"}},                       # 너무 짧은 반복 패턴
+    # 최장 태그 fallback에서 제외할 광고/네비게이션 블록
+    "html_noise": {"flags": "i", "rules": {
+        "navigation": r"목록|조회|신한투자증권 리서치 탐색기|네이버|삭제|오류|주식거래"}},
+    # 키워드 분석에서 제외할 단어 (날짜 관련 10월/2025/10.27 등, 숫자 전용)
+    "keyword_exclude": {"memo": True, "rules": {
+        "date": r"\d{1,2}월|\d{1,2}일|20\d{2}|\d{2}\.\d{2}|\d{4}\.\d{2}\.\d{2}",
+        "number": r"^\d+$"}},
+}
+
+class RuleSet:
+    """EXTRACTION_RULES를 그룹별 정규식 1개로 컴파일 (규칙마다 이름 있는 그룹) + 적중 규칙 계수
+
+    match(group, text)는 가장 왼쪽에서 적중한 규칙 이름을 반환 (없으면 ""). memo 그룹은 입력 문자열별 결과를
+    MEMO_MAX개까지 보관해 같은 URL/단어를 다시 검사하지 않는다.
+    """
+
+    MEMO_MAX = 50000
+    FLAGS = {"i": re.I, "s": re.S, "m": re.M}
+
+    def __init__(self, config: dict):
+        self._lock = threading.Lock()
+        self.groups = {}
+        self.memo = {}
+        self.counts = Counter()  # "그룹:규칙" → 적중 수
+        for group, spec in config.items():
+            flags = 0
+            for ch in spec.get("flags", ""):
+                flags |= self.FLAGS[ch]
+            names = list(spec["rules"])
+            pattern = "|".join(f"(?P<r{i}>{p})" for i, p in enumerate(spec["rules"].values()))
+            self.groups[group] = (re.compile(pattern, flags), names)
+            if spec.get("memo"):
+                self.memo[group] = {}
+
+    def match(self, group: str, text: str) -> str:
+        regex, names = self.groups[group]
+        cache = self.memo.get(group)
+        name = cache.get(text) if cache is not None else None
+        if name is None:
+            m = regex.search(text)
+            name = names[int(m.lastgroup[1:])] if m else ""
+            if cache is not None:
+                if len(cache) >= self.MEMO_MAX:
+                    cache.clear()
+                cache[text] = name
+        if name:
+            with self._lock:
+                self.counts[f"{group}:{name}"] += 1
+        return name
+
+    def reset_stats(self):
+        with self._lock:
+            self.counts = Counter()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts.most_common())
+
+rules = RuleSet(EXTRACTION_RULES)
+
+@functools.lru_cache(maxsize=8192)
+def absolute_url(base: str, href: str) -> str:
+    """urljoin memo (목록 페이지마다 같은 상대 경로가 반복됨)"""
+    return urljoin(base, href)
+
+# ----------------------------------------------------------
+# 🧩 HTML 파싱 (v13.9: lxml 파서 + 필요한 태그만 파싱(SoupStrainer) + 본문 선택자 XPath 빠른 경로)
+# ----------------------------------------------------------
+def parse_html(html: str, only=None) -> BeautifulSoup:
+    """HTML_PARSER로 파싱 (only: 이 태그(들)와 하위 트리만 파싱 - 목록 표/링크/meta만 필요한 경우)"""
+    strainer = None
+    if only:
+        from bs4 import SoupStrainer
+        strainer = SoupStrainer(only)
+    return BeautifulSoup(html, HTML_PARSER, parse_only=strainer)
+
+def lxml_document(html: str):
+    """본문 선택자 빠른 경로용 lxml.html 문서 (HTML_PARSER가 lxml이 아니거나 파싱 실패 시 None → BeautifulSoup)"""
+    if HTML_PARSER != "lxml" or not html:
+        return None
+    import lxml.html
+    try:
+        return lxml.html.document_fromstring(html)
+    except (ValueError, lxml.etree.ParserError):  # XML 인코딩 선언이 있는 str, 빈 문서
+        return None
+
+_SIMPLE_SELECTOR = re.compile(r"^([a-zA-Z][\w-]*)?(?:([.#])([\w-]+))?$")
+
+@functools.lru_cache(maxsize=256)
+def selector_xpath(selector: str):
+    """단순 CSS 선택자(tag, tag.class, tag#id, .class, #id) → 문서 순 첫 요소 XPath (그 외 선택자는 None)"""
+    m = _SIMPLE_SELECTOR.match(selector.strip())
+    if not m or not (m.group(1) or m.group(2)):
+        return None
+    from lxml import etree
+    tag, kind, name = m.groups()
+    path = "//" + (tag.lower() if tag else "*")
+    if kind == ".":
+        path += f"[contains(concat(' ', normalize-space(@class), ' '), ' {name} ')]"
+    elif kind == "#":
+        path += f"[@id='{name}']"
+    return etree.XPath(f"({path})[1]")
+
+def lxml_text(element, separator: str = "") -> str:
+    """lxml 요소 텍스트 - BeautifulSoup get_text(separator)와 같은 결과 (주석/script/style 제외)"""
+    from lxml import etree
+    parts = []
+    for event, node in etree.iterwalk(element, events=("start", "end", "comment", "pi")):
+        if event == "start":
+            if node.text and node.tag not in ("script", "style"):
+                parts.append(node.text)
+        elif node.tail and node is not element:  # end/comment/pi: 닫힌 뒤 이어지는 텍스트
+            parts.append(node.tail)
+    return separator.join(parts)
+
+# ----------------------------------------------------------
+# 1️⃣ 리포트 수집
+# ----------------------------------------------------------
+def _collect(reports, on_report=None) -> list:
+    """iter_reports() → 리스트 (on_report 콜백은 리포트 발견 즉시 호출)"""
+    collected = []
+    for report in reports:
+        collected.append(report)
+        if on_report:
+            on_report(report)
+    return collected
+
+# v13.1: 종목 리포트 제목의 "종목명(종목코드)" (한경) / 네이버 종목 링크의 code= 파라미터
+STOCK_IN_TITLE = re.compile(r"^\s*([^()\[\]]{1,30}?)\s*[\(（](\d{6})[\)）]")
+STOCK_CODE_IN_HREF = re.compile(r"code=(\d{6})")
+
+def stock_fields(title: str, stock_tag=None) -> dict:
+    """종목명/종목코드 (없으면 None) → 아카이브에서 종목별 조회에 사용"""
+    if stock_tag is not None:
+        m = STOCK_CODE_IN_HREF.search(stock_tag.get("href", ""))
+        if m:
+            return {"ticker": m.group(1), "stock": stock_tag.get("title") or stock_tag.get_text(strip=True)}
+    m = STOCK_IN_TITLE.match(title or "")
+    if m:
+        return {"ticker": m.group(2), "stock": m.group(1).strip()}
+    return {"ticker": None, "stock": None}
+
+def iter_unique(reports):
+    """(제목, 증권사) 기준 중복 제거 generator (v12.8: 키만 보관)"""
+    seen = set()
+    for report in reports:
+        key = (report["title"], report["company"])
+        if key not in seen:
+            seen.add(key)
+            yield report
+
+# v13.6: 본문 HTML 선택자 프로파일 (어댑터 기본값, 네이버 리포트 페이지 구조 기준)
+BODY_SELECTORS = [
+    "td.view_cnt",         # 네이버 리포트 본문 컨테이너 (핵심 선택자)
+    "div.view_cnt",        # div 형태의 본문 컨테이너
+    "td.view_content",     # 테이블 셀 본문 (경제/산업 분석 우선)
+    "table.view",          # 테이블 뷰
+    "div.view_con",        # 네이버 리포트 본문
+    "div.tb_view",         # 테이블 형식 추가
+    "div.article_view",
+    "div.article_view_con",
+    "section.article",     # 섹션 기반 본문
+    "div#articleBody",     # 본문 영역 ID
+    "div#wrap_view",       # 뷰 래퍼
+    "div#wrapContent",     # 컨텐츠 래퍼
+    "div#contentArea",     # 컨텐츠 영역
+    "div.article_body",    # 기사 본문
+    "div.end_body",        # 본문 끝 부분
+    "div.tb_type1",        # 테이블 형식
+    "div.tb_cont",         # 테이블 컨텐츠
+    "div.board_view",      # 게시판 형식
+    "article",
+    "div.content",
+    "#content"
+]
+# 증권사명 일부 → 기본 선택자 앞에 먼저 시도할 선택자
+COMPANY_SELECTORS = {
+    "신한": [
+        # 신한투자 특화 선택자 (우선순위 높게)
+        "div.view_cont",      # 신한투자 본문 컨테이너
+        "td.view_cont",       # 신한투자 테이블 셀
+        "div.article_content", # 기사 본문
+        "div.content_body",   # 본문 영역
+        "div#content_detail", # 상세 본문 ID
+        "div.report_view",    # 리포트 뷰
+        "div.article_view",   # 기사 뷰
+        # 네이버 표준 선택자
+        "td.view_cnt",
+        "div.view_cnt",
+        "td.view_content",
+        "table.view",
+        "div.view_con",
+        # 일반 선택자
+        "div.report-content",
+        "div.report-body",
+        "div.viewer-content",
+        "div.article-content",
+        "td.content",
+        "div.content",
+        "#articleBody",
+        "article"
+    ],
+}
+
+class SourceAdapter(abc.ABC):
+    """리포트 소스 어댑터 (v13.6: 사이트별 차이만 정의, 목록 수집/PDF 다운로드/본문 추출은 공용 엔진)
+
+    - 목록 URL: categories (카테고리 → 경로) + list_url()
+    - 행 파서: parse_list_page() → (리포트 리스트, 가장 오래된 행 날짜, 행 수) + has_more() (페이지 넘김 판단)
+    - PDF: pdf_patterns (whitelist) + normalize_pdf_url() / pdf_attempts() (다운로드 시도 순서)
+    - HTML: body_selectors / company_selectors (본문 선택자 프로파일)
+    - 예의 설정: host_limits (BRIEFING_HOST_LIMITS에 없을 때의 호스트 동시성), render (목록을 Selenium으로),
+      page_wait (렌더링 대기 초), timeout
+    새 증권사/사이트는 하위 클래스를 @register_source로 등록하고 BRIEFING_SOURCES에 이름을 추가하면 된다.
+    """
+
+    name = ""  # 레지스트리 키 (BRIEFING_SOURCES)
+    label = ""  # 리포트 "source" 값 / 로그 표시명
+    base_url = ""
+    categories = {}  # 카테고리 → 목록 경로 (카테고리를 행에서 읽는 사이트는 {"": 경로})
+    pdf_patterns = ()
+    body_selectors = BODY_SELECTORS
+    company_selectors = COMPANY_SELECTORS
+    host_limits = {}
+    render = False
+    page_wait = 0.0
+    timeout = 10
+
+    def __init__(self):
+        self._pdf_re = re.compile("|".join(self.pdf_patterns)) if self.pdf_patterns else None
+
+    def list_url(self, path: str, dates: list, page: int, max_pages: int) -> str:
+        return urljoin(self.base_url, path) + (f"?page={page}" if page > 1 else "")
+
+    def page_ok(self, html: str) -> bool:
+        """목록 페이지 정상 여부 (아니면 차단/오류 페이지로 보고 AIMD 제어기에 error 보고)"""
+        return "table" in html.lower()
+
+    @abc.abstractmethod
+    def parse_list_page(self, html: str, cat: str, dates: list) -> tuple:
+        """목록 페이지 HTML → (리포트 리스트, 가장 오래된 행 날짜 YYYY-MM-DD, 행 수) - 어댑터 필수 구현"""
+
+    def has_more(self, oldest: str, rows: int, earliest: str) -> bool:
+        """다음 목록 페이지를 볼지 (기본: 페이지의 가장 오래된 행이 아직 수집 범위 안)"""
+        return bool(oldest) and oldest >= earliest
+
+    def accepts_pdf(self, pdf_url: str) -> bool:
+        return self._pdf_re is not None and bool(self._pdf_re.search(pdf_url))
+
+    def normalize_pdf_url(self, pdf_url: str) -> str:
+        return pdf_url.strip()
+
+    def pdf_attempts(self, pdf_url: str) -> list:
+        """다운로드 시도 순서 (보정 URL 먼저, 원본 다음)"""
+        return list(dict.fromkeys([self.normalize_pdf_url(pdf_url), pdf_url.strip()]))
+
+    @classmethod
+    def selectors(cls, company: str = "") -> list:
+        for key, extra in cls.company_selectors.items():
+            if key in company:
+                log_html.debug("%s 리포트 감지 (company: %s)", key, company)
+                return extra + cls.body_selectors
+        return cls.body_selectors
+
+    def hosts(self) -> set:
+        return {urlparse(self.base_url).hostname, *self.host_limits}
+
+SOURCE_ADAPTERS = {}  # 이름 → 어댑터 (등록 순서 = 수집 순서)
+
+def register_source(cls):
+    """@register_source: 어댑터 등록 + 예의 설정의 호스트 동시성을 기본값으로 반영 (환경변수 값 우선)"""
+    adapter = cls()
+    SOURCE_ADAPTERS[adapter.name] = adapter
+    for host, limit in adapter.host_limits.items():
+        pools.host_limits.setdefault(host, limit)
+    return cls
+
+def source_for_url(url: str):
+    """URL 호스트를 담당하는 어댑터 (없으면 None)"""
+    host = urlparse(url or "").hostname or ""
+    for adapter in SOURCE_ADAPTERS.values():
+        if any(h and (host == h or host.endswith("." + h)) for h in adapter.hosts()):
+            return adapter
+    return None
+
+def source_for_pdf(pdf_url: str):
+    """PDF URL whitelist에 맞는 어댑터 (없으면 None → PDF로 인정하지 않음)"""
+    return next((a for a in SOURCE_ADAPTERS.values() if a.accepts_pdf(pdf_url)), None)
+
+@functools.lru_cache(maxsize=4096)
+def pdf_attempts(source: str, pdf_url: str) -> tuple:
+    """어댑터 PDF URL 보정/시도 순서 memo (v13.8: 같은 PDF를 캐시 확인/다운로드/재시도에서 반복 보정하지 않음)"""
+    return tuple(SOURCE_ADAPTERS[source].pdf_attempts(pdf_url))
+
+def body_selectors(url: str = "", company: str = "") -> list:
+    """URL 소스의 본문 선택자 프로파일 (소스를 모르면 기본 프로파일)"""
+    return (source_for_url(url) or SourceAdapter).selectors(company)
+
+@register_source
+class NaverSource(SourceAdapter):
+    name = "naver"
+    label = "네이버"
+    base_url = "https://finance.naver.com/research/"
+    categories = {
+        "투자정보": "invest_list.naver",
+        "종목분석": "company_list.naver",
+        "산업분석": "industry_list.naver",
+        "경제분석": "economy_list.naver"
+    }
+    pdf_patterns = (
+        r'stock\.pstatic\.net/stock-research/.*\.pdf',
+        r'pstatic\.net/stock-research/.*\.pdf',
+    )
+    host_limits = {"finance.naver.com": 2, "stock.pstatic.net": 4, "ssl.pstatic.net": 4}
+    render = True
+    page_wait = 3  # 로딩 대기 시간 증가
+
+    def list_url(self, path: str, dates: list, page: int, max_pages: int) -> str:
+        return self.base_url + path + (f"?&page={page}" if page > 1 else "")
+
+    def parse_list_page(self, html: str, cat: str, dates: list) -> tuple:
+        """목록 페이지 HTML → (리포트 리스트, 가장 오래된 행 날짜, 행 수) - 네트워크는 PDF 미첨부 행의 상세 조회뿐"""
+        reports = []
+        oldest = ""
+        soup = parse_html(html, only="table")  # v13.9: 행은 모두 표 안 - 헤더/메뉴/스크립트는 파싱 생략
+
+        # 다양한 선택자 시도
+        rows = soup.select("table.type_1 tbody tr")
+        if not rows:
+            rows = soup.select("table tbody tr")
+        if not rows:
+            rows = soup.select("tbody tr")
+        if not rows:
+            rows = soup.find_all("tr")
+
+        log_scrape.debug("%s: %d개 row 발견", cat, len(rows))
+        for i, row in enumerate(rows):
+            cols = row.find_all("td")
+            if len(cols) < 4:
+                continue
+
+            # 컬럼 구조 분석 (종목명, 제목, 증권사, 첨부, 작성일, 조회수)
+            # 제목은 보통 cols[0] 또는 cols[1]
+            title_tag = cols[0].find("a")
+            if not title_tag and len(cols) > 1:
+                title_tag = cols[1].find("a")
+
+            # 증권사는 보통 cols[1] 또는 cols[2]
+            company = cols[2].get_text(strip=True) if len(cols) > 2 else "N/A"
+            if not company or company == "":
+                company = cols[1].get_text(strip=True) if len(cols) > 1 else "N/A"
+
+            # 날짜 찾기: 뒤에서 두 번째 컬럼 (작성일)
+            date = ""
+            if len(cols) >= 6:  # 6개 컬럼: [종목명, 제목, 증권사, 첨부, 작성일, 조회수]
+                date = cols[4].get_text(strip=True)  # 작성일 (5번째, 0-indexed)
+            elif len(cols) >= 5:  # 5개 컬럼: [제목, 증권사, 첨부, 작성일, 조회수]
+                date = cols[3].get_text(strip=True)  # 작성일
+            else:
+                date = cols[-2].get_text(strip=True)  # 뒤에서 두 번째
+
+            # 디버그: 처음 5개 row 출력
+            if i < 5 and log_scrape.isEnabledFor(logging.DEBUG):
+                title_text = title_tag.get_text(strip=True)[:30] if title_tag else 'N/A'
+                log_scrape.debug("  - [%s] %s... (컬럼수: %d)", date, title_text, len(cols))
+
+            # 날짜 형식 통일 (공백, 특수문자 제거)
+            date_clean = date.replace(" ", "").replace(".", ".").strip()
+            row_date = normalize_date(date_clean)
+            if row_date and (not oldest or row_date < oldest):
+                oldest = row_date
+
+            # 날짜 필터
+            if date_clean not in dates:
+                continue
+            if not title_tag:
+                continue
+
+            # href 추출 및 검증
+            href = title_tag.get("href", "")
+            if not href or href == "#":
+                continue
+
+            # v10.7: 블랙리스트 방식으로 변경 (금지된 패턴만 차단)
+            # 종목분석은 /item/ 허용 (종목 페이지로 링크가 가더라도 PDF는 첨부 컬럼에 있음)
+            # v13.8: 규칙은 EXTRACTION_RULES의 list_url_block(_stock)
+            if rules.match("list_url_block", href) or (cat != "종목분석" and rules.match("list_url_block_stock", href)):
+                # 종목/차트 페이지는 스킵하되 로그 출력
+                if i < 3:  # 처음 3개만 디버그 출력
+                    log_scrape.debug("금지된 URL 패턴 감지, 스킵: %.60s...", href)
+                continue
+
+            # v10.8: 종목분석 카테고리 필터 제거
+            # (종목분석은 /item/ 링크를 허용하고, PDF는 첨부 컬럼에서 직접 찾음)
+
+            # v10.4: URL 정규화 (urljoin으로 절대 경로 강제 변환)
+            detail_url = absolute_url("https://finance.naver.com", href)
+
+            # PDF URL 추출: 목록에서 직접 찾기 (V9.3 방식)
+            pdf_url = None
+            try:
+                # 모든 컬럼 순회하며 PDF 링크 찾기
+                for col_idx, col in enumerate(cols):
+                    # 1. <a> 태그에서 href 찾기
+                    pdf_link = col.find("a", href=re.compile(r"\.pdf|download|filekey|attach|report|view", re.IGNORECASE))
+                    if pdf_link:
+                        href = pdf_link.get("href", "")
+                        if href:
+                            pdf_url = absolute_url("https://finance.naver.com", href)
+                            log_scrape.debug("첨부 링크 발견 (컬럼 %d): %.80s", col_idx, pdf_url)
+                            break
+
+                    # 2. 이미지 alt/title에서 PDF 확인
+                    img = col.find("img")
+                    if img and ("pdf" in (img.get("alt", "") + img.get("title", "")).lower()):
+                        # 부모 <a> 찾기
+                        parent_a = col.find("a")
+                        if parent_a:
+                            href = parent_a.get("href", "")
+                            if href:
+                                pdf_url = absolute_url("https://finance.naver.com", href)
+                                log_scrape.debug("첨부 이미지 발견 (컬럼 %d): %.80s", col_idx, pdf_url)
+                                break
+
+                    # 3. svg 아이콘 확인
+                    svg = col.find("svg")
+                    if svg:
+                        parent_a = col.find("a")
+                        if parent_a:
+                            href = parent_a.get("href", "")
+                            if href and (".pdf" in href.lower() or "download" in href.lower() or "filekey" in href.lower()):
+                                pdf_url = absolute_url("https://finance.naver.com", href)
+                                log_scrape.debug("첨부 아이콘 발견 (컬럼 %d): %.80s", col_idx, pdf_url)
+                                break
+
+                # 신한투자증권 리포트 체크: PDF가 없으면 상세 페이지 본문만 사용
+                if not pdf_url and "신한" in company:
+                    # v10.7: URL 유효성 체크 후 리포트 수집 (스킵 제거)
+                    if not detail_url or ("read.naver" not in detail_url and "/research/" not in detail_url):
+                        log_scrape.info("신한투자증권 리포트: URL 유효하지 않음 (PDF/HTML 모두 시도)")
                     else:
-                        date = cols[-2].get_text(strip=True)  # 뒤에서 두 번째
-                    
-                    # 디버그: 처음 5개 row 출력
-                    if i < 5:
-                        title_text = title_tag.get_text(strip=True)[:30] if title_tag else 'N/A'
-                        print(f"   - [{date}] {title_text}... (컬럼수: {len(cols)})")
-                    
-                    # 날짜 형식 통일 (공백, 특수문자 제거)
-                    date_clean = date.replace(" ", "").replace(".", ".").strip()
-                    
-                    # 날짜 필터
-                    if date_clean not in target_dates:
-                        continue
-                    if not title_tag:
-                        continue
-                    
-                    # href 추출 및 검증
-                    href = title_tag.get("href", "")
-                    if not href or href == "#":
-                        continue
-                    
-                    # v10.7: 블랙리스트 방식으로 변경 (금지된 패턴만 차단)
-                    # 종목분석은 /item/ 허용 (종목 페이지로 링크가 가더라도 PDF는 첨부 컬럼에 있음)
-                    excluded_patterns = ["/chart/", "/quote/", "/news/"]  # /item/, /frgn/ 제거
-                    if cat != "종목분석":  # 종목분석이 아니면 /item/도 차단
-                        excluded_patterns.append("/item/")
-                        excluded_patterns.append("/frgn/")
-
-                    if any(pattern in href for pattern in excluded_patterns):
-                        # 종목/차트 페이지는 스킵하되 로그 출력
-                        if i < 3:  # 처음 3개만 디버그 출력
-                            print(f"      [DEBUG] 금지된 URL 패턴 감지, 스킵: {href[:60]}...")
-                        continue
-                    
-                    # v10.8: 종목분석 카테고리 필터 제거
-                    # (종목분석은 /item/ 링크를 허용하고, PDF는 첨부 컬럼에서 직접 찾음)
+                        log_scrape.info("신한투자증권 리포트: 상세 페이지 본문만 사용 (PDF URL 없음)")
+                    log_scrape.warning("PDF URL 없음: %.30s...", title_tag.get_text(strip=True))
 
-                    # v10.4: URL 정규화 (urljoin으로 절대 경로 강제 변환)
-                    detail_url = urljoin("https://finance.naver.com", href)
-                    
-                    # PDF URL 추출: 목록에서 직접 찾기 (V9.3 방식)
-                    pdf_url = None
-                    try:
-                        # 모든 컬럼 순회하며 PDF 링크 찾기
-                        for col_idx, col in enumerate(cols):
-                            # 1. <a> 태그에서 href 찾기
-                            pdf_link = col.find("a", href=re.compile(r"\.pdf|download|filekey|attach|report|view", re.IGNORECASE))
-                            if pdf_link:
-                                href = pdf_link.get("href", "")
-                                if href:
-                                    pdf_url = urljoin("https://finance.naver.com", href)
-                                    print(f"      [DEBUG PDF] 첨부 링크 발견 (컬럼 {col_idx})")
-                                    print(f"      [DEBUG PDF] 목록에서 PDF 링크 발견: {pdf_url[:80]}...")
-                                    break
-                            
-                            # 2. 이미지 alt/title에서 PDF 확인
-                            img = col.find("img")
-                            if img and ("pdf" in (img.get("alt", "") + img.get("title", "")).lower()):
-                                # 부모 <a> 찾기
-                                parent_a = col.find("a")
-                                if parent_a:
-                                    href = parent_a.get("href", "")
-                                    if href:
-                                        pdf_url = urljoin("https://finance.naver.com", href)
-                                        print(f"      [DEBUG PDF] 첨부 이미지 발견 (컬럼 {col_idx})")
-                                        print(f"      [DEBUG PDF] 목록에서 PDF 링크 발견: {pdf_url[:80]}...")
-                                        break
-                            
-                            # 3. svg 아이콘 확인
-                            svg = col.find("svg")
-                            if svg:
-                                parent_a = col.find("a")
-                                if parent_a:
-                                    href = parent_a.get("href", "")
-                                    if href and (".pdf" in href.lower() or "download" in href.lower() or "filekey" in href.lower()):
-                                        pdf_url = urljoin("https://finance.naver.com", href)
-                                        print(f"      [DEBUG PDF] 첨부 아이콘 발견 (컬럼 {col_idx})")
-                                        print(f"      [DEBUG PDF] 목록에서 PDF 링크 발견: {pdf_url[:80]}...")
-                                        break
-                        
-                        # 신한투자증권 리포트 체크: PDF가 없으면 상세 페이지 본문만 사용
-                        if not pdf_url and "신한" in company:
-                            # v10.7: URL 유효성 체크 후 리포트 수집 (스킵 제거)
-                            if not detail_url or ("read.naver" not in detail_url and "/research/" not in detail_url):
-                                print(f"      [INFO] 신한투자증권 리포트: URL 유효하지 않음 (PDF/HTML 모두 시도)")
-                            else:
-                                print(f"      [INFO] 신한투자증권 리포트: 상세 페이지 본문만 사용 (PDF URL 없음)")
-                            print(f"      [WARN] PDF URL 없음: {title_tag.get_text(strip=True)[:30]}...")
-                        
-                        # PDF가 없는 경우 상세 페이지에서 추가 시도
-                        if not pdf_url:
-                            try:
-                                d_res = requests.get(detail_url, headers=HEADERS, timeout=5)
-                                d_soup = BeautifulSoup(d_res.text, "html.parser")
-                                
-                                # 다양한 패턴 시도
-                                pdf_btn = d_soup.find("a", href=re.compile(r"download|view|filekey|attach|\.pdf", re.IGNORECASE))
-                                if not pdf_btn:
-                                    pdf_btn = d_soup.find("a", string=re.compile("리포트보기|PDF|다운로드|보기", re.IGNORECASE))
-                                if not pdf_btn:
-                                    pdf_btn = d_soup.find("a", class_=re.compile("pdf|download|report", re.IGNORECASE))
-                                
-                                if pdf_btn:
-                                    pdf_href = pdf_btn.get("href", "")
-                                    if pdf_href.startswith("http"):
-                                        pdf_url = pdf_href
-                                    elif pdf_href.startswith("/"):
-                                        pdf_url = "https://finance.naver.com" + pdf_href
-                                    else:
-                                        pdf_url = "https://finance.naver.com/" + pdf_href
-                                    print(f"      [DEBUG PDF] 상세 페이지에서 PDF 발견: {pdf_url[:80]}...")
-                            except:
-                                pass
+                # PDF가 없는 경우 상세 페이지에서 추가 시도
+                if not pdf_url:
+                    try:
+                        with metrics.stage("detail_fetch"):
+                            d_res = http_cache.get(detail_url, headers=HEADERS, timeout=5)  # v14.0: 조건부 GET
+                        metrics.add_bytes("detail_fetch", transferred_bytes(d_res))
+                        d_res.raise_for_status()  # 오류 페이지는 "PDF 없음"으로 저장하지 않음
+                        pdf_href = http_cache.parsed(detail_url, d_res.text, "pdf_href",
+                                                     lambda: self.detail_pdf_href(d_res.text))
+
+                        if pdf_href is not None:
+                            if pdf_href.startswith("http"):
+                                pdf_url = pdf_href
+                            elif pdf_href.startswith("/"):
+                                pdf_url = "https://finance.naver.com" + pdf_href
+                            else:
+                                pdf_url = "https://finance.naver.com/" + pdf_href
+                            log_scrape.debug("상세 페이지에서 PDF 발견: %.80s...", pdf_url)
                     except Exception as e:
-                        pdf_url = None
-                    
-                    # v11.1: PDF가 없으면 detail_url을 HTML 소스로 사용 (HTML fallback)
-                    # URL 유효성 검사
+                        # 상세 조회 실패로 pdf_url이 빠진 행 → 이 목록 페이지 파싱 결과는 캐시하지 않음 (v14.0)
+                        http_cache.incomplete()
+                        log_scrape.debug("상세 페이지 조회 실패: %s", e)
+            except Exception as e:
+                pdf_url = None
+
+            # v11.1: PDF가 없으면 detail_url을 HTML 소스로 사용 (HTML fallback)
+            # URL 유효성 검사
+            valid_url = detail_url
+            if not detail_url or not detail_url.startswith("http"):
+                valid_url = None
+
+            # PDF가 없는 경우, HTML URL로 사용 (신한투자 등 HTML 리포트 대응)
+            if not pdf_url:
+                # detail_url을 HTML URL로 사용
+                if detail_url and ("read.naver" in detail_url or "/research/" in detail_url):
                     valid_url = detail_url
-                    if not detail_url or not detail_url.startswith("http"):
-                        valid_url = None
-                    
-                    # PDF가 없는 경우, HTML URL로 사용 (신한투자 등 HTML 리포트 대응)
-                    if not pdf_url:
-                        # detail_url을 HTML URL로 사용
-                        if detail_url and ("read.naver" in detail_url or "/research/" in detail_url):
-                            valid_url = detail_url
-                        elif valid_url and "/item/" in valid_url:
-                            # /item/은 종목 페이지이므로 제외
-                            valid_url = None
-                    else:
-                        # PDF가 있으면 /item/ 패턴 제외
-                        if valid_url and "/item/" in valid_url:
-                            valid_url = None
-                    
-                    reports.append({
-                        "source": "네이버",
-                        "category": cat,
-                        "title": title_tag.get_text(strip=True),
-                        "company": company,
-                        "date": date,
-                        "url": valid_url,
-                        "pdf_url": pdf_url
-                    })
-                print(f"   [OK] {cat}: {len([r for r in reports if r['category'] == cat])}개 수집 완료")
-                time.sleep(1)
+                elif valid_url and "/item/" in valid_url:
+                    # /item/은 종목 페이지이므로 제외
+                    valid_url = None
+            else:
+                # PDF가 있으면 /item/ 패턴 제외
+                if valid_url and "/item/" in valid_url:
+                    valid_url = None
+
+            reports.append({
+                "source": self.label,
+                "category": cat,
+                "title": title_tag.get_text(strip=True),
+                "company": company,
+                "date": date,
+                "url": valid_url,
+                "pdf_url": pdf_url,
+                **stock_fields(title_tag.get_text(strip=True), cols[0].find("a", href=STOCK_CODE_IN_HREF))
+            })
+        return reports, oldest, len(rows)
+
+    def detail_pdf_href(self, html: str):
+        """상세 페이지 HTML → PDF 버튼 href (버튼 없으면 None, v14.0: 파싱 결과를 http_cache에 저장하도록 분리)"""
+        d_soup = parse_html(html, only="a")  # v13.9: 링크만 파싱
+
+        # 다양한 패턴 시도
+        pdf_btn = d_soup.find("a", href=re.compile(r"download|view|filekey|attach|\.pdf", re.IGNORECASE))
+        if not pdf_btn:
+            pdf_btn = d_soup.find("a", string=re.compile("리포트보기|PDF|다운로드|보기", re.IGNORECASE))
+        if not pdf_btn:
+            pdf_btn = d_soup.find("a", class_=re.compile("pdf|download|report", re.IGNORECASE))
+        return pdf_btn.get("href", "") if pdf_btn else None
+
+    def normalize_pdf_url(self, pdf_url: str) -> str:
+        """URL 파라미터 제거 + 잘린 확장자 보정 (`.p` → `.pdf` 자동 추가)"""
+        # URL 파라미터 제거 (query string, fragment 제거) + 공백 제거 (중요!)
+        stripped = pdf_url.split("?")[0].split("#")[0].strip()
+        if not stripped or stripped.lower().endswith(".pdf"):
+            return stripped
+        # URL이 잘린 경우 (.p 또는 .pd로 끝나는 경우)
+        if stripped.endswith(".p"):
+            return stripped[:-1] + "pdf"  # .p → .pdf (버그 수정)
+        if stripped.endswith(".pd"):
+            return stripped[:-2] + "pdf"  # .pd → .pdf
+        # pstatic URL 패턴 특별 처리 (점으로 끝나지 않는 경우만)
+        if "pstatic.net" in stripped and not stripped.endswith("."):
+            return stripped + ".pdf"
+        # 숫자로 끝나는 URL에도 .pdf 자동 추가
+        if re.search(r'/\d+$', stripped):
+            return stripped + ".pdf"
+        return stripped
+
+    def pdf_attempts(self, pdf_url: str) -> list:
+        """보정 URL → 원본 URL → (확장자 없으면) .pdf 추가 순서"""
+        stripped = pdf_url.split("?")[0].split("#")[0].strip()
+        attempts = [self.normalize_pdf_url(pdf_url), stripped]
+        if not stripped.endswith((".pdf", ".p", ".pd")):
+            attempts.append(stripped + ".pdf")
+        return list(dict.fromkeys(attempts))
+
+@register_source
+class HankyungSource(SourceAdapter):
+    name = "hankyung"
+    label = "한경컨센서스"
+    base_url = "https://consensus.hankyung.com"
+    categories = {"": "/analysis/list"}  # 카테고리는 행의 분류 컬럼
+    # 첨부 파일(.pdf)과 다운로드 링크(/analysis/downpdf?report_idx=...) 모두 PDF
+    pdf_patterns = (
+        r'consensus\.hankyung\.com/.*\.pdf',
+        r'consensus\.hankyung\.com/analysis/downpdf\?',
+    )
+    host_limits = {"consensus.hankyung.com": 2}
+
+    def list_url(self, path: str, dates: list, page: int, max_pages: int) -> str:
+        """max_pages > 1이면 dates 범위(sdate~edate)로 검색해 페이지 넘김 (v12.6)"""
+        url = self.base_url + path
+        normalized = sorted(d for d in map(normalize_date, dates) if d)
+        if max_pages > 1 and normalized:
+            url = (f"{url}?sdate={normalized[0]}&edate={normalized[-1]}"
+                   f"&now_page={page}&pagenum=80")
+        return url
+
+    def page_ok(self, html: str) -> bool:
+        return True  # 빈 검색 결과도 정상 페이지 (행 수 0 → 페이지 넘김 종료)
+
+    def has_more(self, oldest: str, rows: int, earliest: str) -> bool:
+        return rows > 0  # 날짜 범위로 검색하므로 행이 없을 때까지
+
+    def parse_list_page(self, html: str, cat: str, dates: list) -> tuple:
+        """목록 페이지 HTML → (리포트 리스트, 가장 오래된 행 날짜, 행 수)"""
+        reports = []
+        oldest = ""
+        soup = parse_html(html, only="table")
+        rows = soup.select("table tbody tr")
+        log_scrape.debug("한경: %d개 row 발견", len(rows))
+        row_count = 0
+        for row in rows:
+            cols = row.find_all("td")
+            if len(cols) < 4:
+                continue
+            row_count += 1
+            date_raw = cols[3].get_text(strip=True)
+            # 날짜 형식 통일 (YYYY-MM-DD → YYYY.MM.DD, YY-MM-DD → YY.MM.DD)
+            date = date_raw.replace("-", ".")
+            row_date = normalize_date(date)
+            if row_date and (not oldest or row_date < oldest):
+                oldest = row_date
+            # 날짜 필터: target_dates 목록에 있는 날짜만 수집
+            if date not in dates:
+                continue
+            title_tag = cols[0].find("a")
+            if not title_tag:
+                continue
+            url = absolute_url(self.base_url, title_tag["href"])
+            pdf_tag = row.find("a", href=re.compile(r"\.pdf$|downpdf"))
+            pdf_url = absolute_url(self.base_url, pdf_tag["href"]) if pdf_tag else None
+            if not pdf_url and self.accepts_pdf(url):
+                pdf_url = url  # 제목 링크가 곧 PDF 다운로드
+            reports.append({
+                "source": self.label,
+                "category": cols[2].get_text(strip=True),
+                "title": title_tag.get_text(strip=True),
+                "company": cols[1].get_text(strip=True),
+                "date": date,
+                "url": url,
+                "pdf_url": pdf_url,
+                **stock_fields(title_tag.get_text(strip=True))
+            })
+        return reports, oldest, row_count
+
+class SourceScraperTool(BaseTool):
+    """등록된 소스 어댑터 1개로 리포트를 수집하는 공용 엔진 (v13.6)
+
+    목록 페이지 요청(Selenium 또는 http_get, 모두 호스트 슬롯/AIMD 적용) → 어댑터 행 파서 → 페이지 넘김 판단
+    """
+    name: str = "Source Scraper Tool"
+    description: str = "소스 어댑터 기반 리포트 수집"
+    source: str = ""
+    last_page_oldest: str = ""  # v12.6: 마지막 페이지의 가장 오래된 행 날짜 (YYYY-MM-DD)
+    last_page_rows: int = 0  # v12.6: 마지막 페이지의 리포트 행 수
+
+    def __init__(self, source: str = ""):
+        if source:
+            self.source = source
+            self.name = f"{SOURCE_ADAPTERS[source].label} Scraper Tool"
+
+    @property
+    def adapter(self) -> SourceAdapter:
+        return SOURCE_ADAPTERS[self.source]
+
+    def _run(self, on_report=None, dates=None, max_pages: int = 1) -> str:
+        """리포트 수집 (v11.7: on_report 콜백이 주어지면 리포트 발견 즉시 전달, v12.2: dates 명시 가능)
+
+        v12.6: max_pages > 1이면 목록을 다음 페이지로 넘기며 수집 (어댑터의 has_more가 거짓이면 중단)
+        """
+        return str(_collect(self.iter_reports(dates=dates, max_pages=max_pages), on_report))
+
+    def iter_reports(self, dates=None, max_pages: int = 1):
+        """리포트를 목록 페이지 단위로 yield (v12.8: 전체 목록을 모으지 않음 - 백필 메모리 상한)"""
+        adapter = self.adapter
+        dates = dates or target_dates
+        earliest = min((normalize_date(d) for d in dates if normalize_date(d)), default="")
+        per_category = Counter()
+        driver = create_selenium_driver() if adapter.render else None
+        log_scrape.info("%s 수집 시작 - 날짜: %s", adapter.label, dates[:3])
+        try:
+            for cat, path in adapter.categories.items():
+                # 카테고리 단위로 실패 격리 - 한 카테고리 목록 오류가 나머지 카테고리 수집을 막지 않음
+                try:
+                    for page in range(1, max_pages + 1):
+                        url = adapter.list_url(path, dates, page, max_pages)
+                        log_scrape.debug("%s 페이지 접속: %s", cat or adapter.label, url)
+                        html = self._fetch_list_page(url, driver)
+                        if not html:
+                            log_scrape.warning("%s: 페이지 소스에 'table' 없음", cat or adapter.label)
+                            self.last_page_oldest, self.last_page_rows = "", 0
+                            break
+
+                        # v12.1: 행 파싱을 별도 메서드로 분리 (bench_parsing.py 마이크로벤치마크 대상)
+                        page_reports = self._parse_list_page(html, cat, dates=dates, url=url)
+                        per_category[cat] += len(page_reports)
+                        if cat:
+                            log_scrape.info("[OK] %s%s: %d개 수집 완료", cat, f" p{page}" if page > 1 else "",
+                                            per_category[cat])
+                        yield from page_reports
+                        if not adapter.has_more(self.last_page_oldest, self.last_page_rows, earliest):
+                            break  # 이미 범위 밖(더 오래된 날짜)에 도달했거나 행이 없음
+                except Exception as e:
+                    metrics.failure("list_fetch", type(e).__name__)
+                    log_scrape.warning("%s 수집 실패: %s", cat or adapter.label, e)
+                    self.last_page_oldest, self.last_page_rows = "", 0
         finally:
-            driver.quit()
-        print(f"[OK] 네이버: {len(reports)}개 수집 완료")
-        return str(reports)
+            if driver is not None:
+                driver.quit()
+        log_scrape.info("[OK] %s: %d개 수집 완료", adapter.label, sum(per_category.values()))
+
+    def _fetch_list_page(self, url: str, driver=None) -> str:
+        """목록 페이지 1개 → HTML (차단/오류 페이지면 빈 문자열)
+
+        v12.5: 고정 대기 대신 호스트별 AIMD 제어기의 슬롯/요청 간격 적용 (렌더링 대기는 어댑터 page_wait)
+        """
+        adapter = self.adapter
+        fetch_start = time.perf_counter()
+        if driver is not None:
+            with pools.host(url) as outcome:
+                driver.get(url)
+                time.sleep(adapter.page_wait)
+                html = driver.page_source
+                if not adapter.page_ok(html):
+                    outcome.status = "error"  # 차단/오류 페이지로 간주 → 동시성 축소, 요청 간격 확대
+            size = len(html.encode("utf-8"))
+        else:
+            res = http_cache.get(url, headers=HEADERS, timeout=adapter.timeout)  # v14.0: 조건부 GET
+            html, size = res.text, transferred_bytes(res)
+        metrics.record("list_fetch", time.perf_counter() - fetch_start, size)
+        return html if adapter.page_ok(html) else ""
+
+    def _parse_list_page(self, html: str, cat: str = "", dates=None, on_report=None, url: str = "") -> list:
+        """목록 페이지 HTML → 리포트 리스트 (v12.1: _run에서 분리, 행 파서는 어댑터)
 
-class HankyungScraperTool(BaseTool):
+        v12.6: 페이지의 가장 오래된 행 날짜/행 수를 last_page_oldest/last_page_rows에 기록 (페이지 넘김 판단)
+        v14.0: url이 주어지면 지난번과 같은 HTML은 다시 파싱하지 않음 (http_cache.parsed - 상세 조회도 생략)
+        """
+        dates = dates or target_dates
+        reports, self.last_page_oldest, self.last_page_rows = http_cache.parsed(
+            url, html, f"{self.source}|{cat}|{','.join(dates)}",
+            lambda: self.adapter.parse_list_page(html, cat, dates))
+        if on_report:
+            for report in reports:
+                on_report(report)
+        return reports
+
+class NaverResearchScraperTool(SourceScraperTool):
+    name: str = "Naver Research Scraper Tool"
+    description: str = "네이버 금융 리서치 리포트 수집"
+    source: str = "naver"
+
+class HankyungScraperTool(SourceScraperTool):
     name: str = "Hankyung Scraper Tool"
     description: str = "한경 컨센서스 리포트 수집"
-    
-    def _run(self) -> str:
-        """한경컨센서스 리포트 수집"""
-        url = "https://consensus.hankyung.com/analysis/list"
-        reports = []
-        print(f"[DEBUG] 한경 수집 시작 - 검색 날짜: {target_dates[:3]}")
-        try:
-            res = requests.get(url, headers=HEADERS, timeout=10)
-            soup = BeautifulSoup(res.text, "html.parser")
-            rows = soup.select("table tbody tr")
-            print(f"[DEBUG] 한경: {len(rows)}개 row 발견")
-            row_count = 0
-            collected_count = 0
-            for row in rows:
-                cols = row.find_all("td")
-                if len(cols) < 4: 
-                    continue
-                date_raw = cols[3].get_text(strip=True)
-                # 날짜 형식 통일 (YYYY-MM-DD → YYYY.MM.DD, YY-MM-DD → YY.MM.DD)
-                date = date_raw.replace("-", ".")
-                # 날짜 필터: target_dates 목록에 있는 날짜만 수집
-                if date not in target_dates:
-                    continue
-                title_tag = cols[0].find("a")
-                if not title_tag:
-                    continue
-                pdf_tag = row.find("a", href=re.compile(r"\.pdf$"))
-                pdf_url = "https://consensus.hankyung.com" + pdf_tag["href"] if pdf_tag else None
-                reports.append({
-                    "source": "한경컨센서스",
-                    "category": cols[2].get_text(strip=True),
-                    "title": title_tag.get_text(strip=True),
-                    "company": cols[1].get_text(strip=True),
-                    "date": date,
-                    "url": "https://consensus.hankyung.com" + title_tag["href"],
-                    "pdf_url": pdf_url
-                })
-                collected_count += 1
-                time.sleep(0.5)
-            print(f"   [OK] 한경: {collected_count}개 수집 완료")
-        except Exception as e:
-            print(f"⚠️ 한경 수집 실패: {e}")
-        return str(reports)
+    source: str = "hankyung"
+
+def source_tools() -> list:
+    """BRIEFING_SOURCES 순서대로 수집 도구 (등록되지 않은 이름은 경고 후 제외)"""
+    tools = []
+    for name in SOURCES:
+        if name not in SOURCE_ADAPTERS:
+            log_scrape.warning("등록되지 않은 소스: %s (등록: %s)", name, ", ".join(SOURCE_ADAPTERS))
+            continue
+        tools.append(SourceScraperTool(name))
+    return tools
 
 # ----------------------------------------------------------
 # 2️⃣ 키워드 분석 (날짜 제외)
 # ----------------------------------------------------------
+class ReportAnalyzer:
+    """리포트를 1건씩 받아 키워드/카테고리 집계 (v12.8: DataFrame 대신 누적 카운터 - 리포트 목록을 보관하지 않음)"""
+    
+    WORD_PATTERN = re.compile(r"[가-힣A-Za-z0-9]{2,12}")
+    # 날짜 관련 키워드(10월, 2025 등)/숫자 전용 단어 제외는 EXTRACTION_RULES의 keyword_exclude (v13.8)
+    
+    def __init__(self, tag_entities: bool = True):
+        now = datetime.now()
+        self.tag_entities = tag_entities  # v13.5: 제목 종목 태깅 (아카이브 키워드 재계산 시에는 생략)
+        self.stop_words = {
+            "리포트", "분석", "전망", "투자", "경제", "산업", "이슈",
+            str(now.day), str(now.month), str(now.year), f"{now.month}월", "2025", "25", "24", "10", "26",
+            "Weekly", "Preview", "Monitor", "Daily", "주간", "주차", "일보",
+            "China", "Weekly", "3Q25", "4주차", "10월", "11월", "12월"
+        }
+        self.keywords = Counter()
+        self.categories = Counter()
+        self.stocks = Counter()
+        self.seen = set()
+        self.days = {}  # 날짜(YYYY-MM-DD) → [키워드 Counter, 리포트 수] (아카이브 키워드 색인용, 발견한 리포트 전체)
+    
+    def add(self, report: dict) -> bool:
+        """리포트 1건 집계 (중복이면 False)"""
+        key = (report["title"], report["company"])
+        if key in self.seen:
+            return False
+        self.seen.add(key)
+        self.categories[report["category"]] += 1
+        if self.tag_entities:
+            # v13.5: 리포트에 대표 종목코드 목록을 붙이고 종목별 리포트 수 집계
+            report["tickers"] = report.get("tickers") or entity_index.tag(report)
+            self.stocks.update(report["tickers"][:1])
+        words = [
+            w for w in self.WORD_PATTERN.findall(report["title"])
+            if w not in self.stop_words
+            and not rules.match("keyword_exclude", w)  # 날짜/순수 숫자 제외
+            and len(w) >= 2
+            and w.isalnum()  # 영문자/한글만 허용
+        ]
+        self.keywords.update(words)
+        day = normalize_date(report.get("date", ""))
+        if day:
+            entry = self.days.setdefault(day, [Counter(), 0])
+            entry[0].update(words)
+            entry[1] += 1
+        return True
+    
+    def result(self, day: str = None) -> dict:
+        """집계 결과 (v13.2: 아카이브 키워드 색인이 있으면 day 기준 추세 포함)"""
+        result = {
+            "total_reports": len(self.seen),
+            "top_keywords": ", ".join([f"{k}({v}회)" for k, v in self.keywords.most_common(10)]),
+            "category_summary": dict(self.categories.most_common()),
+        }
+        if self.stocks:
+            result["top_stocks"] = ", ".join(f"{entity_index.name(t)}({v}건)" for t, v in self.stocks.most_common(10))
+        trends = archive.keyword_trends(day or today_file, self.keywords, len(self.seen))
+        if trends.get("baseline_days", 0) >= TREND_MIN_DAYS:
+            result["keyword_trends"] = trends
+            result["trend_keywords"] = format_trends(trends)
+        return result
+
+def format_trends(trends: dict) -> str:
+    """추세 → 한 줄 ("급증: 반도체(12회, z 3.1, 5일 대비 2.4배) / 신규: ... / 이탈: ...")"""
+    parts = []
+    if trends.get("rising"):
+        parts.append("급증: " + ", ".join(f"{r['keyword']}({r['count']}회, z {r['z']}, "
+                                            f"{TREND_SHORT_DAYS}일 대비 {r['lift']}배)" for r in trends["rising"]))
+    if trends.get("new"):
+        parts.append("신규: " + ", ".join(f"{r['keyword']}({r['count']}회)" for r in trends["new"]))
+    if trends.get("dropped"):
+        parts.append("이탈: " + ", ".join(f"{r['keyword']}(평소 {r['expected']}회)" for r in trends["dropped"]))
+    return " / ".join(parts) or "특이 변화 없음"
+
 class PythonAnalyzerTool(BaseTool):
     name: str = "Python Analyzer Tool"
     description: str = "리포트 제목 기반 키워드/카테고리 분석"
     
     def _run(self, reports_str: str) -> str:
-        """키워드 및 카테고리 분석"""
+        """키워드 및 카테고리 분석
+        
+        v12.8: ReportAnalyzer로 집계, 결과에 리포트 전체 목록(reports)은 포함하지 않음 (단계 간 문자열 축소)
+        """
         try:
-            reports = eval(reports_str)
-            df = pd.DataFrame(reports).drop_duplicates(subset=["title", "company"])
-            
-            # 단어 추출
-            words = sum([re.findall(r"[가-힣A-Za-z0-9]{2,12}", t) for t in df["title"]], [])
-            
-            # 날짜 관련 키워드 제외 (10, 24, 26, 10월, 2025 등)
-            today = datetime.now().day
-            month = datetime.now().month
-            year = datetime.now().year
-            date_pattern = re.compile(r"(\d{1,2}월|\d{1,2}일|20\d{2}|\d{2}\.\d{2}|\d{4}\.\d{2}\.\d{2})")
-            
-            # 숫자 전용 패턴 (모든 숫자 제외)
-            number_pattern = re.compile(r'^\d+$')
-            
-            stop_words = {
-                "리포트", "분석", "전망", "투자", "경제", "산업", "이슈",
-                str(today), str(month), str(year), f"{month}월", "2025", "25", "24", "10", "26",
-                "Weekly", "Preview", "Monitor", "Daily", "주간", "주차", "일보",
-                "China", "Weekly", "3Q25", "4주차", "10월", "11월", "12월"
-            }
-            
-            filtered_words = [
-                w for w in words
-                if w not in stop_words 
-                and not date_pattern.search(w) 
-                and not number_pattern.match(w)  # 순수 숫자 제외
-                and len(w) >= 2
-                and w.isalnum()  # 영문자/한글만 허용
-            ]
-            
-            counter = Counter(filtered_words)
-            
-            result = {
-                "total_reports": len(df),
-                "top_keywords": ", ".join([f"{k}({v}회)" for k, v in counter.most_common(10)]),
-                "category_summary": df["category"].value_counts().to_dict(),
-                "reports": df.to_dict("records")  # 리포트 전체 정보 포함
-            }
+            analyzer = ReportAnalyzer()
+            for report in eval(reports_str):
+                analyzer.add(report)
+            result = analyzer.result()
+            archive.index_keywords(analyzer.days)  # 추세 기준은 요약 여부와 무관하게 발견한 리포트 전체
             return str(result)
         except Exception as e:
             return f"분석 실패: {e}"
 
+# ----------------------------------------------------------
+# 🔢 정형 필드 추출 (v12.9: 투자의견/목표주가/이전 목표주가/주요 수치를 LLM 없이 정규식으로)
+# ----------------------------------------------------------
+_NUM = r"(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)"
+_SIGNED_NUM = r"(-?(?:\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?))"
+_WON = r"(?:₩|W|KRW)?\s*"
+
+class ReportFieldExtractor:
+    """리포트 본문 → 정형 필드 dict (찾지 못한 필드는 생략)
+
+    투자의견/목표주가는 대부분 첫 페이지 요약 박스나 첫 문단에 있으므로 앞쪽 SCAN_CHARS자만 검사한다.
+    결과 예: {"rating": "BUY", "rating_change": "유지", "target_price": 110000, "prev_target_price": 95000,
+             "tp_change": "상향", "eps": "2026년 8,450원", "operating_profit": "3분기 2,340억원"}
+    """
+
+    SCAN_CHARS = 8000
+    RATING_NORMALIZE = (
+        ("TRADING BUY", re.compile(r"trading\s*buy", re.I)),
+        ("BUY", re.compile(r"strong\s*buy|buy|outperform|overweight|적극\s*매수|매수|비중\s*확대", re.I)),
+        ("HOLD", re.compile(r"hold|neutral|market\s*perform|중립|보유", re.I)),
+        ("SELL", re.compile(r"sell|underperform|underweight|reduce|매도|비중\s*축소", re.I)),
+        ("NR", re.compile(r"not\s*rated", re.I)),
+    )
+    _RATING_WORD = (r"(Strong\s*Buy|Trading\s*Buy|Buy|Outperform|Overweight|Hold|Neutral|Market\s*Perform|"
+                    r"Underperform|Underweight|Reduce|Sell|Not\s*Rated|적극\s*매수|매수|중립|보유|매도|비중\s*확대|비중\s*축소)")
+    _CHANGE_WORD = r"(유지|상향|하향|신규|제시|Maintain|Upgrade|Downgrade|Initiate)"
+    RATING = re.compile(r"(?:투자\s*의견|Rating|Recommendation)\s*[:：]?\s*(?:은|는)?\s*['\"‘“]?" + _RATING_WORD
+                        + r"['\"’”]?\s*(?:[를을로으]{1,2})?\s*[\(（]?\s*" + _CHANGE_WORD + "?", re.I)
+    # 요약 박스 "매수(유지)", "BUY (Maintain)"
+    RATING_BOX = re.compile(r"(?<![A-Za-z가-힣])(TRADING\s*BUY|BUY|HOLD|SELL|OUTPERFORM|NEUTRAL|REDUCE|매수|중립|매도)\s*[\(（]\s*"
+                            + _CHANGE_WORD, re.I)
+    # "목표주가를 95,000원에서 110,000원으로 상향"
+    TP_CHANGE = re.compile(r"(?:목표\s*주가|목표가)\s*[를을은는]?\s*(?:기존\s*)?" + _NUM + r"\s*(만\s*)?원\s*에서\s*"
+                           + _NUM + r"\s*(만\s*)?원\s*(?:으로|로)?\s*(상향|하향)?")
+    TP = re.compile(r"(?:목표\s*주가|목표가|Target\s*Price|\bTP\b)\s*(?:[\(（](?:12M|12개월|6M|6개월|원|KRW)[\)）]\s*)?"
+                    r"[를을은는]?\s*[:：]?\s*" + _WON + _NUM + r"\s*(만\s*)?(?:원|won)?\s*[\(（]?\s*(상향|하향|유지|Up|Down|Maintain)?",
+                    re.I)
+    TP_PREV = re.compile(r"(?:(?:이전|기존|종전|직전)\s*목표\s*주가|Previous\s*(?:TP|Target\s*Price)|Prior\s*TP)\s*[:：]?\s*"
+                         + _WON + _NUM + r"\s*(만\s*)?", re.I)
+    CURRENT = re.compile(r"(?:현재\s*주가|Current\s*Price)\s*(?:[\(（][^)）]{0,12}[\)）])?\s*[:：]?\s*" + _WON + _NUM, re.I)
+    EPS = re.compile(r"(?:(20\d{2})[EF]?\s*년?\s*)?EPS\s*(?:[\(（](?:원|KRW|W)[\)）])?\s*[는은:：]?\s*" + _SIGNED_NUM + r"\s*원?")
+    OPERATING_PROFIT = re.compile(r"(?:([1-4]Q\d{2}[EFP]?|[1-4]분기|20\d{2}년)\s*(?:의\s*)?)?영업이익[은는이가]?\s*"
+                                  + _SIGNED_NUM + r"\s*(조|억|백만)\s*원")
+
+    def extract(self, text: str) -> dict:
+        if not text:
+            return {}
+        head = text[:self.SCAN_CHARS]
+        fields = {}
+
+        m = self.RATING.search(head) or self.RATING_BOX.search(head)
+        if m:
+            fields["rating"] = self._normalize_rating(m.group(1))
+            if m.group(2):
+                fields["rating_change"] = m.group(2)
+
+        m = self.TP_CHANGE.search(head)
+        if m:
+            fields["prev_target_price"] = self._won(m.group(1), m.group(2))
+            fields["target_price"] = self._won(m.group(3), m.group(4))
+        else:
+            # "TP 12M" 등 숫자 오인식(100원 미만)은 건너뛰고 다음 후보 사용
+            m = next((m for m in self.TP.finditer(head) if self._won(m.group(1), m.group(2)) >= 100), None)
+            if m:
+                fields["target_price"] = self._won(m.group(1), m.group(2))
+                if m.group(3):
+                    fields["tp_change"] = m.group(3)
+            m = self.TP_PREV.search(head)
+            if m:
+                fields["prev_target_price"] = self._won(m.group(1), m.group(2))
+        if fields.get("target_price") and fields.get("prev_target_price"):
+            tp, prev = fields["target_price"], fields["prev_target_price"]
+            fields["tp_change"] = "상향" if tp > prev else "하향" if tp < prev else "유지"
+
+        m = self.CURRENT.search(head)
+        if m:
+            fields["current_price"] = self._won(m.group(1))
+        m = self.EPS.search(head)
+        if m:
+            fields["eps"] = (f"{m.group(1)}년 " if m.group(1) else "") + f"{m.group(2)}원"
+        m = self.OPERATING_PROFIT.search(head)
+        if m:
+            fields["operating_profit"] = (f"{m.group(1)} " if m.group(1) else "") + f"{m.group(2)}{m.group(3)}원"
+        return fields
+
+    def _normalize_rating(self, word: str) -> str:
+        for label, pattern in self.RATING_NORMALIZE:
+            if pattern.fullmatch(word.strip()):
+                return label
+        return word.strip().upper()
+
+    @staticmethod
+    def _won(number: str, man: str = None) -> int:
+        value = float(number.replace(",", ""))
+        return int(value * 10000 if man else value)
+
+def format_fields(fields: dict) -> str:
+    """정형 필드 → 한 줄 ("BUY(유지) / 목표주가 110,000원 (이전 95,000원, 상향) / EPS 2026년 8,450원")"""
+    parts = []
+    if fields.get("rating"):
+        parts.append(fields["rating"] + (f"({fields['rating_change']})" if fields.get("rating_change") else ""))
+    if fields.get("target_price"):
+        detail = [f"이전 {fields['prev_target_price']:,}원"] if fields.get("prev_target_price") else []
+        detail += [fields["tp_change"]] if fields.get("tp_change") else []
+        parts.append(f"목표주가 {fields['target_price']:,}원" + (f" ({', '.join(detail)})" if detail else ""))
+    if fields.get("current_price"):
+        parts.append(f"현재주가 {fields['current_price']:,}원")
+    if fields.get("eps"):
+        parts.append(f"EPS {fields['eps']}")
+    if fields.get("operating_profit"):
+        parts.append(f"영업이익 {fields['operating_profit']}")
+    return " / ".join(parts)
+
+field_extractor = ReportFieldExtractor()
+
+# ----------------------------------------------------------
+# ✂️ 추출 요약 (v13.0: LLM 입력 전에 문장 순위화 → 면책 문구 제거 → 토큰 예산 안의 상위 문장만 전달)
+# ----------------------------------------------------------
+_token_encoder = None
+_token_encoder_lock = threading.Lock()
+
+def count_tokens(text: str) -> int:
+    """요약 모델 토크나이저(tiktoken) 기준 토큰 수
+
+    tiktoken 미설치/인코딩 파일 다운로드 실패 시 한글 1자 ≈ 0.75토큰, 그 외 4자 ≈ 1토큰으로 추정.
+    """
+    global _token_encoder
+    if _token_encoder is None:
+        with _token_encoder_lock:
+            if _token_encoder is None:
+                try:
+                    import tiktoken  # 첫 호출 시에만 import (인코딩 파일은 TIKTOKEN_CACHE_DIR에 캐시)
+                    try:
+                        _token_encoder = tiktoken.encoding_for_model(LLM_SUMMARY)
+                    except KeyError:
+                        _token_encoder = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    log_llm.warning("tiktoken 사용 불가 → 문자 수 기반 토큰 추정: %s", e)
+                    _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    hangul = len(re.findall(r"[가-힣]", text))
+    return int(hangul * 0.75 + (len(text) - hangul) / 4) + 1
+
+class ExtractiveSummarizer:
+    """추출 본문 → 요약 프롬프트용 본문 (네트워크 없음)
+
+    1) 문장 분리, 면책/컴플라이언스 고지·짧은 조각·숫자 표 행 제거, 중복 문장 제거
+    2) 문장 TF-IDF 코사인 유사도 그래프에 TextRank, 결론/근거 단서어(전망·판단·목표주가·견인 등)에 가중치
+    3) 점수 순으로 토큰 예산(SUMMARY_INPUT_TOKENS)까지 채운 뒤 원문 순서로 이어 붙임
+    본문 전체가 예산 안이면 순위화 없이 정제된 문장을 그대로 반환한다.
+    """
+
+    MAX_SENTENCES = 200  # TextRank 대상 (앞 120 + 뒤 80문장: 결론이 있는 마지막 쪽 보존)
+    SENTENCE_SPLIT = re.compile(r"(?<=[.!?。])\s+|(?<=다\.)|(?<=[■▶●◆•□▪])\s*|\s{3,}")
+    DISCLAIMER = re.compile(
+        r"compliance\s*notice|disclaimer|투자\s*판단의\s*참고|최종\s*투자\s*결정|법적\s*(?:책임|분쟁)|무단\s*(?:복제|전재|배포)|"
+        r"저작권|증빙\s*자료|사전\s*(?:제공|공개)한\s*사실|(?:보유|관여)하고\s*있지\s*않|이해\s*관계가\s*없|"
+        r"외부의\s*부당한\s*압력|투자\s*등급\s*(?:비율|관련|기준)|투자의견\s*(?:비율|분포)|기관투자가\s*또는\s*제3자|"
+        r"정확성이나\s*완전성|신뢰할\s*수\s*있는\s*자료|당사\s*조사\s*분석\s*담당자|본\s*조사\s*분석\s*자료는|"
+        r"this\s*report\s*(?:is|has\s*been)\s*(?:prepared|provided)|not\s*(?:an\s*)?offer|past\s*performance", re.I)
+    WORD = re.compile(r"[가-힣]{2,}|[A-Za-z][A-Za-z0-9]+|\d+(?:[.,]\d+)*%?")
+    JOSA = re.compile(r"(?:으로|에서|에게|까지|부터|와|과|은|는|이|가|을|를|의|에|로|도|만)$")
+    CUE = re.compile(r"결론|전망|판단|예상|추정|목표\s*주가|투자\s*의견|상향|하향|유지|때문|근거|견인|증가|감소|개선|"
+                     r"둔화|확대|축소|리스크|모멘텀|수주|실적|컨센서스|상회|하회|수혜|기대")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = Counter()
+
+    def stats(self) -> dict:
+        with self._lock:
+            st = dict(self._stats)
+        if st.get("tokens_in"):
+            st["reduction_pct"] = round(100 * (1 - st.get("tokens_out", 0) / st["tokens_in"]), 1)
+        return st
+
+    def sentences(self, text: str) -> tuple:
+        """정제된 문장 목록 + 제거된 면책 문장 수"""
+        kept, seen, disclaimers = [], set(), 0
+        for raw in self.SENTENCE_SPLIT.split(text):
+            sent = (raw or "").strip(" -·|")
+            if len(sent) < 12 or sent in seen:
+                continue
+            if self.DISCLAIMER.search(sent):
+                disclaimers += 1
+                continue
+            letters = sum(ch.isalpha() for ch in sent)
+            if letters < len(sent) * 0.3 and not self.CUE.search(sent):  # 숫자 위주 표 행
+                continue
+            seen.add(sent)
+            kept.append(sent)
+        return kept, disclaimers
+
+    def _terms(self, sentence: str) -> list:
+        return [self.JOSA.sub("", w).lower() for w in self.WORD.findall(sentence)]
+
+    def rank(self, sentences: list) -> list:
+        """문장별 점수 (TextRank × 단서어 가중치)"""
+        import math
+        n = len(sentences)
+        terms = [Counter(self._terms(s)) for s in sentences]
+        df = Counter(t for tf in terms for t in tf)
+        vectors = []
+        for tf in terms:
+            vec = {t: c * math.log((n + 1) / (df[t] + 0.5)) for t, c in tf.items()}
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            vectors.append({t: v / norm for t, v in vec.items()})
+        # 코사인 유사도 그래프 (단어 → 문장 역색인으로 겹치는 쌍만 계산)
+        postings = {}
+        for i, vec in enumerate(vectors):
+            for t, v in vec.items():
+                postings.setdefault(t, []).append((i, v))
+        edges = [Counter() for _ in range(n)]
+        for entries in postings.values():
+            for a, (i, vi) in enumerate(entries):
+                for j, vj in entries[a + 1:]:
+                    edges[i][j] += vi * vj
+                    edges[j][i] += vi * vj
+        out_sum = [sum(e.values()) or 1.0 for e in edges]
+        incoming = [[(j, w / out_sum[j]) for j, w in e.items()] for e in edges]  # 대칭 그래프
+        scores = [1.0] * n
+        for _ in range(30):
+            scores = [0.15 + 0.85 * sum(w * scores[j] for j, w in incoming[i]) for i in range(n)]
+        return [score * (1 + 0.3 * min(3, len(self.CUE.findall(s)))) for score, s in zip(scores, sentences)]
+
+    def condense(self, text: str, budget: int = None) -> str:
+        budget = budget or SUMMARY_INPUT_TOKENS
+        sentences, disclaimers = self.sentences(text)
+        if len(sentences) > self.MAX_SENTENCES:
+            sentences = sentences[:120] + sentences[-(self.MAX_SENTENCES - 120):]
+        costs = [count_tokens(s) for s in sentences]
+        if sum(costs) <= budget:
+            chosen = range(len(sentences))
+        else:
+            scores = self.rank(sentences)
+            chosen, used = [], 0
+            for i in sorted(range(len(sentences)), key=lambda i: scores[i], reverse=True):
+                if used + costs[i] <= budget:
+                    chosen.append(i)
+                    used += costs[i]
+            chosen.sort()
+        result = " ".join(sentences[i] for i in chosen)
+        with self._lock:
+            self._stats["reports"] += 1
+            self._stats["tokens_in"] += count_tokens(text)
+            self._stats["tokens_out"] += sum(costs[i] for i in chosen)
+            self._stats["disclaimer_sentences"] += disclaimers
+        return result
+
+presummarizer = ExtractiveSummarizer()
+
+# ----------------------------------------------------------
+# 🏷️ 종목 사전 (v13.5: KRX 종목명/별칭/종목코드 → Aho-Corasick 자동자, 제목+본문 1회 스캔으로 종목 태깅)
+# ----------------------------------------------------------
+class EntityIndex:
+    """종목 사전 + Aho-Corasick 자동자 (첫 사용 시 로드, 디스크 캐시)
+
+    사전 출처: ENTITY_FILE (CSV: 종목코드,종목명[,별칭|별칭...] - `entities refresh`로 KRX KIND 상장법인 목록에서 생성)
+             + 아카이브에 쌓인 (종목코드, 종목명) (네이버 종목 링크/한경 제목)
+    사전 내용 해시가 같으면 ENTITY_CACHE의 자동자를 그대로 불러온다.
+    매칭은 가장 왼쪽-가장 긴 이름 우선, 영문/숫자 이름은 앞뒤가 영문/숫자가 아닐 때만 (LG ≠ LGES).
+    SHORT_HANGUL자 이하 한글 이름은 앞이 한글이 아니고 뒤가 한글이 아니거나 조사일 때만 ("전방산업" ≠ 전방),
+    일반 명사와 같은 이름(ENTITY_STOPWORDS)은 사전에서 뺀다 ("투자 대상" ≠ 대상).
+    """
+
+    MIN_NAME = 2
+    SHORT_HANGUL = 2
+    PARTICLES = frozenset("은는이가을를의에와과도로만")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.names = {}  # 종목코드 → 대표 종목명
+        self._goto, self._fail, self._out = [{}], [0], [()]
+
+    def entries(self) -> list:
+        """[(이름 또는 별칭, 종목코드, 대표명)]"""
+        entries = {}
+        if ENTITY_FILE and os.path.exists(ENTITY_FILE):
+            import csv
+            with open(ENTITY_FILE, encoding="utf-8") as f:
+                for row in csv.reader(f):
+                    if len(row) < 2 or not row[0].strip().isdigit():
+                        continue
+                    ticker, name = row[0].strip().zfill(6), row[1].strip()
+                    aliases = row[2].split("|") if len(row) > 2 else []
+                    for alias in [name, *aliases]:
+                        entries.setdefault(alias.strip(), (ticker, name))
+        if archive.enabled and os.path.exists(archive.path):
+            for row in archive._rows("SELECT DISTINCT ticker, stock FROM reports "
+                                     "WHERE ticker IS NOT NULL AND stock IS NOT NULL", ()):
+                entries.setdefault(row["stock"], (row["ticker"], row["stock"]))
+        stopwords = {w.strip() for w in ENTITY_STOPWORDS.split(",") if w.strip()}
+        return sorted((alias, ticker, name) for alias, (ticker, name) in entries.items()
+                      if len(alias) >= self.MIN_NAME and alias not in stopwords)
+
+    def _build(self, entries: list):
+        goto, fail, out = [{}], [0], [[]]
+        for alias, ticker, _ in entries:
+            node = 0
+            for ch in alias:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    fail.append(0)
+                    out.append([])
+                node = nxt
+            out[node].append((len(alias), ticker))
+        # BFS로 실패 링크 + 출력 병합
+        frontier = list(goto[0].values())
+        while frontier:
+            nxt_frontier = []
+            for node in frontier:
+                for ch, child in goto[node].items():
+                    f = fail[node]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    fail[child] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != child else 0
+                    out[child].extend(out[fail[child]])
+                    nxt_frontier.append(child)
+            frontier = nxt_frontier
+        self._goto, self._fail, self._out = goto, fail, [tuple(o) for o in out]
+
+    def load(self, force: bool = False):
+        """사전 → 자동자 (캐시 적중 시 pickle 로드)"""
+        with self._lock:
+            if self._loaded and not force:
+                return
+            import pickle
+            start = time.perf_counter()
+            entries = self.entries()
+            digest = hashlib.sha1(json.dumps(entries, ensure_ascii=False).encode("utf-8")).hexdigest()
+            cached = None
+            if ENTITY_CACHE and os.path.exists(ENTITY_CACHE):
+                try:
+                    with open(ENTITY_CACHE, "rb") as f:
+                        cached = pickle.load(f)
+                except Exception as e:
+                    log.warning("종목 자동자 캐시 로드 실패 → 재생성: %s", e)
+            if cached and cached.get("digest") == digest:
+                self._goto, self._fail, self._out = cached["goto"], cached["fail"], cached["out"]
+                source = "캐시"
+            else:
+                self._build(entries)
+                source = "생성"
+                if ENTITY_CACHE:
+                    with open(ENTITY_CACHE + ".tmp", "wb") as f:
+                        pickle.dump({"digest": digest, "goto": self._goto, "fail": self._fail, "out": self._out},
+                                    f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(ENTITY_CACHE + ".tmp", ENTITY_CACHE)
+            self.names = {ticker: name for _, ticker, name in entries}
+            self._loaded = True
+            log.debug("종목 사전 %d개 이름 / %d종목 / 노드 %d (%s, %.0fms)", len(entries), len(self.names),
+                      len(self._goto), source, (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def _is_word(ch: str) -> bool:
+        return ch.isascii() and ch.isalnum()
+
+    @staticmethod
+    def _is_hangul(ch: str) -> bool:
+        return "가" <= ch <= "힣"
+
+    def _hangul_bounded(self, text: str, start: int, end: int) -> bool:
+        """짧은 한글 이름의 경계: 앞은 한글이 아니고, 뒤는 한글이 아니거나 조사 1자 + 한글 아님"""
+        if start and self._is_hangul(text[start - 1]):
+            return False
+        if end < len(text) and self._is_hangul(text[end]):
+            return text[end] in self.PARTICLES and not (end + 1 < len(text) and self._is_hangul(text[end + 1]))
+        return True
+
+    def match(self, text: str) -> list:
+        """텍스트 1회 스캔 → [(시작 위치, 종목코드, 일치 문자열)] (겹치면 가장 왼쪽-가장 긴 것)"""
+        if not self._loaded:
+            self.load()
+        goto, fail, out = self._goto, self._fail, self._out
+        found, node = [], 0
+        for end, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for length, ticker in out[node]:
+                found.append((end - length + 1, -length, ticker))
+        result, last_end = [], 0
+        for start, neg_len, ticker in sorted(found):
+            end = start - neg_len
+            if start < last_end:
+                continue
+            name = text[start:end]
+            if (self._is_word(name[0]) and start and self._is_word(text[start - 1])) or \
+                    (self._is_word(name[-1]) and end < len(text) and self._is_word(text[end])):
+                continue
+            if len(name) <= self.SHORT_HANGUL and all(map(self._is_hangul, name)) \
+                    and not self._hangul_bounded(text, start, end):
+                continue
+            result.append((start, ticker, name))
+            last_end = end
+        return result
+
+    def tag(self, report: dict, text: str = "") -> list:
+        """리포트 → 종목코드 목록 (대표 종목 먼저: 수집 시 종목코드 → 제목 → 본문 앞부분 빈도순, 최대 3개)"""
+        title = report.get("title") or ""
+        head = text[:ENTITY_SCAN_CHARS] if text else ""
+        hits = self.match(title + "\n" + head) if (title or head) else []
+        in_title = [ticker for start, ticker, _ in hits if start < len(title)]
+        in_text = Counter(ticker for start, ticker, _ in hits if start > len(title))
+        ordered = ([report["ticker"]] if report.get("ticker") else []) + in_title \
+            + [ticker for ticker, _ in in_text.most_common()]
+        return list(dict.fromkeys(ordered))[:3]
+
+    def name(self, ticker: str) -> str:
+        if not self._loaded:
+            self.load()
+        return self.names.get(ticker) or ticker
+
+entity_index = EntityIndex()
+
+def refresh_entities(path: str = None) -> int:
+    """KRX KIND 상장법인 목록(HTML 표) → ENTITY_FILE CSV (종목코드,종목명,별칭) → 종목 수"""
+    import csv
+    path = path or ENTITY_FILE or "krx_entities.csv"
+    resp = http_get("https://kind.krx.co.kr/corpgeneral/corpList.do",
+                    params={"method": "download", "searchType": "13"}, headers=HEADERS, timeout=30)
+    resp.raise_for_status()
+    resp.encoding = "euc-kr"
+    rows = parse_html(resp.text, only="tr").find_all("tr")
+    header = [th.get_text(strip=True) for th in rows[0].find_all(["th", "td"])]
+    name_col, code_col = header.index("회사명"), header.index("종목코드")
+    # 기존 파일의 별칭(3번째 열)은 유지
+    aliases = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            aliases = {row[0]: row[2] for row in csv.reader(f) if len(row) > 2 and row[2]}
+    count = 0
+    with open(path + ".tmp", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ticker", "name", "aliases"])
+        for row in rows[1:]:
+            cols = [td.get_text(strip=True) for td in row.find_all("td")]
+            if len(cols) <= max(name_col, code_col):
+                continue
+            ticker = cols[code_col].zfill(6)
+            writer.writerow([ticker, cols[name_col], aliases.get(ticker, "")])
+            count += 1
+    os.replace(path + ".tmp", path)
+    return count
+
+def entities_cli(args):
+    """entities 하위 명령: refresh (KRX 목록 갱신) / match (텍스트 태깅) / stats"""
+    if args.action == "refresh":
+        print(f"[ENTITY] KRX 상장법인 {refresh_entities()}개 → {ENTITY_FILE}")
+        entity_index.load(force=True)
+    start = time.perf_counter()
+    entity_index.load()
+    load_ms = (time.perf_counter() - start) * 1000
+    if args.action == "match":
+        start = time.perf_counter()
+        hits = entity_index.match(args.text)
+        print(" / ".join(f"{name}→{ticker}({entity_index.name(ticker)})@{pos}" for pos, ticker, name in hits) or "-")
+        print(f"[ENTITY] {len(hits)}건 / {(time.perf_counter() - start) * 1000:.2f}ms")
+    print(f"[ENTITY] 종목 {len(entity_index.names)}개 / 노드 {len(entity_index._goto)}개 / 로드 {load_ms:.0f}ms")
+
+# ----------------------------------------------------------
+# 🎯 본문 선택자 통계 (v13.7: 도메인/증권사별 선택자·fallback 단계 적중을 실행 간 누적 → 선택자 순서 자동 조정)
+# ----------------------------------------------------------
+class SelectorStats:
+    """HTML 본문 선택자 적중 통계 (SELECTOR_STATS_FILE에 누적)
+
+    키: 도메인, 도메인|증권사 → {"selectors": {선택자: [시도, 적중]}, "tiers": {단계: [시도, 적중, 건너뜀]}}
+    - order(): 증권사 적중 → 도메인 적중 순으로 앞으로, 충분히 시도했는데 적중 0인 선택자는 뒤로
+      (앞 SELECTOR_FAST개만 빠르게 시도하므로 과거 승자가 목록 뒤쪽에 있어도 먼저 시도된다)
+    - skip_tier(): SELECTOR_SKIP_TRIES번 시도해 한 번도 본문을 못 찾은 fallback 단계는 건너뜀
+      (SELECTOR_PROBE_EVERY번에 한 번은 다시 시도해 페이지 구조 변화를 반영)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.data = {}
+        self.run = Counter()  # 이번 실행의 "선택자" / "fallback:단계" 적중 수
+
+    @staticmethod
+    def _keys(url: str, company: str) -> tuple:
+        domain = urlparse(url or "").hostname or "-"
+        return domain, f"{domain}|{company}" if company else None
+
+    def _entry(self, key: str) -> dict:
+        return self.data.setdefault(key, {"selectors": {}, "tiers": {}})
+
+    def load(self, path: str = None):
+        path = path or SELECTOR_STATS_FILE
+        with self._lock:
+            self.data = {}
+            self.run = Counter()
+            if path and os.path.exists(path):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        self.data = json.load(f)
+                except Exception as e:
+                    log_html.warning("선택자 통계 로드 실패 → 초기화: %s", e)
+
+    def save(self, path: str = None):
+        path = path or SELECTOR_STATS_FILE
+        if not path:
+            return
+        with self._lock:
+            payload = json.dumps(self.data, ensure_ascii=False, indent=1)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(path + ".tmp", path)
+
+    def order(self, url: str, company: str, selectors: list) -> list:
+        domain, company_key = self._keys(url, company)
+        with self._lock:
+            by_domain = self.data.get(domain, {}).get("selectors", {})
+            by_company = self.data.get(company_key, {}).get("selectors", {}) if company_key else {}
+
+            def rank(item):
+                idx, sel = item
+                tries, hits = by_domain.get(sel, (0, 0))
+                dead = tries >= SELECTOR_SKIP_TRIES and not hits
+                return -by_company.get(sel, (0, 0))[1], -hits, dead, idx
+
+            return [sel for _, sel in sorted(enumerate(selectors), key=rank)]
+
+    def record_selector(self, url: str, company: str, selector: str, hit: bool):
+        with self._lock:
+            for key in self._keys(url, company):
+                if key:
+                    st = self._entry(key)["selectors"].setdefault(selector, [0, 0])
+                    st[0] += 1
+                    st[1] += hit
+            if hit:
+                self.run[selector] += 1
+
+    def record_tier(self, url: str, company: str, tier: str, hit: bool):
+        with self._lock:
+            for key in self._keys(url, company):
+                if key:
+                    st = self._entry(key)["tiers"].setdefault(tier, [0, 0, 0])
+                    st[0] += 1
+                    st[1] += hit
+            if hit:
+                self.run[f"fallback:{tier}"] += 1
+
+    def skip_tier(self, url: str, company: str, tier: str) -> bool:
+        domain, _ = self._keys(url, company)
+        with self._lock:
+            st = self.data.get(domain, {}).get("tiers", {}).get(tier)
+            if not st or st[0] < SELECTOR_SKIP_TRIES or st[1]:
+                return False
+            st[2] += 1
+            if st[2] % SELECTOR_PROBE_EVERY == 0:
+                return False  # 주기적으로 재시도
+            self.run[f"skipped:{tier}"] += 1
+            return True
+
+    def report(self, domain: str = None) -> list:
+        """[(키, 선택자 또는 fallback:단계, 시도, 적중, 적중률)] - 적중 많은 순"""
+        with self._lock:
+            rows = []
+            for key, entry in self.data.items():
+                if domain and not key.startswith(domain):
+                    continue
+                for name, (tries, hits) in entry["selectors"].items():
+                    rows.append((key, name, tries, hits, hits / tries if tries else 0.0))
+                for name, (tries, hits, _) in entry["tiers"].items():
+                    rows.append((key, f"fallback:{name}", tries, hits, hits / tries if tries else 0.0))
+        return sorted(rows, key=lambda r: (r[0], -r[3], -r[2]))
+
+    def dead(self) -> list:
+        """모든 도메인에서 SELECTOR_SKIP_TRIES번 이상 시도했는데 적중 0인 선택자 (정리 후보)"""
+        totals = {}
+        with self._lock:
+            for key, entry in self.data.items():
+                if "|" in key:
+                    continue
+                for name, (tries, hits) in entry["selectors"].items():
+                    t = totals.setdefault(name, [0, 0])
+                    t[0] += tries
+                    t[1] += hits
+        return sorted(name for name, (tries, hits) in totals.items() if tries >= SELECTOR_SKIP_TRIES and not hits)
+
+selector_stats = SelectorStats()
+
+def selectors_cli(args):
+    """selectors 하위 명령: 도메인/증권사별 선택자·fallback 적중 통계와 정리 후보(적중 0) 출력"""
+    store = SelectorStats()
+    store.load(args.file)
+    rows = store.report(args.domain)
+    print("키 | 선택자 | 시도 | 적중 | 적중률")
+    for key, name, tries, hits, rate in rows[:args.limit]:
+        print(f"{key} | {name} | {tries} | {hits} | {rate:.0%}")
+    dead = store.dead()
+    print(f"[SELECTOR] {len(store.data)}개 키 / 정리 후보 {len(dead)}개: {', '.join(dead) or '-'}")
+    return rows
+
 # ----------------------------------------------------------
 # 3️⃣ 각 리포트별 핵심 1줄 요약 (PDF 내용 포함)
 # ----------------------------------------------------------
 class ReportSummarizerTool(BaseTool):
     name: str = "Report Summarizer Tool"
     description: str = "전체 리포트 전수 요약 (병렬 처리)"
+    record: bool = True  # 아카이브/원장 기록 (큐 worker는 끄고 결과에 source_type/본문을 실어 코디네이터가 기록)
+    
+    def __init__(self, record: bool = True):
+        self.record = record
     
     def _extract_pdf_text(self, pdf_url: str) -> str:
         """PDF 본문 추출 (v11.1: PDF URL whitelist 검증 강화)"""
@@ -434,103 +2687,50 @@ class ReportSummarizerTool(BaseTool):
                 return ""
             
             # v11.1: PDF URL whitelist 기반 검증 (먼저 whitelist 확인)
-            valid_pdf_patterns = [
-                r'stock\.pstatic\.net/stock-research/.*\.pdf',
-                r'pstatic\.net/stock-research/.*\.pdf',
-            ]
-            is_valid = any(re.search(p, pdf_url) for p in valid_pdf_patterns)
-            if not is_valid:
-                print(f"      [DEBUG PDF] whitelist 불일치, PDF로 인정 불가: {pdf_url[:80]}")
+            # v13.6: 등록된 소스 어댑터의 whitelist (네이버 pstatic + 한경컨센서스 등)
+            adapter = source_for_pdf(pdf_url)
+            if adapter is None:
+                log_pdf.debug("whitelist 불일치, PDF로 인정 불가: %.80s", pdf_url)
+                metrics.failure("pdf", "whitelist")
                 return ""  # whitelist에 없으면 PDF가 아님
             
-            # Phase 1 (v11.0): 종목/차트 페이지 강력 차단 (URL 패턴으로 선차단)
-            invalid_patterns = [
-                r'/(item|chart|quote|news|frgn)/',       # 기존 패턴
-                r'finance\.naver\.com/item/',            # 네이버 종목 페이지
-                r'\.frgn\.naver',                        # 외국인 페이지
-                r'/item/frgn',                           # 종목 외국인 페이지
-            ]
-            
-            for pattern in invalid_patterns:
-                if re.search(pattern, pdf_url, re.I):
-                    print(f"      [DEBUG PDF] 금지된 URL 패턴 감지: {pdf_url[:80]}")
-                    return ""
+            # Phase 1 (v11.0): 종목/차트 페이지 강력 차단 (URL 패턴으로 선차단, v13.8: pdf_blocked 규칙)
+            if rules.match("pdf_blocked", pdf_url):
+                log_pdf.debug("금지된 URL 패턴 감지: %.80s", pdf_url)
+                metrics.failure("pdf", "blocked_url")
+                return ""
             
-            # URL 파라미터 제거 (query string, fragment 제거)
+            # URL 보정 (네이버: 파라미터 제거, `.p` → `.pdf`) + 다운로드 시도 순서는 어댑터가 결정 (v13.8: memo)
             original_url = pdf_url
-            pdf_url = pdf_url.split("?")[0].split("#")[0]
-            
-            # 공백 제거 먼저 (중요!)
-            pdf_url_stripped = pdf_url.strip()
-            
-            # PDF URL 보정 (`.p` → `.pdf` 자동 추가) - 개선 버전
-            if pdf_url_stripped and not pdf_url_stripped.lower().endswith(".pdf"):
-                # URL이 잘린 경우 (.p 또는 .pd로 끝나는 경우)
-                if pdf_url_stripped.endswith(".p"):
-                    pdf_url = pdf_url_stripped[:-1] + "pdf"  # .p → .pdf (버그 수정)
-                elif pdf_url_stripped.endswith(".pd"):
-                    pdf_url = pdf_url_stripped[:-2] + "pdf"  # .pd → .pdf
-                # pstatic URL 패턴 특별 처리 (점으로 끝나지 않는 경우만)
-                elif "pstatic.net" in pdf_url_stripped and not pdf_url_stripped.endswith("."):
-                    pdf_url = pdf_url_stripped + ".pdf"
-                # 숫자로 끝나는 URL에도 .pdf 자동 추가
-                elif re.search(r'/\d+$', pdf_url_stripped):
-                    pdf_url = pdf_url_stripped + ".pdf"
-                else:
-                    pdf_url = pdf_url_stripped
-            else:
-                pdf_url = pdf_url_stripped
+            attempts = list(pdf_attempts(adapter.name, pdf_url))
+            pdf_url = attempts[0]
+            log_pdf.debug("원본: %.80s → 수정: %.80s (시도 %d개)", original_url, pdf_url, len(attempts))
             
-            print(f"      [DEBUG PDF] 원본: {original_url[:80]} → 수정: {pdf_url[:80]}")
-            
-            # HTTP 요청 시도 (다중 fallback)
+            download_start = time.perf_counter()
             res = None
-            attempts = []
-            
-            # 1. 보정된 URL부터 시도
-            if pdf_url_stripped != pdf_url:
-                attempts.append(pdf_url)
-                print(f"      [DEBUG PDF] 보정 URL 추가: {pdf_url[:80]}")
-            
-            # 2. 원본 URL 시도
-            attempts.append(pdf_url_stripped)
-            
-            # 3. .p/.pd 패턴이면 수정본 추가 시도
-            if pdf_url_stripped.endswith(".p") and pdf_url_stripped not in attempts:
-                fixed_p = pdf_url_stripped[:-1] + "pdf"  # 버그 수정: df → pdf
-                attempts.append(fixed_p)
-                print(f"      [DEBUG PDF] .p 수정본 추가: {fixed_p[:80]}")
-            elif pdf_url_stripped.endswith(".pd") and pdf_url_stripped not in attempts:
-                fixed_pd = pdf_url_stripped[:-2] + "pdf"
-                attempts.append(fixed_pd)
-                print(f"      [DEBUG PDF] .pd 수정본 추가: {fixed_pd[:80]}")
-            
-            # 4. 확장자 없는 경우 .pdf 추가 시도
-            if not pdf_url_stripped.endswith(".pdf") and not pdf_url_stripped.endswith(".p") and not pdf_url_stripped.endswith(".pd"):
-                attempts.append(pdf_url_stripped + ".pdf")
-                print(f"      [DEBUG PDF] .pdf 추가 시도: {(pdf_url_stripped + '.pdf')[:80]}")
-            
             for i, attempt_url in enumerate(attempts):
                 try:
-                    print(f"      [DEBUG PDF] 시도 {i+1}/{len(attempts)}: {attempt_url[:80]}")
-                    res = requests.get(attempt_url, headers=HEADERS, timeout=15, stream=True)
+                    log_pdf.debug("시도 %d/%d: %.80s", i + 1, len(attempts), attempt_url)
+                    res = http_get(attempt_url, headers=HEADERS, timeout=15, stream=True)
                     if res.status_code == 200:
                         pdf_url = attempt_url
                         if len(attempts) > 1:
-                            print(f"      [DEBUG PDF] ✓ 성공! {attempt_url[:80]}")
+                            log_pdf.debug("✓ 성공! %.80s", attempt_url)
                         break
                     else:
-                        print(f"      [DEBUG PDF] HTTP {res.status_code}")
+                        log_pdf.debug("HTTP %s", res.status_code)
                 except Exception as e:
-                    print(f"      [DEBUG PDF] 예외: {str(e)[:50]}")
+                    log_pdf.debug("예외: %.50s", e)
                     continue
             
             if not res or res.status_code != 200:
-                print(f"      [DEBUG PDF] HTTP {res.status_code if res else 'None'} - 모든 시도 실패")
+                log_pdf.debug("HTTP %s - 모든 시도 실패", res.status_code if res else None)
+                metrics.record("pdf_download", time.perf_counter() - download_start)
+                metrics.failure("pdf_download", f"http_{res.status_code if res else 'error'}")
                 
                 # v10.5: 보정 실패한 .p, .pd는 차단
                 if pdf_url.endswith(".p") or pdf_url.endswith(".pd"):
-                    print(f"      [DEBUG PDF] 보정 실패, 잘린 확장자 차단: {pdf_url[:80]}")
+                    log_pdf.debug("보정 실패, 잘린 확장자 차단: %.80s", pdf_url)
                     return ""
                 
                 return ""
@@ -538,61 +2738,87 @@ class ReportSummarizerTool(BaseTool):
             # Content-Type 검증 완화 (PDF가 아니어도 시도)
             content_type = res.headers.get('content-type', '').lower()
             if 'pdf' not in content_type and not pdf_url.endswith('.pdf'):
-                print(f"      [DEBUG PDF] Content-Type: {content_type} (PDF 아님)")
+                log_pdf.debug("Content-Type: %s (PDF 아님)", content_type)
                 
                 # HTML 응답인 경우 재시도
                 if content_type.startswith('text/html'):
-                    print(f"      [DEBUG PDF] HTML 응답 → URL 재구성 시도")
+                    log_pdf.debug("HTML 응답 → URL 재구성 시도")
                     # .pdf 자동 추가 시도
                     alt_pdf = pdf_url.split("?")[0] + ".pdf"
                     try:
-                        res_alt = requests.get(alt_pdf, headers=HEADERS, timeout=10)
+                        res_alt = http_get(alt_pdf, headers=HEADERS, timeout=10)
                         if res_alt.status_code == 200 and 'pdf' in res_alt.headers.get('content-type', '').lower():
                             res = res_alt
                             pdf_url = alt_pdf
-                            print(f"      [DEBUG PDF] 재구성 성공: {alt_pdf[:80]}")
+                            log_pdf.debug("재구성 성공: %.80s", alt_pdf)
                         else:
-                            print(f"      [DEBUG PDF] HTML 재시도 실패 → PDF 아님")
+                            log_pdf.debug("HTML 재시도 실패 → PDF 아님")
+                            metrics.failure("pdf_download", "not_pdf")
                             return ""
                     except Exception as e:
-                        print(f"      [DEBUG PDF] HTML 재시도 예외: {str(e)[:50]}")
+                        log_pdf.debug("HTML 재시도 예외: %.50s", e)
+                        metrics.failure("pdf_download", type(e).__name__)
                         return ""
             
-            # 파일명을 고유하게 생성 (동시 접근 방지)
-            import uuid
-            temp_file = f"temp_{uuid.uuid4().hex[:8]}.pdf"
-            
             try:
-                with open(temp_file, "wb") as f:
-                    f.write(res.content)
-                
-                with fitz.open(temp_file) as pdf:
-                    text = ""
-                    total = len(pdf)
-                    pages = list(range(min(5, total))) + list(range(max(0, total - 3), total))
-                    for p in sorted(set(pages)):
-                        text += pdf[p].get_text()
-                
-                print(f"      [DEBUG PDF] 추출 성공: {len(text)}자")
-                
-                # 파일 닫힌 후 삭제
-                import time
-                time.sleep(0.1)  # 파일 핸들 해제 대기
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
-                
-                return re.sub(r"\s+", " ", text.strip())[:3500]
+                pdf_bytes = res.content  # v12.4: 본문은 http_get에서 호스트 슬롯 안에서 수신 완료
+                metrics.record("pdf_download", time.perf_counter() - download_start, len(pdf_bytes))
+                text = self._pdf_bytes_to_text(pdf_bytes)
+                log_pdf.debug("추출 성공: %d자", len(text))
+                return text
             except Exception as pdf_error:
-                print(f"      [DEBUG PDF] 파싱 실패: {pdf_error}")
+                log_pdf.warning("파싱 실패: %s", pdf_error)
+                metrics.failure("pdf_parse", type(pdf_error).__name__)
                 return ""
         except Exception as e:
-            print(f"      [PDF 추출 실패: {e}]")
+            log_pdf.warning("PDF 추출 실패: %s", e)
+            metrics.failure("pdf", type(e).__name__)
             return ""
     
+    def _pdf_bytes_to_text(self, pdf_bytes: bytes) -> str:
+        """PDF 바이트 → 앞 5쪽 + 마지막 3쪽 텍스트 (v12.1: 다운로드와 분리)
+        
+        v13.0: 전체를 3500자로 자르면 마지막 쪽(결론)이 잘리므로 앞쪽 PDF_HEAD_CHARS + 뒤쪽 PDF_TAIL_CHARS자를 보존
+        (LLM 입력 길이는 presummarizer가 토큰 예산으로 조절)
+        """
+        import fitz  # v12.2: PDF 파싱 시에만 import
+        # 파일명을 고유하게 생성 (동시 접근 방지)
+        import uuid
+        temp_file = f"temp_{uuid.uuid4().hex[:8]}.pdf"
+        
+        try:
+            with open(temp_file, "wb") as f:
+                f.write(pdf_bytes)
+            
+            with metrics.stage("pdf_parse"):
+                with fitz.open(temp_file) as pdf:
+                    total = len(pdf)
+                    head_pages = list(range(min(5, total)))
+                    tail_pages = [p for p in range(max(0, total - 3), total) if p not in head_pages]
+                    head = " ".join(pdf[p].get_text() for p in head_pages)
+                    tail = " ".join(pdf[p].get_text() for p in tail_pages)
+        finally:
+            # 파일 닫힌 후 삭제
+            time.sleep(0.1)  # 파일 핸들 해제 대기
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+        
+        head = re.sub(r"\s+", " ", head.strip())
+        tail = re.sub(r"\s+", " ", tail.strip())
+        if len(head) > PDF_HEAD_CHARS:  # 문장 중간에서 잘리지 않도록 마지막 문장 끝에서 자름
+            head = head[:PDF_HEAD_CHARS]
+            head = head[:head.rfind(". ") + 1] or head
+        if len(tail) > PDF_TAIL_CHARS:
+            tail = tail[-PDF_TAIL_CHARS:]
+            tail = tail[tail.find(". ") + 2:] if ". " in tail else tail
+        return (head + " " + tail).strip()
+    
     def _extract_html_text(self, url: str, company: str = "") -> str:
         """PDF가 없을 경우 HTML 본문 크롤링 (Selenium으로 JS 렌더링된 페이지) - v10.0"""
+        from selenium.webdriver.common.by import By  # v12.2: HTML 단계에서만 import
         try:
-            print(f"      [DEBUG HTML] URL: {url[:80]}")
+            log_html.debug("URL: %.80s", url)
+            tier_start = time.perf_counter()
             # Selenium으로 JS 렌더링된 본문 가져오기
             driver = create_selenium_driver()
             driver.implicitly_wait(5)  # 대기 시간 증가
@@ -600,24 +2826,21 @@ class ReportSummarizerTool(BaseTool):
             time.sleep(3)  # JS 로딩 대기
             
             # v10.4: 404 에러 페이지 감지 강화 (다중 인코딩)
+            # v13.9: page_source는 탐색마다 1회만 가져옴 (호출마다 브라우저에서 DOM 전체를 직렬화해 전송)
             page_title = driver.title
-            page_size = len(driver.page_source)
-            print(f"      [DEBUG HTML] 페이지 타이틀: {page_title}")
-            print(f"      [DEBUG HTML] 페이지 크기: {page_size} 자")
+            page_raw = driver.page_source
+            page_size = len(page_raw)
+            log_html.debug("페이지 타이틀: %s", page_title)
+            log_html.debug("페이지 크기: %d 자", page_size)
             
             # 다중 인코딩 검사 (EUC-KR + UTF-8)
-            page_raw = driver.page_source
             try:
                 page_euckr = page_raw.encode('euc-kr', errors='ignore').decode('euc-kr', errors='ignore')
             except:
                 page_euckr = page_raw
             
             # v10.9: 404 감지 단순화 (과도한 필터링 제거)
-            is_404 = any(keyword in page_raw for keyword in [
-                "페이지를 찾을 수 없습니다",
-                "찾으시는 모든 정보",
-                "404 Not Found"
-            ]) or ("404" in page_title and "네이버" in page_title)
+            is_404 = bool(rules.match("html_404", page_raw)) or ("404" in page_title and "네이버" in page_title)
             
             # Phase 2 (v11.0): meta refresh 추적 + 재시도 제한 (무한 루프 방지)
             redirect_count = 0
@@ -630,11 +2853,11 @@ class ReportSummarizerTool(BaseTool):
                     
                     # 무한 루프 감지: 같은 URL을 다시 방문하면 중단
                     if current_url in visited_urls:
-                        print(f"      [DEBUG HTML] 무한 루프 감지 (동일 URL 재방문): {current_url[:80]}")
+                        log_html.debug("무한 루프 감지 (동일 URL 재방문): %.80s", current_url)
                         break
                     visited_urls.add(current_url)
                     
-                    soup_page = BeautifulSoup(driver.page_source[:10000], "html.parser")
+                    soup_page = parse_html(page_raw[:10000], only="meta")
                     meta_refresh = soup_page.find("meta", attrs={"http-equiv": re.compile("refresh", re.I)})
                     
                     if meta_refresh and "url=" in meta_refresh.get("content", "").lower():
@@ -648,12 +2871,13 @@ class ReportSummarizerTool(BaseTool):
                             
                             # 다음 URL이 이미 방문한 URL이면 중단 (무한 루프 방지)
                             if redirect_url in visited_urls:
-                                print(f"      [DEBUG HTML] 무한 루프 감지 (이미 방문한 URL): {redirect_url[:80]}")
+                                log_html.debug("무한 루프 감지 (이미 방문한 URL): %.80s", redirect_url)
                                 break
                             
-                            print(f"      [DEBUG HTML] meta refresh {redirect_count+1}회: {redirect_url[:80]}")
+                            log_html.debug("meta refresh %d회: %.80s", redirect_count + 1, redirect_url)
                             driver.get(redirect_url)
                             time.sleep(2)
+                            page_raw = driver.page_source
                             redirect_count += 1
                             continue
                     
@@ -661,39 +2885,42 @@ class ReportSummarizerTool(BaseTool):
                     break
                     
                 except Exception as redirect_e:
-                    print(f"      [DEBUG HTML] 리다이렉트 오류: {str(redirect_e)[:50]}")
+                    log_html.debug("리다이렉트 오류: %.50s", redirect_e)
                     break
             
+            metrics.record("html_load", time.perf_counter() - tier_start, len(page_raw.encode("utf-8")))
+            tier_start = time.perf_counter()
+            
             if is_404:
-                print(f"      [ERROR] 404 에러 페이지 감지: {url}")
+                log_html.warning("404 에러 페이지 감지: %s", url)
+                metrics.failure("html", "404")
                 # 404 페이지 디버깅 저장
                 if "신한" in company:
-                    html_content = driver.page_source
+                    html_content = page_raw
                     if not os.path.exists("debug_html"):
                         os.makedirs("debug_html")
                     safe_company = re.sub(r'[^\w\s-]', '', company)[:20]
                     debug_file = f"debug_html/404_{safe_company}_{int(time.time())}.html"
                     with open(debug_file, "w", encoding="utf-8") as f:
                         f.write(html_content)
-                    print(f"      [DEBUG HTML] 404 페이지 저장: {debug_file}")
+                    log_html.debug("404 페이지 저장: %s", debug_file)
                 driver.quit()
                 return ""
             
             # === v10.4: 디버그 HTML 저장 (신한투자 전용, 정상 페이지만) ===
             if "신한" in company:
-                html_content = driver.page_source
+                html_content = page_raw
                 if not os.path.exists("debug_html"):
                     os.makedirs("debug_html")
                 safe_company = re.sub(r'[^\w\s-]', '', company)[:20]
                 debug_file = f"debug_html/ok_{safe_company}_{int(time.time())}.html"
                 with open(debug_file, "w", encoding="utf-8") as f:
                     f.write(html_content)
-                print(f"      [DEBUG HTML] 정상 페이지 저장: {debug_file}")
-                print(f"      [DEBUG HTML] 페이지 크기: {len(html_content)} 자")
+                log_html.debug("정상 페이지 저장: %s (%d자)", debug_file, len(html_content))
             
             # 신한투자 특화 선택자 처리 (나중에 사용)
             if False:  # 임시 비활성화
-                print(f"      [DEBUG HTML] 신한투자증권 리포트 감지 (company: {company})")
+                log_html.debug("신한투자증권 리포트 감지 (company: %s)", company)
                 content_selectors = [
                     # 신한투자 특화 선택자 (우선순위 높게)
                     "div.view_cont",      # 신한투자 본문 컨테이너
@@ -738,10 +2965,9 @@ class ReportSummarizerTool(BaseTool):
                 if not iframes:
                     iframes = driver.find_elements(By.TAG_NAME, "frame")
                 
-                print(f"      [DEBUG HTML] iframe 탐색 완료: {len(iframes)}개 발견")
+                log_html.debug("iframe 탐색 완료: %d개 발견", len(iframes))
                 
                 if iframes:
-                    print(f"      [DEBUG HTML] iframe {len(iframes)}개 발견")
                     
                     # iframe 순회하며 본문 찾기
                     for idx, frame in enumerate(iframes):
@@ -749,7 +2975,7 @@ class ReportSummarizerTool(BaseTool):
                             # v10.9: 신한투자 iframe 직접 접근 + Mobile UA 적용
                             src = frame.get_attribute("src")
                             if src and "shinhaninvest" in src.lower():
-                                print(f"      [DEBUG HTML] 신한 iframe src 감지: {src[:80]}")
+                                log_html.debug("신한 iframe src 감지: %.80s", src)
                                 
                                 # Mobile User-Agent로 전환
                                 mobile_ua = ("Mozilla/5.0 (Linux; Android 10; SM-G973F) "
@@ -757,7 +2983,7 @@ class ReportSummarizerTool(BaseTool):
                                            "Chrome/124.0.0.0 Mobile Safari/537.36")
                                 driver.execute_cdp_cmd("Network.setUserAgentOverride", 
                                                       {"userAgent": mobile_ua})
-                                print(f"      [DEBUG HTML] Mobile UA 적용")
+                                log_html.debug("Mobile UA 적용")
                                 
                                 driver.get(src)  # iframe src로 직접 이동
                                 time.sleep(2)
@@ -779,7 +3005,7 @@ class ReportSummarizerTool(BaseTool):
                             # 내부 iframe 확인 (이중 구조)
                             inner_iframes = driver.find_elements("tag name", "iframe")
                             if inner_iframes:
-                                print(f"      [DEBUG HTML] 내부 iframe {len(inner_iframes)}개 발견")
+                                log_html.debug("내부 iframe %d개 발견", len(inner_iframes))
                                 for inner_idx, inner_frame in enumerate(inner_iframes):
                                     try:
                                         driver.switch_to.frame(inner_frame)
@@ -792,13 +3018,13 @@ class ReportSummarizerTool(BaseTool):
                                         if len(candidate_html) > 1000:
                                             # 본문 키워드 확인
                                             if any(keyword in candidate_html for keyword in ["경쟁사", "이익률", "매출", "전망", "증권", "리포트"]):
-                                                print(f"      [DEBUG HTML] 내부 iframe #{inner_idx} 본문 확인: {len(candidate_html)}자")
+                                                log_html.debug("내부 iframe #%d 본문 확인: %d자", inner_idx, len(candidate_html))
                                                 html = candidate_html
                                                 break
                                         
                                         driver.switch_to.parent_frame()
                                     except Exception as inner_e:
-                                        print(f"      [DEBUG HTML] 내부 iframe #{inner_idx} 전환 실패: {str(inner_e)[:50]}")
+                                        log_html.debug("내부 iframe #%d 전환 실패: %.50s", inner_idx, inner_e)
                                         try:
                                             driver.switch_to.parent_frame()
                                         except:
@@ -810,7 +3036,7 @@ class ReportSummarizerTool(BaseTool):
                                 candidate_html = driver.page_source
                                 if len(candidate_html) > 1000:
                                     if any(keyword in candidate_html for keyword in ["경쟁사", "이익률", "매출", "전망", "증권", "리포트"]):
-                                        print(f"      [DEBUG HTML] 외부 iframe #{idx} 본문 확인: {len(candidate_html)}자")
+                                        log_html.debug("외부 iframe #%d 본문 확인: %d자", idx, len(candidate_html))
                                         html = candidate_html
                             
                             # 성공하면 탈출
@@ -822,7 +3048,7 @@ class ReportSummarizerTool(BaseTool):
                             driver.switch_to.default_content()
                             
                         except Exception as frame_e:
-                            print(f"      [DEBUG HTML] iframe #{idx} 전환 실패: {str(frame_e)[:50]}")
+                            log_html.debug("iframe #%d 전환 실패: %.50s", idx, frame_e)
                             try:
                                 driver.switch_to.default_content()
                             except:
@@ -832,14 +3058,14 @@ class ReportSummarizerTool(BaseTool):
                     # iframe 전환 실패 시 기본 페이지 사용
                     if not html or len(html) < 1000:
                         driver.switch_to.default_content()
-                        html = driver.page_source
-                        print(f"      [DEBUG HTML] iframe 실패, 기본 페이지 사용: {len(html)}자")
+                        html = driver.page_source  # iframe 탐색 중 대기/이동했으므로 다시 가져옴
+                        log_html.debug("iframe 실패, 기본 페이지 사용: %d자", len(html))
                 else:
-                    html = driver.page_source
-                    print(f"      [DEBUG HTML] iframe 없음, 기본 페이지 사용: {len(html)}자")
+                    html = driver.page_source  # iframe 탐색(implicit wait) 중 렌더링이 끝났을 수 있음
+                    log_html.debug("iframe 없음, 기본 페이지 사용: %d자", len(html))
                     
             except Exception as iframe_error:
-                print(f"      [DEBUG HTML] iframe 처리 오류: {str(iframe_error)[:50]}")
+                log_html.debug("iframe 처리 오류: %.50s", iframe_error)
                 try:
                     driver.switch_to.default_content()
                 except:
@@ -847,209 +3073,255 @@ class ReportSummarizerTool(BaseTool):
                 html = driver.page_source
             
             driver.quit()
-            
-            soup = BeautifulSoup(html, "html.parser")
-            
-            # 네이버 리포트 페이지 구조에 맞춰 본문 추출
-            # 주요 섹션 선택자들 (확장 버전)
-            content_selectors = [
-                "td.view_cnt",         # 네이버 리포트 본문 컨테이너 (핵심 선택자)
-                "div.view_cnt",        # div 형태의 본문 컨테이너
-                "td.view_content",     # 테이블 셀 본문 (경제/산업 분석 우선)
-                "table.view",          # 테이블 뷰
-                "div.view_con",        # 네이버 리포트 본문
-                "div.tb_view",         # 테이블 형식 추가
-                "div.article_view", 
-                "div.article_view_con",
-                "section.article",     # 섹션 기반 본문
-                "div#articleBody",     # 본문 영역 ID
-                "div#wrap_view",       # 뷰 래퍼
-                "div#wrapContent",     # 컨텐츠 래퍼
-                "div#contentArea",     # 컨텐츠 영역
-                "div.article_body",    # 기사 본문
-                "div.end_body",        # 본문 끝 부분
-                "div.tb_type1",        # 테이블 형식
-                "div.tb_cont",         # 테이블 컨텐츠
-                "div.board_view",      # 게시판 형식
-                "article",
-                "div.content",
-                "#content"
-            ]
-            
-            # 신한투자증권 전용 선택자 추가 (company 파라미터 사용)
-            if "신한" in company:
-                print(f"      [DEBUG HTML] 신한투자증권 리포트 감지 (company: {company})")
-                content_selectors = [
-                    # 신한투자 특화 선택자 (우선순위 높게)
-                    "div.view_cont",      # NEW: 신한투자 본문 컨테이너
-                    "td.view_cont",       # NEW: 신한투자 테이블 셀
-                    "div.article_content", # NEW: 기사 본문
-                    "div.content_body",   # NEW: 본문 영역
-                    "div#content_detail", # NEW: 상세 본문 ID
-                    "div.report_view",    # NEW: 리포트 뷰
-                    "div.article_view",   # NEW: 기사 뷰
-                    # 네이버 표준 선택자
-                    "td.view_cnt",
-                    "div.view_cnt",
-                    "td.view_content",
-                    "table.view",
-                    "div.view_con",
-                    # 일반 선택자
-                    "div.report-content",
-                    "div.report-body",
-                    "div.viewer-content",
-                    "div.article-content",
-                    "td.content",
-                    "div.content",
-                    "#articleBody",
-                    "article"
-                ] + content_selectors
-            
-            # v10.5: 빠른 선택자 기반 추출 (우선 시도)
-            text = ""
-            print(f"      [DEBUG HTML] 선택자 {len(content_selectors)}개 중 매칭 시도...")
-            for idx, selector in enumerate(content_selectors[:5]):  # 처음 5개만 빠르게 시도
+            metrics.record("html_iframe", time.perf_counter() - tier_start)
+            # v12.1: 본문 선택자 cascade를 별도 메서드로 분리 (bench_parsing.py 마이크로벤치마크 대상)
+            return self._extract_body_text(html, company=company, url=url)
+        except Exception as e:
+            log_html.warning("HTML 추출 실패: %s", e, exc_info=log_html.isEnabledFor(logging.DEBUG))
+            metrics.failure("html", type(e).__name__)
+            return ""
+    
+    def _extract_body_text(self, html: str, company: str = "", url: str = "") -> str:
+        """렌더링된 HTML → 리포트 본문 (선택자 cascade → 클래스 검색 → 전체 텍스트 fallback)
+        
+        v13.6: 선택자 목록은 URL 소스 어댑터의 본문 선택자 프로파일 (증권사별 선택자 우선)
+        v13.7: 도메인/증권사별 과거 적중 순으로 선택자 정렬, 적중 기록 없는 fallback 단계는 건너뜀 (selector_stats)
+        v13.9: 단순 선택자는 lxml 문서 1개에서 XPath로 찾음 - BeautifulSoup 트리는 XPath로 못 쓰는 선택자나
+               fallback 단계가 필요할 때만 만든다
+        """
+        tier_start = time.perf_counter()
+        
+        doc = lxml_document(html)
+        soup = None
+        
+        content_selectors = selector_stats.order(url, company, body_selectors(url, company))
+        
+        # v10.5: 빠른 선택자 기반 추출 (우선 시도)
+        text = ""
+        log_html.debug("선택자 %d개 중 매칭 시도...", len(content_selectors))
+        for idx, selector in enumerate(content_selectors[:SELECTOR_FAST]):  # 앞쪽(과거 승자 우선)만 빠르게 시도
+            xpath = selector_xpath(selector) if doc is not None else None
+            if xpath is not None:
+                found = xpath(doc)
+                element_text = lxml_text(found[0], separator="\n") if found else None
+            else:
+                if soup is None:
+                    soup = parse_html(html)
                 element = soup.select_one(selector)
-                if element:
-                    text = element.get_text(separator="\n").strip()
-                    if len(text) > 100:
-                        print(f"      [DEBUG HTML] OK 선택자 #{idx+1} '{selector}' 매칭 성공: {len(text)}자")
-                        break
-                    else:
-                        text = ""  # 계속 시도
+                element_text = element.get_text(separator="\n") if element else None
+            if element_text is not None:
+                text = element_text.strip()
+                if len(text) > 100:
+                    log_html.debug("OK 선택자 #%d '%s' 매칭 성공: %d자", idx + 1, selector, len(text))
+                    selector_stats.record_selector(url, company, selector, True)
+                    break
                 else:
-                    if idx < 3:
-                        print(f"      [DEBUG HTML] FAIL 선택자 #{idx+1} '{selector}' 매칭 실패")
-            
-            # 선택자 실패 시 클래스 기반 검색 (v10.5 신규)
-            if not text or len(text) < 100:
-                print(f"      [DEBUG HTML] 선택자 실패, 클래스 기반 검색으로 fallback")
-                text_blocks = soup.find_all(["td", "div"], class_=re.compile(r"view|content|article|report", re.I))
-                texts = [t.get_text(strip=True) for t in text_blocks if len(t.get_text(strip=True)) > 100]
-                if texts:
-                    text = max(texts, key=len)
-                    print(f"      [DEBUG HTML] 클래스 기반 검색 성공: {len(text)}자")
+                    text = ""  # 계속 시도
+            else:
+                if idx < 3:
+                    log_html.debug("FAIL 선택자 #%d '%s' 매칭 실패", idx + 1, selector)
+            selector_stats.record_selector(url, company, selector, False)
+        
+        metrics.record("html_selector", time.perf_counter() - tier_start)
+        
+        # 선택자 실패 시 클래스 기반 검색 (v10.5 신규)
+        if (not text or len(text) < 100) and not selector_stats.skip_tier(url, company, "class"):
+            tier_start = time.perf_counter()
+            log_html.debug("선택자 실패, 클래스 기반 검색으로 fallback")
+            if soup is None:
+                soup = parse_html(html)
+            text_blocks = soup.find_all(["td", "div"], class_=re.compile(r"view|content|article|report", re.I))
+            texts = [t for t in (b.get_text(strip=True) for b in text_blocks) if len(t) > 100]
+            if texts:
+                text = max(texts, key=len)
+                log_html.debug("클래스 기반 검색 성공: %d자", len(text))
+            selector_stats.record_tier(url, company, "class", bool(texts))
+            metrics.record("html_class_fallback", time.perf_counter() - tier_start)
+        
+        # 위 선택자로 못 찾으면 전체 본문에서 불필요한 부분 제거
+        if not text or len(text) < 100:  # 200자 → 100자로 완화
+            tier_start = time.perf_counter()
+            if text:
+                log_html.debug("선택자로 추출했지만 %d자밖에 안 됨, fallback 시도", len(text))
+            else:
+                log_html.debug("선택자 매칭 완전 실패, fallback 시도")
+            # 스크립트, 스타일 제거
+            if soup is None:
+                soup = parse_html(html)
+            for tag in soup(["script", "style", "nav", "footer", "header"]):
+                tag.decompose()
+            text = soup.get_text(separator="\n").strip()
+            log_html.debug("fallback step1: 전체 텍스트 추출 → %d자", len(text))
+            selector_stats.record_tier(url, company, "fulltext", len(text) >= 100)
             
-            # 위 선택자로 못 찾으면 전체 본문에서 불필요한 부분 제거
-            if not text or len(text) < 100:  # 200자 → 100자로 완화
-                if text:
-                    print(f"      [DEBUG HTML] 선택자로 추출했지만 {len(text)}자밖에 안 됨, fallback 시도")
-                else:
-                    print(f"      [DEBUG HTML] 선택자 매칭 완전 실패, fallback 시도")
-                # 스크립트, 스타일 제거
-                for tag in soup(["script", "style", "nav", "footer", "header"]):
-                    tag.decompose()
-                text = soup.get_text(separator="\n").strip()
-                print(f"      [DEBUG HTML] fallback step1: 전체 텍스트 추출 → {len(text)}자")
+            # 여전히 짧으면 모든 태그에서 가장 긴 텍스트 찾기 (개선)
+            if (not text or len(text) < 100) and not selector_stats.skip_tier(url, company, "longest"):
+                log_html.debug("fallback step2: 전체 태그 중 가장 긴 텍스트 검색...")
+                longest_text = ""
+                longest_len = 0
                 
-                # 여전히 짧으면 모든 태그에서 가장 긴 텍스트 찾기 (개선)
-                if not text or len(text) < 100:
-                    print(f"      [DEBUG HTML] fallback step2: 전체 태그 중 가장 긴 텍스트 검색...")
-                    longest_text = ""
-                    longest_len = 0
-                    
-                    for tag in soup.find_all(["p", "td", "div", "article", "section", "span"]):
-                        tag_text = tag.get_text(separator=" ").strip()
-                        # 광고/네비게이션 패턴 필터링
-                        if (len(tag_text) > longest_len and 
-                            len(tag_text) >= 100 and 
-                            not re.search(r"목록|조회|신한투자증권 리서치 탐색기|네이버|삭제|오류|주식거래", tag_text, re.IGNORECASE)):
-                            longest_text = tag_text
-                            longest_len = len(tag_text)
-                    
-                    if longest_text and longest_len >= 100:
-                        text = longest_text
-                        print(f"      [DEBUG HTML] fallback step2: 가장 긴 텍스트 발견 - {len(text)}자")
-                    elif longest_text and longest_len >= 50 and "신한" in company:
-                        # 신한투자는 50자 이상도 허용
-                        text = longest_text
-                        print(f"      [DEBUG HTML] fallback step2: 신한투자 본문 추출 - {len(text)}자")
-                    else:
-                        print(f"      [DEBUG HTML] fallback 실패: 최대 {longest_len}자만 발견됨")
-            
-            # 광고/네비게이션 텍스트 필터링
-            text = re.sub(r"\s+", " ", text.strip())
-            
-            # 404 에러 페이지 체크
-            error_patterns = [
-                r"방문하시려는 페이지의 주소가 잘못",
-                r"페이지의 주소가 변경",
-                r"삭제되었거나",
-                r"네이버 :: 세상의 모든 지식",
-            ]
-            
-            for pattern in error_patterns:
-                if re.search(pattern, text, re.IGNORECASE):
-                    return ""  # 에러 페이지는 빈 텍스트 반환
-            
-            # 유효한 본문인지 판단 (신한투자는 50자, 일반은 100자 이상)
-            min_length = 50 if "신한" in company else 100
-            if len(text) < min_length:
-                print(f"      [DEBUG HTML] 본문이 너무 짧음: {len(text)}자 (최소: {min_length}자)")
+                for tag in soup.find_all(["p", "td", "div", "article", "section", "span"]):
+                    tag_text = tag.get_text(separator=" ").strip()
+                    # 광고/네비게이션 패턴 필터링
+                    if (len(tag_text) > longest_len and 
+                        len(tag_text) >= 100 and 
+                        not rules.match("html_noise", tag_text)):
+                        longest_text = tag_text
+                        longest_len = len(tag_text)
+                
+                if longest_text and longest_len >= 100:
+                    text = longest_text
+                    log_html.debug("fallback step2: 가장 긴 텍스트 발견 - %d자", len(text))
+                elif longest_text and longest_len >= 50 and "신한" in company:
+                    # 신한투자는 50자 이상도 허용
+                    text = longest_text
+                    log_html.debug("fallback step2: 신한투자 본문 추출 - %d자", len(text))
+                else:
+                    log_html.debug("fallback 실패: 최대 %d자만 발견됨", longest_len)
+                selector_stats.record_tier(url, company, "longest", bool(longest_text))
+            metrics.record("html_fulltext_fallback", time.perf_counter() - tier_start)
+        
+        # 광고/네비게이션 텍스트 필터링
+        text = re.sub(r"\s+", " ", text.strip())
+        
+        # 404 에러 페이지 체크
+        if rules.match("html_error", text):
+            metrics.failure("html", "error_page")
+            return ""  # 에러 페이지는 빈 텍스트 반환
+        
+        # 유효한 본문인지 판단 (신한투자는 50자, 일반은 100자 이상)
+        min_length = 50 if "신한" in company else 100
+        if len(text) < min_length:
+            log_html.debug("본문이 너무 짧음: %d자 (최소: %d자)", len(text), min_length)
+            metrics.failure("html", "too_short")
+            return ""
+        
+        # 광고 패턴 체크 (더 정교하게, v13.8: 길이 조건 먼저 - 긴 본문은 정규식 생략)
+        if len(text) < 500 and rules.match("html_ad", text):
+            # 광고 텍스트가 주요 내용이고 전체가 짧으면 제외
+            metrics.failure("html", "ad_only")
+            return ""
+        
+        # 최종 정제 및 길이 제한 (3500자로 확장)
+        text = text[:3500]
+        log_html.debug("최종 추출 성공: %d자", len(text))
+        return text
+    
+    def _extract_static_html_text(self, url: str, company: str = "") -> str:
+        """정적 HTML 본문 추출 (v12.3: 마감 임박 시 Selenium 대신 requests + 동일 선택자 cascade)"""
+        try:
+            with metrics.stage("html_static"):
+                res = http_cache.get(url, headers=HEADERS, timeout=10)  # v14.0: 조건부 GET
+            metrics.add_bytes("html_static", transferred_bytes(res))
+            if res.status_code != 200:
+                metrics.failure("html_static", f"http_{res.status_code}")
                 return ""
+            if not res.encoding or res.encoding.lower() == "iso-8859-1":
+                res.encoding = res.apparent_encoding
+            return self._extract_body_text(res.text, company=company, url=url)
+        except Exception as e:
+            metrics.failure("html_static", type(e).__name__)
+            log_html.debug("정적 HTML 추출 실패: %s", e)
+            return ""
+    
+    def _fetch_report_text(self, report: dict, level: str = "full") -> tuple:
+        """브라우저 없이 가능한 본문 추출 (PDF 캐시/다운로드, static 단계면 정적 HTML) - v12.4: 분리"""
+        pdf_url = report.get("pdf_url")
+        url = report.get("url")
+        token = _current_report.set(report)  # v11.8: 하위 계측을 이 리포트에 귀속
+        try:
+            if level in ("title", "skip"):
+                return "", "없음"
             
-            # 광고 패턴 체크 (더 정교하게)
-            ad_patterns = [
-                r"네이버 주식거래연결.*빠른 주문.*도와드립니다",  # 연결된 광고 텍스트
-                r"^.{0,100}주석.*결론.*참고.*$",  # 너무 짧은 반복 패턴
-            ]
-            
-            for pattern in ad_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE | re.DOTALL)
-                if matches and len(text) < 500:
-                    # 광고 텍스트가 주요 내용이고 전체가 짧으면 제외
-                    return ""
+            if pdf_url:
+                # Phase 3: PDF 캐시 (URL 해시 → 추출 텍스트)
+                cache_key = hashlib.md5(pdf_url.encode("utf-8")).hexdigest()
+                text = _pdf_cache.get(cache_key, "")
+                metrics.cache_event("pdf_text", bool(text))
+                if not text:
+                    text = self._extract_pdf_text(pdf_url)
+                    if text:
+                        _pdf_cache[cache_key] = text
+                if text:
+                    return text, "PDF"
             
-            # 최종 정제 및 길이 제한 (3500자로 확장)
-            text = text[:3500]
-            print(f"      [DEBUG HTML] 최종 추출 성공: {len(text)}자")
-            return text
-        except Exception as e:
-            print(f"      [HTML 추출 실패: {e}]")
-            import traceback
-            traceback.print_exc()
-            return ""
+            if level == "static" and url:
+                text = self._extract_static_html_text(url, company=report["company"])
+                if text:
+                    return text, "HTML"
+            return "", "없음"
+        finally:
+            _current_report.reset(token)
+    
+    def _needs_browser(self, report: dict, text: str, level: str) -> bool:
+        return not text and level == "full" and bool(report.get("url"))
+    
+    def _browser_report_text(self, report: dict) -> tuple:
+        """Selenium HTML 본문 추출 (v12.4: 브라우저 슬롯 안에서 실행)"""
+        token = _current_report.set(report)
+        try:
+            with pools.browser():
+                text = self._extract_html_text(report["url"], company=report["company"])
+            return (text, "HTML") if text else ("", "없음")
+        finally:
+            _current_report.reset(token)
+    
+    def _finish_extract(self, report: dict, text: str, source_type: str, level: str) -> tuple:
+        token = _current_report.set(report)
+        try:
+            if not text and level not in ("title", "skip"):
+                metrics.failure("extract", "no_text")
+                trace_buffer.dump(report)  # v11.9: 실패한 리포트만 상세 trace 출력
+            if text and self.record:
+                ledger.mark(report, "extracted")  # v14.1
+            metrics.set_report_source(report, source_type)
+            return text, source_type
+        finally:
+            _current_report.reset(token)
+    
+    def _extract_report_text(self, report: dict, level: str = "full") -> tuple:
+        """단일 리포트 본문 추출 (PDF → HTML 순) - v11.7: 요약 단계와 분리
+        
+        v12.3: level - full(PDF → Selenium HTML), static(PDF → 정적 HTML), title/skip(추출 생략)
+        """
+        text, source_type = self._fetch_report_text(report, level)
+        if self._needs_browser(report, text, level):
+            text, source_type = self._browser_report_text(report)
+        return self._finish_extract(report, text, source_type, level)
     
-    def _summarize_report(self, report: dict, idx: int, total: int) -> dict:
-        """단일 리포트 요약 (gpt-4o-mini 사용)"""
+    def _summarize_text(self, report: dict, text: str, source_type: str, idx: int, total: int,
+                        level: str = "full") -> dict:
+        """추출된 본문으로 GPT 요약 (gpt-4o-mini 사용) - v11.7: 추출 단계와 분리
+        
+        v12.3: level이 skip이거나 요약 시점에 예산이 소진됐으면 LLM 호출 없이 None 반환
+        """
+        if level == "skip" or (deadline.enabled and deadline.remaining() <= 0):
+            if level != "skip":
+                deadline.mark_skipped(report, level)
+            log_llm.info("[SKIP] [%d/%s] 시간 예산 소진으로 요약 생략: %.35s", idx + 1, total or "?", report["title"])
+            trace_buffer.discard(report)
+            return None
         title = report["title"]
         company = report["company"]
         category = report["category"]
         pdf_url = report.get("pdf_url")
         url = report.get("url")
         
-        # v10.5: 진단 로그 추가
-        print(f"[TRACE] {idx+1}/{total} | {company} | {title[:40]}... | URLs: PDF={'O' if pdf_url else 'X'}, HTML={'O' if url else 'X'}")
-        
-        # PDF 또는 HTML 텍스트 추출
-        text = ""
-        source_type = "없음"
-        
-        if pdf_url:
-            text = self._extract_pdf_text(pdf_url)
-            if text:
-                source_type = "PDF"
-        
-        if not text and url:
-            text = self._extract_html_text(url, company=company)
-            if text:
-                source_type = "HTML"
-        
         # GPT 요약 (gpt-4o-mini)
-        text_preview = text[:2000] if text else '[본문 없음]'
+        # v13.0: 앞 2000자 절단 대신 문장 순위화로 토큰 예산 안의 결론/근거 문장만 전달 (면책 문구 제거)
+        text_preview = '[본문 없음]'
+        if text:
+            with metrics.stage("presummarize"):
+                text_preview = presummarizer.condense(text) or text[:2000]
         
-        # 디버그 로그 (상세) - ASCII로만 출력
+        # v11.9: 로그 핸들러가 UTF-8로 출력하므로 ASCII 변환 불필요, 포맷팅은 레벨 통과 시에만
         if text:
-            text_safe = text[:60].encode('ascii', 'ignore').decode('ascii')
-            print(f"      [{source_type}] {len(text)}자: {text_safe}...")
+            log_llm.debug("[%s] %d자: %.60s...", source_type, len(text), text)
+        elif level == "title":
+            log_llm.debug("[DEADLINE] 본문 추출 생략 → 제목 기반 요약: %.40s", title)
         else:
-            title_safe = title[:40].encode('ascii', 'ignore').decode('ascii')
-            print(f"\n[DIAG] {title_safe}")
-            if pdf_url:
-                print(f"   -> PDF URL: {pdf_url[:80]}")
-            if url:
-                print(f"   -> HTML URL: {url[:80]}")
-            print(f"   -> 원인: PDF와 HTML 둘 다 시도했으나 본문 추출 실패")
+            log_llm.warning("[DIAG] 본문 추출 실패 (PDF: %.80s / HTML: %.80s) → 제목 기반 요약: %.40s",
+                            pdf_url or "-", url or "-", title)
         
         # 본문 없으면 제목과 카테고리 기반으로만 요약
         if not text:
@@ -1074,54 +3346,201 @@ class ReportSummarizerTool(BaseTool):
 - 근거: "전세계 완화적 통화정책으로 유동성 확대 → 경제 회복 → 해운 물동량 증가"
 
 한 문장으로 압축하되 반드시 '기업명/산업명 + 결론 + 근거' 구조를 포함하여 작성:"""
+        token = _current_report.set(report)
+        llm_start = time.perf_counter()
         try:
-            resp = client.chat.completions.create(
-                model=LLM_SUMMARY,
-                messages=[
-                    {"role": "system", "content": "리포트 핵심 결론과 근거를 명확히 구분하여 요약. 결론(View)과 논리적 근거를 포함한 1문장으로 작성."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            resp = chat_completion("llm_summary", LLM_SUMMARY, [
+                {"role": "system", "content": "리포트 핵심 결론과 근거를 명확히 구분하여 요약. 결론(View)과 논리적 근거를 포함한 1문장으로 작성."},
+                {"role": "user", "content": prompt}
+            ])
+            metrics.add_usage(LLM_SUMMARY, resp.usage)
             summary = resp.choices[0].message.content.strip()
         except Exception as e:
+            metrics.failure("llm_summary", type(e).__name__)
             summary = f"[요약 실패: {e}]"
+        finally:
+            _current_report.reset(token)
+            deadline.observe(level, llm_sec=time.perf_counter() - llm_start)
+        
+        log_llm.info("[OK] [%d/%s] %.35s... (%s)", idx + 1, total or "?", title, company)
+        trace_buffer.discard(report)
+        result = {"title": title, "company": company, "category": category, "summary": summary}
+        # v13.4: 종목 식별자 (최종 브리핑에서 목표주가 이력 조회)
+        result.update({k: report[k] for k in ("ticker", "stock") if report.get(k)})
+        # v13.5: 제목 + 본문 앞부분을 종목 사전 자동자로 1회 스캔 → 대표 종목코드 목록
+        with metrics.stage("entity_match"):
+            tickers = entity_index.tag(report, text)
+        if tickers:
+            result["tickers"] = tickers
+        # v12.9: 투자의견/목표주가/주요 수치는 본문에서 정규식으로 추출해 요약 레코드에 첨부
+        if text:
+            with metrics.stage("field_extract"):
+                fields = field_extractor.extract(text)
+            if fields:
+                result["fields"] = fields
+        return result
+    
+    def _reuse_summary(self, report: dict):
+        """이미 요약한 리포트의 요약 (없으면 None) - 일괄/스트리밍 공통
+        
+        v12.6: 요약 캐시 (백필/재실행 시 같은 리포트는 추출·요약 1회)
+        v14.1: 원장(ledger_key)에 요약이 있으면 그것을 먼저 쓰고, 요약 캐시에서 찾은 경우에만 원장에 기록
+        """
+        stored = ledger.summary(report) if self.record else None
+        cached = stored if stored is not None else cached_summary(report_id(report))
+        metrics.cache_event("summary", cached is not None)
+        if cached is not None and self.record:
+            if stored is None:
+                ledger.mark(report, "summarized", summary=cached)  # 원장 도입 전 요약도 기록
+            else:
+                ledger.reuse(report)  # 업로드 성공 시 published로 표시되도록
+        return cached
+    
+    def _store_summary(self, report: dict, summary: dict, text: str, source_type: str):
+        """요약 결과를 요약 캐시/아카이브/원장에 기록 (summary가 None이면 원장 상태 유지)"""
+        failed = summary is None or summary["summary"].startswith("[요약 실패")
+        # 실패/제목 기반 요약은 캐시하지 않음 (다음 실행에서 본문 추출 재시도)
+        if not failed and source_type != "없음":
+            cache_summary(report_id(report), summary)
+        if not failed:
+            archive.record(report, summary, text, source_type)  # v13.1
+        ledger.record(report, summary, source_type)  # v14.1
+    
+    def _submit_report(self, report: dict, idx: int, total: int) -> Future:
+        """리포트 1건을 자원별 풀에 걸친 작업 그래프로 제출 (v12.4)
+        
+        fetch 풀(PDF/정적 HTML, 호스트별 제한) ─▶ (본문 없으면) browser 풀(Selenium) ─▶ llm 풀(요약)
+        각 단계는 해당 자원 슬롯만 점유하므로 느린 Chrome 세션이 LLM 처리량을 막지 않는다.
+        """
+        done = Future()
+        extract_start = []
+        
+        cached = self._reuse_summary(report)
+        if cached is not None:
+            deadline.release()  # order()에서 등록한 대기 건수 (plan()을 거치지 않음)
+            done.set_result(cached)
+            return done
+        
+        def guarded(fn):
+            def run(*args):
+                token = _current_report.set(report)  # v11.9: 추출~요약 전 구간 로그에 리포트 컨텍스트 부착
+                try:
+                    fn(*args)
+                except Exception as e:
+                    log_llm.error("리포트 처리 실패: %s", e)
+                    if self.record:
+                        ledger.mark(report, "failed", error=str(e))
+                    done.set_result({"title": report["title"], "company": report["company"],
+                                     "category": report["category"], "summary": f"[요약 실패: {e}]"})
+                finally:
+                    _current_report.reset(token)
+            return run
+        
+        @guarded
+        def fetch():
+            # v10.5: 진단 로그 추가
+            log_llm.debug("[TRACE] %d/%s | %s | %.40s... | URLs: PDF=%s, HTML=%s", idx + 1, total or "?",
+                          report["company"], report["title"], "O" if report.get("pdf_url") else "X",
+                          "O" if report.get("url") else "X")
+            # v12.3: 남은 시간 예산으로 품질 단계 결정
+            level = deadline.plan(report)
+            extract_start.append(time.perf_counter())
+            text, source_type = self._fetch_report_text(report, level)
+            if self._needs_browser(report, text, level):
+                pools.submit("browser", browser, level)
+            else:
+                finish(text, source_type, level)
+        
+        @guarded
+        def browser(level):
+            text, source_type = self._browser_report_text(report)
+            finish(text, source_type, level)
+        
+        def finish(text, source_type, level):
+            deadline.observe(level, extract_sec=time.perf_counter() - extract_start[0])
+            text, source_type = self._finish_extract(report, text, source_type, level)
+            pools.submit("llm", summarize, text, source_type, level)
+        
+        @guarded
+        def summarize(text, source_type, level):
+            summary = self._summarize_text(report, text, source_type, idx, total, level)
+            if self.record:
+                self._store_summary(report, summary, text, source_type)
+            elif summary:  # 큐 worker: 코디네이터가 기록하도록 추출 결과를 함께 반환
+                summary = {**summary, "source_type": source_type, "text": text if ARCHIVE_TEXT else ""}
+            done.set_result(summary)
         
-        title_safe = title[:35].encode('ascii', 'ignore').decode('ascii')
-        company_safe = company.encode('ascii', 'ignore').decode('ascii')
-        print(f"[OK] [{idx+1}/{total}] {title_safe}... ({company_safe})")
-        return {"title": title, "company": company, "category": category, "summary": summary}
+        pools.submit("fetch", fetch)
+        return done
+    
+    def iter_summaries(self, reports, total: int = 0, window: int = None):
+        """(원래 인덱스, 리포트) 순서대로 제출하고 완료 순으로 (인덱스, 리포트, 요약) yield
+        
+        v12.8: 처리 중인 리포트를 window개로 제한 → 추출 본문이 LLM 대기열에 무한정 쌓이지 않음
+        (window=0: 제한 없음). reports는 generator여도 됨 (수집과 요약이 겹쳐 진행).
+        """
+        window = INFLIGHT_REPORTS if window is None else window
+        in_flight = {}  # future → (인덱스, 리포트)
+        source = iter(reports)
+        exhausted = False
+        while True:
+            while not exhausted and (not window or len(in_flight) < window):
+                item = next(source, None)
+                if item is None:
+                    exhausted = True
+                    break
+                idx, report = item
+                in_flight[self._submit_report(report, idx, total)] = item
+            if not in_flight:
+                return
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx, report = in_flight.pop(future)
+                yield idx, report, future.result()
     
     def _run(self, reports_str: str) -> str:
         """전체 리포트 전수 요약 (병렬 처리)"""
         reports = eval(reports_str)
         total_reports = len(reports)
-        print(f"\n[INFO] 총 {total_reports}개 리포트 전수 요약 시작 (병렬 처리)")
+        log_llm.info("총 %d개 리포트 전수 요약 시작 (병렬 처리)", total_reports)
         
-        summaries = []
-        # v10.5: 병렬 실행 (HTML/iframe 접근은 부하 큼 → 워커 수 축소)
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = {
-                executor.submit(self._summarize_report, r, i, total_reports): i
-                for i, r in enumerate(reports)
-            }
-            for future in as_completed(futures):
-                summaries.append(future.result())
-                time.sleep(0.1)
+        # v12.3: 우선순위 순으로 제출 (풀은 제출 순서대로 처리), 생략된 리포트는 제외
+        # v12.4: 단일 4-워커 풀 대신 fetch/browser/llm 풀에 걸친 리포트별 작업 그래프
+        summaries = [(idx, summary)
+                     for idx, _, summary in self.iter_summaries(deadline.order(reports), total_reports)
+                     if summary is not None]
+        summaries = [s for _, s in sorted(summaries, key=lambda x: x[0])]
         
-        print(f"\n[OK] 총 {len(summaries)}개 리포트 요약 완료")
+        log_llm.info("[OK] 총 %d개 리포트 요약 완료", len(summaries))
         return str(summaries)
 
 # ----------------------------------------------------------
 # 4️⃣ 최종 브리핑
 # ----------------------------------------------------------
+def group_by_stock(reports: list, texts: list) -> list:
+    """종목분석 요약 줄 → 대표 종목별 그룹 (v13.5: 리포트 수 많은 종목 먼저, 그룹 안은 증권사순, 같은 증권사 중복 제거)"""
+    groups = {}
+    for report, text in zip(reports, texts):
+        ticker = (report.get("tickers") or [report.get("ticker")])[0]
+        groups.setdefault(ticker, {})[(report.get("company"), report.get("summary"))] = text
+    ordered = sorted((t for t in groups if t), key=lambda t: (-len(groups[t]), entity_index.name(t)))
+    lines = []
+    for ticker in ordered + ([None] if None in groups else []):
+        title = f"**{entity_index.name(ticker)} ({ticker})**" if ticker else "**(종목 미식별)**"
+        lines.append(f"{title} - {len(groups[ticker])}건")
+        lines.extend(text for _, text in sorted(groups[ticker].items(), key=lambda kv: kv[0][0] or ""))
+    return lines
+
 class FinalBriefingTool(BaseTool):
     name: str = "Final Briefing Tool"
     description: str = "각 리포트 요약을 종합해 투자 브리핑 작성"
     
-    def _run(self, summaries_str: str, analysis_str: str) -> str:
-        """최종 브리핑 생성"""
+    def _run(self, summaries_str: str, analysis_str: str, run_date: datetime = None) -> str:
+        """최종 브리핑 생성 (v12.6: run_date로 브리핑 날짜 지정 가능 - 백필 날짜별 병렬 생성)"""
         summaries = eval(summaries_str)
         analysis = eval(analysis_str)
+        day_display = run_date.strftime("%Y.%m.%d") if run_date else today_display
+        day_file = run_date.strftime("%Y-%m-%d") if run_date else today_file
         
         # 카테고리별로 리포트 그룹화
         by_category = {}
@@ -1133,10 +3552,21 @@ class FinalBriefingTool(BaseTool):
         
         # 카테고리별 요약 정리
         category_summaries = []
+        tp_history_count = 0
         for cat in ['투자정보', '종목분석', '산업분석', '경제분석']:
             if cat in by_category:
                 reports = by_category[cat]
                 summary_texts = [f"- {r['summary']} ({r['company']})" for r in reports]
+                # v12.9: 정형 필드(투자의견/목표주가 등)는 본문 대신 한 줄로 첨부
+                summary_texts = [t + (f"\n  [정형] {format_fields(r['fields'])}" if r.get("fields") else "")
+                                 for t, r in zip(summary_texts, reports)]
+                # v13.4: 같은 증권사 직전 리포트 대비 목표주가/투자의견 변화는 아카이브 이력으로 계산해 사실로 전달
+                deltas = [target_price_delta(r, day_file) for r in reports]
+                tp_history_count += sum(1 for d in deltas if d)
+                summary_texts = [t + (f"\n  [이력] {format_tp_delta(d)}" if d else "")
+                                 for t, d in zip(summary_texts, deltas)]
+                if cat == "종목분석":
+                    summary_texts = group_by_stock(reports, summary_texts)
                 category_summaries.append(f"\n### {cat} ({len(reports)}건)\n" + "\n".join(summary_texts))
         
         # 카테고리별 리포트 개수 집계
@@ -1145,13 +3575,19 @@ class FinalBriefingTool(BaseTool):
             cat = s.get('category', '기타')
             category_counts[cat] = category_counts.get(cat, 0) + 1
         category_summary_text = ", ".join([f"{k} {v}건" for k, v in category_counts.items()])
+        if tp_history_count:
+            log_llm.info("[이력] %s: 직전 리포트 대비 목표주가/투자의견 변화 %d건", day_file, tp_history_count)
         
-        prompt = f"""아래는 {today_display} 기준 수집된 증권사 리포트들이다.
+        prompt = f"""아래는 {day_display} 기준 수집된 증권사 리포트들이다.
 
 **핵심 원칙: LLM의 추가 해석, 추론, 투자 조언 절대 금지**
 
 - '비중 확대', '매수', '목표주가 상향' 등은 해당 리포트에서 실제로 언급된 경우에만 그대로 적기
 - 숫자(EPS, 영업이익, 목표주가 등)는 전부 어느 증권사 리포트에서 온 것인지 명시 필수
+- [정형] 줄은 리포트 본문에서 규칙 기반으로 추출한 투자의견/목표주가/이전 목표주가/수치이므로 그대로 사용 (없는 항목은 '미기재')
+- [이력] 줄은 같은 증권사의 직전 리포트와 비교해 계산한 값이므로 '이전 대비' 표현은 [이력]/[정형]에 있을 때만 그대로 사용
+- 종목분석은 종목 사전으로 미리 묶은 **종목명 (종목코드)** 그룹 순서 그대로 1번 섹션을 작성 (그룹을 합치거나 나누지 않기)
+- [키워드 추세]는 과거 리포트 제목 집계이므로 섹터/테마 요약에서 '최근 언급 급증/신규 등장' 근거로만 사용
 - LLM이 임의로 계산한 수치나 업사이드는 절대 적지 않기
 - 리포트에 기재되지 않은 정보나 결론은 절대 추가하지 않기
 
@@ -1160,6 +3596,12 @@ class FinalBriefingTool(BaseTool):
 [키워드 분석]
 {analysis.get("top_keywords", "N/A")}
 
+[키워드 추세 (직전 {TREND_SHORT_DAYS}/{TREND_LONG_DAYS}개 발행일 대비, 규칙 기반 집계)]
+{analysis.get("trend_keywords", "기준 데이터 부족")}
+
+[리포트 많은 종목 (제목 기준 종목 사전 집계)]
+{analysis.get("top_stocks", "N/A")}
+
 ---
 **출력 형식 (이 형식 고정):**
 
@@ -1173,9 +3615,9 @@ class FinalBriefingTool(BaseTool):
 
 **[종목명]**
 
-- 증권사 / 날짜: [예: 대신증권 / {today_display}]
+- 증권사 / 날짜: [예: 대신증권 / {day_display}]
 - 투자의견 등급: [BUY/SELL/HOLD 등 리포트 표현 그대로. 없으면 '미기재']
-- 목표주가: [XX원. 이전 대비 상향/하향 언급 포함. 없으면 '미기재']
+- 목표주가: [XX원. [이력]/[정형]에 이전 목표주가가 있으면 '이전 XX원 → XX원 (+X.X%, 상향)' 그대로. 없으면 '미기재']
 - 핵심 내용 (결론 + 근거): [2~3줄로 리포트 원문 내용 요약. 반드시 '결론 + 근거' 구조 포함. 예: "3Q25 영업이익 234억원 전망 (전년 대비 +40%). 신규 수주 확대로 중장기 성장 모멘텀 강화. 실적 발표 일정 주목." (대신증권)]
 
 (동일 종목에 여러 증권사 리포트가 있으면 모두 bullet으로 나열)
@@ -1241,18 +3683,17 @@ class FinalBriefingTool(BaseTool):
 - "원하시면" 같은 질문 금지"""
         
         try:
-            resp = client.chat.completions.create(
-                model=LLM_BRIEFING,
-                messages=[
-                    {"role": "system", "content": "증권사 리포트 정보 정리 전문가. 섹션 1-3은 리포트 원문 내용만 정확하게 정리. 섹션 4(투자 시사점)은 전체 리포트를 종합·요약하여 핵심 시사점 도출. 섹션 5는 리포트 명시 일정만 나열. 불필요한 질문이나 마무리 문구는 절대 포함하지 않음."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
+            resp = chat_completion("llm_briefing", LLM_BRIEFING, [
+                {"role": "system", "content": "증권사 리포트 정보 정리 전문가. 섹션 1-3은 리포트 원문 내용만 정확하게 정리. 섹션 4(투자 시사점)은 전체 리포트를 종합·요약하여 핵심 시사점 도출. 섹션 5는 리포트 명시 일정만 나열. 불필요한 질문이나 마무리 문구는 절대 포함하지 않음."},
+                {"role": "user", "content": prompt}
+            ])
+            metrics.add_usage(LLM_BRIEFING, resp.usage)
             body = resp.choices[0].message.content.strip()
         except Exception as e:
+            metrics.failure("llm_briefing", type(e).__name__)
             body = f"[브리핑 생성 실패: {e}]"
         
-        header = f"# {today_file} 일일 증권사 리포트 브리핑\n\n*총 {analysis['total_reports']}건 기반 / {today_display} 발행*\n\n"
+        header = f"# {day_file} 일일 증권사 리포트 브리핑\n\n*총 {analysis['total_reports']}건 기반 / {day_display} 발행*\n\n"
         return header + body
 
 # ----------------------------------------------------------
@@ -1262,8 +3703,9 @@ class NotionUploadTool(BaseTool):
     name: str = "Notion Upload Tool"
     description: str = "최종 브리핑과 분석결과를 Notion DB에 업로드"
     
-    def _run(self, briefing_text: str, analysis_str: str) -> str:
-        """Notion에 업로드"""
+    def _run(self, briefing_text: str, analysis_str: str, run_date: datetime = None) -> str:
+        """Notion에 업로드 (v12.6: run_date로 페이지 날짜 지정 가능)"""
+        day_file = run_date.strftime("%Y-%m-%d") if run_date else today_file
         try:
             analysis = eval(analysis_str)
             total_reports = analysis.get("total_reports", 0)
@@ -1271,10 +3713,11 @@ class NotionUploadTool(BaseTool):
             page_data = {
                 "parent": {"database_id": NOTION_DATABASE_ID},
                 "properties": {
-                    "Name": {"title": [{"text": {"content": f"{today_file} 일일 브리핑"}}]},
-                    "Date": {"date": {"start": today_file}},
+                    "Name": {"title": [{"text": {"content": f"{day_file} 일일 브리핑"}}]},
+                    "Date": {"date": {"start": day_file}},
                     "총 리포트 수": {"number": total_reports},
-                    "Top Keywords": {"rich_text": [{"text": {"content": analysis.get("top_keywords", "")[:2000]}}]},
+                    "Top Keywords": {"rich_text": [{"text": {"content": (analysis.get("top_keywords", "") + (
+                        f" | {analysis['trend_keywords']}" if analysis.get("trend_keywords") else ""))[:2000]}}]},
                     "Category Summary": {"rich_text": [{"text": {"content": str(analysis.get("category_summary", {}))[:2000]}}]},
                 },
                 "children": []
@@ -1290,21 +3733,232 @@ class NotionUploadTool(BaseTool):
                     }
                 })
             
-            res = requests.post("https://api.notion.com/v1/pages", headers=NOTION_HEADERS, json=page_data)
+            pools.notion_wait()  # v12.4: Notion 3 req/s 제한
+            with metrics.stage("notion_upload"):
+                res = requests.post(f"{NOTION_API_BASE}/pages", headers=NOTION_HEADERS, json=page_data)
+            metrics.add_bytes("notion_upload", len(res.request.body or b""))
             if not res.ok:
+                metrics.failure("notion_upload", f"http_{res.status_code}")
                 return f"⚠️ Notion 업로드 실패: {res.status_code} - {res.text}"
             res.raise_for_status()
             parent_id = res.json().get("id", "")
             return f"[OK] Notion 업로드 완료 (Page ID: {parent_id})"
         except Exception as e:
+            metrics.failure("notion_upload", type(e).__name__)
             return f"⚠️ Notion 업로드 실패: {e}"
 
+# ----------------------------------------------------------
+# 🔀 스트리밍 파이프라인 (v11.7: 수집 → 중복 제거 → 추출 → 요약 단계 중첩)
+# ----------------------------------------------------------
+_STOP = object()  # 단계 종료 신호
+
+class StageQueue:
+    """단계 간 bounded queue (v11.7: 백프레셔 + 큐 깊이 측정)"""
+    
+    def __init__(self, name: str, maxsize: int, priority=None):
+        self.name = name
+        # v12.3: priority(item) → 정렬 키가 주어지면 우선순위 큐 (같은 키는 들어온 순서, 종료 신호는 맨 뒤)
+        self.priority = priority
+        self._seq = 0
+        self._q = queue.PriorityQueue(maxsize=maxsize) if priority else queue.Queue(maxsize=maxsize)
+        self._lock = threading.Lock()
+        self.maxsize = maxsize
+        self.items = 0
+        self.max_depth = 0
+        self.depth_sum = 0
+        self.put_wait = 0.0  # 큐가 가득 차서 생산자가 대기한 시간 (백프레셔)
+        self.get_wait = 0.0  # 큐가 비어서 소비자가 대기한 시간 (기아)
+    
+    def put(self, item):
+        start = time.perf_counter()
+        if self.priority:
+            with self._lock:
+                self._seq += 1
+                seq = self._seq
+            key = (float("inf"),) if item is _STOP else self.priority(item)
+            self._q.put((key, seq, item))
+        else:
+            self._q.put(item)
+        waited = time.perf_counter() - start
+        with self._lock:
+            self.put_wait += waited
+            if item is not _STOP:
+                depth = self._q.qsize()
+                self.items += 1
+                self.depth_sum += depth
+                self.max_depth = max(self.max_depth, depth)
+    
+    def get(self):
+        start = time.perf_counter()
+        item = self._q.get()
+        with self._lock:
+            self.get_wait += time.perf_counter() - start
+        return item[2] if self.priority else item
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "items": self.items,
+                "maxsize": self.maxsize,
+                "max_depth": self.max_depth,
+                "avg_depth": round(self.depth_sum / self.items, 2) if self.items else 0,
+                "put_wait_sec": round(self.put_wait, 3),
+                "get_wait_sec": round(self.get_wait, 3),
+            }
+
+class StreamingPipeline:
+    """리포트 발견 즉시 추출/요약까지 흘려보내는 생산자-소비자 파이프라인 (v11.7)
+    
+    scrapers ─▶ [discovered] ─▶ dedup ─▶ [extract] ─▶ 추출 워커 ─▶ [summarize] ─▶ 요약 워커
+    큐가 가득 차면 앞 단계가 대기하므로 느린 단계가 전체 속도를 자연스럽게 조절한다.
+    """
+    
+    def __init__(self, summarizer, queue_size=PIPELINE_QUEUE_SIZE,
+                 extract_workers=EXTRACT_WORKERS, summary_workers=SUMMARY_WORKERS, incremental: bool = False):
+        self.summarizer = summarizer
+        self.incremental = incremental  # v14.1: 원장상 처리 완료된 리포트는 분석에만 넣고 추출/요약 생략
+        self.extract_workers = max(1, extract_workers)
+        self.summary_workers = max(1, summary_workers)
+        self.discovered = StageQueue("discovered", queue_size)
+        self.to_extract = StageQueue("extract", queue_size,
+                                     priority=lambda item: DeadlineScheduler.priority(item[1]))
+        self.to_summarize = StageQueue("summarize", queue_size)
+        self.reports = []  # 중복 제거된 리포트 (분석 단계 입력)
+        self.summaries = []
+        self._lock = threading.Lock()
+        self._extract_done = 0
+        self.processed = 0  # 추출/요약으로 넘긴 리포트 수
+    
+    def _scrape(self, scraper, dates=None):
+        try:
+            scraper._run(on_report=self.discovered.put, dates=dates)
+        except Exception as e:
+            log_pipeline.warning("%s 수집 실패: %s", scraper.name, e)
+    
+    def _dedup(self):
+        seen = set()
+        while True:
+            report = self.discovered.get()
+            if report is _STOP:
+                break
+            key = (report["title"], report["company"])
+            if key in seen:
+                continue
+            seen.add(key)
+            self.reports.append(report)
+            if not ledger.discover(report) and self.incremental:
+                continue
+            self.processed += 1
+            # v14.1: 요약 캐시/원장에 있는 리포트는 추출·요약 없이 바로 요약 목록에 (일괄 경로와 같은 조회)
+            cached = self.summarizer._reuse_summary(report)
+            if cached is not None:
+                with self._lock:
+                    self.summaries.append((len(self.reports) - 1, cached))
+                continue
+            deadline.add_pending()
+            self.to_extract.put((len(self.reports) - 1, report))
+        for _ in range(self.extract_workers):
+            self.to_extract.put(_STOP)
+    
+    def _extract(self):
+        try:
+            while True:
+                item = self.to_extract.get()
+                if item is _STOP:
+                    break
+                idx, report = item
+                token = _current_report.set(report)
+                level = "full"
+                try:
+                    level = deadline.plan(report)  # v12.3: 남은 예산으로 품질 단계 결정
+                    extract_start = time.perf_counter()
+                    text, source_type = self.summarizer._extract_report_text(report, level)
+                    deadline.observe(level, extract_sec=time.perf_counter() - extract_start)
+                except Exception as e:
+                    log_pipeline.error("본문 추출 실패: %s", e)
+                    text, source_type = "", "없음"
+                finally:
+                    _current_report.reset(token)
+                self.to_summarize.put((idx, report, text, source_type, level))
+        finally:
+            # 마지막 추출 워커가 요약 단계 종료 신호 전달
+            with self._lock:
+                self._extract_done += 1
+                last = self._extract_done == self.extract_workers
+            if last:
+                for _ in range(self.summary_workers):
+                    self.to_summarize.put(_STOP)
+    
+    def _summarize(self):
+        while True:
+            item = self.to_summarize.get()
+            if item is _STOP:
+                break
+            idx, report, text, source_type, level = item
+            token = _current_report.set(report)
+            try:
+                summary = self.summarizer._summarize_text(report, text, source_type, idx, len(self.reports), level)
+            except Exception as e:
+                summary = {"title": report["title"], "company": report["company"],
+                           "category": report["category"], "summary": f"[요약 실패: {e}]"}
+            finally:
+                _current_report.reset(token)
+            self.summarizer._store_summary(report, summary, text, source_type)
+            if summary is None:  # v12.3: 시간 예산 소진으로 생략
+                continue
+            with self._lock:
+                self.summaries.append((idx, summary))
+    
+    def run(self, scrapers, dates=None) -> tuple:
+        """파이프라인 실행 → (중복 제거된 리포트, 요약 리스트)"""
+        producers = [threading.Thread(target=self._scrape, args=(s, dates), daemon=True) for s in scrapers]
+        workers = [threading.Thread(target=self._dedup, daemon=True)]
+        workers += [threading.Thread(target=self._extract, daemon=True) for _ in range(self.extract_workers)]
+        workers += [threading.Thread(target=self._summarize, daemon=True) for _ in range(self.summary_workers)]
+        for t in producers + workers:
+            t.start()
+        for t in producers:
+            t.join()
+        self.discovered.put(_STOP)  # 모든 수집기 종료 → 중복 제거 단계 종료
+        for t in workers:
+            t.join()
+        summaries = [s for _, s in sorted(self.summaries, key=lambda x: x[0])]
+        return self.reports, summaries
+    
+    def queue_stats(self) -> dict:
+        return {q.name: q.stats() for q in (self.discovered, self.to_extract, self.to_summarize)}
+
 # ----------------------------------------------------------
 # 6️⃣ 실행 (Phase 3: PDF 캐싱 추가)
 # ----------------------------------------------------------
-def load_pdf_cache():
-    """Phase 3: PDF 캐시 로드"""
-    cache_file = "pdf_cache.json"
+_pdf_cache = {}  # Phase 3: PDF URL 해시 → 추출 텍스트 (run_daily_briefing에서 로드/저장)
+
+_summary_cache = {}  # v12.6: report_id → 요약 dict + cached_at (summary_cache.json에 저장, 백필 시 리포트당 1회 요약)
+
+def cached_summary(key: str):
+    """요약 캐시 조회 → 요약 dict 사본 (없으면 None), 적중하면 마지막 사용 시각 갱신"""
+    entry = _summary_cache.get(key)
+    if entry is None:
+        return None
+    entry["cached_at"] = time.time()
+    return {k: v for k, v in entry.items() if k != "cached_at"}
+
+def cache_summary(key: str, summary: dict):
+    _summary_cache[key] = {**summary, "cached_at": time.time()}
+
+def prune_summary_cache(days: float = None) -> int:
+    """SUMMARY_CACHE_DAYS일 넘게 쓰이지 않은 요약 삭제 → 삭제 수 (cached_at 없는 예전 형식 항목 포함)"""
+    days = SUMMARY_CACHE_DAYS if days is None else days
+    if days <= 0:
+        return 0
+    cutoff = time.time() - days * 86400
+    stale = [key for key, entry in _summary_cache.items() if entry.get("cached_at", 0) < cutoff]
+    for key in stale:
+        del _summary_cache[key]
+    return len(stale)
+
+def load_pdf_cache(cache_file: str = "pdf_cache.json"):
+    """Phase 3: PDF 캐시 로드 (v12.6: 요약 캐시도 같은 형식으로 로드)"""
     if os.path.exists(cache_file):
         try:
             with open(cache_file, 'r', encoding='utf-8') as f:
@@ -1313,51 +3967,125 @@ def load_pdf_cache():
             return {}
     return {}
 
-def save_pdf_cache(cache):
+def save_pdf_cache(cache, cache_file: str = "pdf_cache.json"):
     """Phase 3: PDF 캐시 저장"""
-    cache_file = "pdf_cache.json"
     try:
         with open(cache_file, 'w', encoding='utf-8') as f:
             json.dump(cache, f, ensure_ascii=False, indent=2)
     except Exception as e:
-        print(f"[WARN] 캐시 저장 실패: {e}")
+        log.warning("캐시 저장 실패: %s", e)
+
+def load_caches():
+    """PDF 텍스트 / 요약 캐시 로드 (실행 시작 시)"""
+    _pdf_cache.clear()
+    _pdf_cache.update(load_pdf_cache())
+    _summary_cache.clear()
+    _summary_cache.update(load_pdf_cache(SUMMARY_CACHE_FILE))
+    selector_stats.load()  # v13.7
+    http_cache.reset_stats()  # v14.0
+    ledger.reset_stats()  # v14.1
+    print(f"[INFO] PDF 캐시 로드: {len(_pdf_cache)}건 저장됨 / 요약 캐시: {len(_summary_cache)}건")
 
-def run_daily_briefing():
-    """전체 파이프라인 실행 (Phase 3: PDF 캐싱 적용)"""
+def save_caches():
+    save_pdf_cache(_pdf_cache)
+    prune_summary_cache()
+    save_pdf_cache(_summary_cache, SUMMARY_CACHE_FILE)
+    selector_stats.save()
+    http_cache.prune()
+
+def run_daily_briefing(run_date: datetime = None, dates: list = None, incremental: bool = None):
+    """전체 파이프라인 실행 (Phase 3: PDF 캐싱 적용)
+    
+    v12.2: run_date(기본: 현재 시각)/dates(기본: run_date 기준)로 실행 날짜를 명시할 수 있음
+    v14.1: incremental(기본: BRIEFING_INCREMENTAL) - 원장상 새/실패 리포트만 추출·요약하고, 같은 날짜의 이전 요약과
+           병합해 브리핑 생성. 새로 요약된 것도 미게시 요약도 없으면 브리핑/Notion 생략
+    """
     import sys
     sys.stdout.reconfigure(encoding='utf-8', errors='replace')
     sys.stderr.reconfigure(encoding='utf-8', errors='replace')
     
-    print(f"[START] {today_display} Daily Briefing 시작 (v11.6 - 결론/근거 구조 명확화)")
+    setup_logging()
+    dates = list(set_run_date(run_date, dates))
+    incremental = INCREMENTAL if incremental is None else incremental
+    print(f"[START] {today_display} Daily Briefing 시작 (v14.1 - 처리 원장/증분 실행, 모드: {PIPELINE_MODE}"
+          f"{', 증분' if incremental else ''})")
     
-    # Phase 3: PDF 캐시 로드
-    pdf_cache = load_pdf_cache()
-    print(f"[INFO] PDF 캐시 로드: {len(pdf_cache)}건 저장됨")
+    metrics.reset(run_date=today_file)
+    # v12.3: 마감 시간 예산은 실행 시작부터 계산 (수집 시간 포함)
+    deadline.reset(DEADLINE_SEC, DEADLINE_RESERVE_SEC,
+                   workers=EXTRACT_WORKERS if PIPELINE_MODE == "streaming" else LLM_CONCURRENCY)
+    pools.reset_stats()
+    presummarizer.reset_stats()
+    rules.reset_stats()
     
-    # 1. 리포트 수집
-    print("\n[1/5] 리포트 수집 중...")
-    naver_tool = NaverResearchScraperTool()
-    hankyung_tool = HankyungScraperTool()
-    naver_reports = eval(naver_tool._run())
-    hankyung_reports = eval(hankyung_tool._run())
-    all_reports = naver_reports + hankyung_reports
+    # Phase 3: PDF 캐시 로드 / v12.6: 요약 캐시 로드
+    load_caches()
     
-    if len(all_reports) == 0:
-        print("[INFO] 리포트 없음")
-        return "[INFO] 없음"
+    if PIPELINE_MODE == "streaming":
+        # v11.7: 수집/추출/요약을 bounded queue로 중첩 실행, 분석은 큐가 비워진 뒤 수행
+        print("\n[1-3/5] 스트리밍 파이프라인 실행 중 (수집 → 추출 → 요약)...")
+        pipeline = StreamingPipeline(ReportSummarizerTool(), incremental=incremental)
+        all_reports, summaries = pipeline.run(source_tools(), dates=dates)
+        processed = pipeline.processed
+        
+        if len(all_reports) == 0:
+            print("[INFO] 리포트 없음")
+            return "[INFO] 없음"
+        
+        print(f"\n[OK] 총 {len(all_reports)}개 리포트 수집/요약 완료")
+        metrics.extra["queues"] = pipeline.queue_stats()
+        print("   [QUEUE] 단계 | 처리 | 최대깊이 | 평균깊이 | 생산자 대기(s) | 소비자 대기(s)")
+        for name, st in pipeline.queue_stats().items():
+            print(f"   [QUEUE] {name:<10} | {st['items']:>4} | {st['max_depth']:>3}/{st['maxsize']:<3} | "
+                  f"{st['avg_depth']:>6} | {st['put_wait_sec']:>8} | {st['get_wait_sec']:>8}")
+        
+        print("\n[2/5] 키워드 분석 중...")
+        analysis = eval(PythonAnalyzerTool()._run(str(all_reports)))
+        print(f"   [OK] 키워드: {analysis['top_keywords'][:100]}...")
+        if analysis.get("trend_keywords"):
+            print(f"   [OK] 추세: {analysis['trend_keywords'][:150]}")
+    else:
+        # 1. 리포트 수집
+        print("\n[1/5] 리포트 수집 중...")
+        all_reports = []
+        for tool in source_tools():  # v13.6: BRIEFING_SOURCES 순서 (기본: 네이버 → 한경)
+            all_reports += eval(tool._run(dates=dates))
+    
+        if len(all_reports) == 0:
+            print("[INFO] 리포트 없음")
+            return "[INFO] 없음"
     
-    print(f"\n[OK] 총 {len(all_reports)}개 리포트 수집 완료\n")
+        print(f"\n[OK] 총 {len(all_reports)}개 리포트 수집 완료\n")
     
-    # 2. 분석
-    print("[2/5] 키워드 분석 중...")
-    analyzer = PythonAnalyzerTool()
-    analysis = eval(analyzer._run(str(all_reports)))
-    print(f"   [OK] 키워드: {analysis['top_keywords'][:100]}...")
+        # 2. 분석
+        print("[2/5] 키워드 분석 중...")
+        analyzer = PythonAnalyzerTool()
+        analysis = eval(analyzer._run(str(all_reports)))
+        print(f"   [OK] 키워드: {analysis['top_keywords'][:100]}...")
+        if analysis.get("trend_keywords"):
+            print(f"   [OK] 추세: {analysis['trend_keywords'][:150]}")
     
-    # 3. 리포트별 요약
-    print("\n[3/5] 리포트 요약 중...")
-    summarizer = ReportSummarizerTool()
-    summaries = eval(summarizer._run(str(analysis["reports"])))
+        # 3. 리포트별 요약 (v12.8: 분석 결과 대신 중복 제거 generator 결과를 전달)
+        print("\n[3/5] 리포트 요약 중...")
+        summarizer = ReportSummarizerTool()
+        unique = list(iter_unique(all_reports))
+        todo = ledger.pending(unique)  # v14.1: 원장에 발견 기록 → 새/실패 리포트
+        if not incremental:
+            todo = unique
+        processed = len(todo)
+        summaries = eval(summarizer._run(str(todo))) if todo else []
+    
+    # v14.1: 증분 실행 - 같은 날짜의 원장 요약(이번에 처리한 것 포함)으로 병합, 바뀐 것이 없으면 종료
+    published_keys = list(ledger.run_keys)
+    if incremental and ledger.enabled:
+        print(f"\n[INCREMENTAL] 리포트 {len(all_reports)}건 중 처리 {processed}건, 요약 {len(summaries)}건 "
+              f"(원장 재사용 {ledger.run['skipped']}건)")
+        if not ledger.run_keys and not ledger.unpublished(dates):
+            print("[INCREMENTAL] 새 요약/미게시 요약 없음 → 브리핑/Notion 생략")
+            finish_run()
+            return "[INFO] 변경 없음"
+        published_keys, summaries = ledger.summaries(dates)
+        print(f"[INCREMENTAL] 원장 병합 → 요약 {len(summaries)}건")
     
     # 4. 브리핑 생성
     print("\n[4/5] 최종 브리핑 생성 중...")
@@ -1370,20 +4098,1423 @@ def run_daily_briefing():
     notion_tool = NotionUploadTool()
     result = notion_tool._run(briefing, str(analysis))
     print(f"   {result}")
+    if result.startswith("[OK]"):
+        ledger.publish(published_keys)  # v14.1
     
-    print("\n[COMPLETE] 모든 작업 완료!")
+    finish_run()
     return briefing
 
-if __name__ == "__main__":
-    weekday = datetime.today().weekday()
+def finish_run():
+    """캐시 저장 + 스케줄러/풀/AIMD 상태를 계측에 기록하고 저장 (v12.6: 일일/백필 공통)"""
+    # Phase 3: PDF 캐시 저장 / v11.8: 계측 결과 저장
+    save_caches()
+    metrics.extra["deadline"] = deadline.stats()
+    metrics.extra["pools"] = pools.stats()
+    metrics.extra["aimd"] = pools.adaptive_stats()
+    metrics.extra["presummarize"] = presummarizer.stats()
+    metrics.extra["selectors"] = dict(selector_stats.run)  # v13.7: 이번 실행의 선택자/fallback 적중
+    metrics.extra["rules"] = rules.stats()  # v13.8: 규칙별 적중 수
+    metrics.extra["http_cache"] = http_cache.stats()  # v14.0: 조건부 GET/파싱 재사용 결과
+    metrics.extra["ledger"] = ledger.stats()  # v14.1: 발견/재사용/상태 전이 수
+    if ledger.run:
+        print("[LEDGER] " + " / ".join(f"{name} {n}" for name, n in sorted(ledger.run.items())))
+    if http_cache.run:
+        print("[HTTP-CACHE] " + " / ".join(f"{name} {n}" for name, n in sorted(http_cache.run.items())))
+    if selector_stats.run:
+        print("[SELECTOR] " + " / ".join(f"{name} {n}" for name, n in selector_stats.run.most_common(6)))
+    print("[AIMD] " + " / ".join(f"{name} {st['limit']}(최대 {st['peak_limit']}, 감소 {st['decreases']})"
+                                 for name, st in metrics.extra["aimd"].items()))
+    pools.shutdown()
+    if deadline.degraded:
+        levels = deadline.stats()["levels"]
+        print(f"\n[DEADLINE] 품질 저하 {len(deadline.degraded)}건 (static {levels.get('static', 0)} / "
+              f"title {levels.get('title', 0)} / skip {levels.get('skip', 0)})")
+    metrics_path = metrics.write()
+    archive.flush(run_metrics=metrics.to_dict())  # v13.1: 남은 리포트 + 실행 계측 요약
+    try:
+        start = time.perf_counter()
+        added = search_index.update(archive)  # v13.3: 이번 실행에서 아카이브된 리포트만 새 세그먼트로
+        if added:
+            print(f"[SEARCH] 색인 +{added}건 ({(time.perf_counter() - start) * 1000:.0f}ms, {search_index.stats()['segments']}개 세그먼트)")
+    except Exception as e:
+        log.warning("검색 색인 갱신 실패: %s", e)
+    print("\n[METRICS] 단계별 계측 요약")
+    print(metrics.summary_table())
+    print(f"[METRICS] 저장: {metrics_path}")
+    
+    print("\n[COMPLETE] 모든 작업 완료!")
+
+# ----------------------------------------------------------
+# 🗄️ 리포트 아카이브 (v13.1: 실행마다 리포트/본문/요약/정형 필드/키워드/계측을 SQLite에 누적 → 조회 CLI)
+# ----------------------------------------------------------
+class ReportArchive:
+    """SQLite 리포트 아카이브
+
+    - reports: 리포트 1건 = 1행 (report_id 기준 upsert), 날짜/증권사/종목코드/종목명/카테고리 인덱스
+    - texts: 추출 본문 (zlib 압축, BRIEFING_ARCHIVE_TEXT=0이면 저장 안 함)
+    - keywords / keyword_days: 날짜별 제목 키워드 수와 리포트 수 → 키워드 추세 기준
+      (수집 단계에서 발견한 리포트 전체로 index_keywords()가 기록, 그 외 날짜는 flush 때 아카이브 행으로 재계산)
+    - runs: 실행별 계측 요약
+    - tp_history: (종목코드/종목명, 증권사, 날짜) → 목표주가/투자의견 (직전 리포트 조회용 기본키 색인)
+    요약 단계에서 record()로 쌓아 ARCHIVE_BATCH건마다 기록하고, 실행 종료 시 flush()로 나머지와 키워드를 기록한다.
+    """
+
+    COLUMNS = ("report_id", "date", "source", "category", "company", "ticker", "stock", "title", "url", "pdf_url",
+               "source_type", "summary", "rating", "rating_change", "target_price", "prev_target_price", "tp_change",
+               "current_price", "eps", "operating_profit", "run_date", "archived_at")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self._pending = []  # (reports 행, 본문)
+        self._dirty_days = set()  # 행이 추가된 날짜 (flush 시 키워드 재계산)
+        self._indexed_days = set()  # 발견 시점에 키워드를 기록한 날짜 (flush 재계산 제외)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS reports (
+                    report_id TEXT PRIMARY KEY, date TEXT, source TEXT, category TEXT, company TEXT,
+                    ticker TEXT, stock TEXT, title TEXT, url TEXT, pdf_url TEXT, source_type TEXT, summary TEXT,
+                    rating TEXT, rating_change TEXT, target_price INTEGER, prev_target_price INTEGER,
+                    tp_change TEXT, current_price INTEGER, eps TEXT, operating_profit TEXT,
+                    run_date TEXT, archived_at TEXT);
+                CREATE INDEX IF NOT EXISTS reports_date ON reports (date);
+                CREATE INDEX IF NOT EXISTS reports_company ON reports (company, date);
+                CREATE INDEX IF NOT EXISTS reports_ticker ON reports (ticker, date);
+                CREATE INDEX IF NOT EXISTS reports_stock ON reports (stock, date);
+                CREATE INDEX IF NOT EXISTS reports_category ON reports (category, date);
+                CREATE TABLE IF NOT EXISTS texts (report_id TEXT PRIMARY KEY, text BLOB);
+                CREATE TABLE IF NOT EXISTS keywords (
+                    date TEXT, keyword TEXT, count INTEGER, PRIMARY KEY (date, keyword));
+                CREATE TABLE IF NOT EXISTS keyword_days (date TEXT PRIMARY KEY, reports INTEGER);
+                CREATE TABLE IF NOT EXISTS runs (run_date TEXT, finished_at TEXT, metrics TEXT);
+                CREATE TABLE IF NOT EXISTS tp_history (
+                    stock_key TEXT, company TEXT, date TEXT, report_id TEXT, target_price INTEGER, rating TEXT,
+                    PRIMARY KEY (stock_key, company, date, report_id));
+            """)
+            # v13.4: 이력 색인 도입 전 아카이브는 첫 연결 시 reports에서 채움
+            if self._db.execute("SELECT 1 FROM tp_history LIMIT 1").fetchone() is None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO tp_history SELECT COALESCE(ticker, stock), company, date, report_id, "
+                        "target_price, rating FROM reports WHERE COALESCE(ticker, stock) IS NOT NULL "
+                        "AND (target_price IS NOT NULL OR rating IS NOT NULL)")
+            # 예전 report_id(출처+증권사+제목 10자리) 행은 첫 연결 시 nid/URL·날짜를 포함한 키로 변환
+            old = self._db.execute("SELECT report_id, source, url, pdf_url, date, company, title FROM reports "
+                                   "WHERE length(report_id) = 10").fetchall()
+            if old:
+                mapping = [(report_id({"source": s, "url": u, "pdf_url": p, "date": d, "company": c, "title": t}), rid)
+                           for rid, s, u, p, d, c, t in old]
+                with self._db:
+                    for table in ("reports", "texts", "tp_history"):
+                        self._db.executemany(f"UPDATE OR REPLACE {table} SET report_id = ? WHERE report_id = ?",
+                                             mapping)
+        return self._db
+
+    def record(self, report: dict, summary: dict, text: str = "", source_type: str = ""):
+        """요약 완료된 리포트 1건 적재 예약 (스레드 안전, ARCHIVE_BATCH건마다 기록)"""
+        if not self.enabled or not summary:
+            return
+        fields = summary.get("fields") or {}
+        row = {
+            "report_id": report_id(report), "date": normalize_date(report.get("date", "")),
+            "source": report.get("source"), "category": report.get("category"), "company": report.get("company"),
+            "ticker": report.get("ticker"), "stock": report.get("stock"), "title": report.get("title"),
+            "url": report.get("url"), "pdf_url": report.get("pdf_url"), "source_type": source_type,
+            "summary": summary.get("summary"), "run_date": today_file,
+            "archived_at": datetime.now().isoformat(timespec="seconds"),
+            **{k: fields.get(k) for k in ("rating", "rating_change", "target_price", "prev_target_price",
+                                          "tp_change", "current_price", "eps", "operating_profit")},
+        }
+        with self._lock:
+            self._pending.append((row, text if ARCHIVE_TEXT else ""))
+            if len(self._pending) >= ARCHIVE_BATCH:
+                self._write()
+
+    def _write(self):
+        """예약된 행 기록 (호출자가 _lock 보유) - 키워드는 flush()에서 날짜별로 한 번만 재계산"""
+        import zlib
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            db = self._connect()
+            with db:
+                db.executemany(
+                    f"INSERT OR REPLACE INTO reports ({', '.join(self.COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    [tuple(row[c] for c in self.COLUMNS) for row, _ in pending])
+                db.executemany("INSERT OR REPLACE INTO texts (report_id, text) VALUES (?, ?)",
+                               [(row["report_id"], zlib.compress(text.encode("utf-8")))
+                                for row, text in pending if text])
+                db.executemany("INSERT OR REPLACE INTO tp_history VALUES (?, ?, ?, ?, ?, ?)",
+                               [(row["ticker"] or row["stock"], row["company"], row["date"], row["report_id"],
+                                 row["target_price"], row["rating"]) for row, _ in pending
+                                if (row["ticker"] or row["stock"]) and (row["target_price"] or row["rating"])])
+            self._dirty_days.update(row["date"] for row, _ in pending if row["date"])
+        except Exception as e:
+            log.warning("아카이브 기록 실패 (%d건): %s", len(pending), e)
+
+    def index_keywords(self, days: dict):
+        """날짜별 (키워드 Counter, 리포트 수) 기록 - ReportAnalyzer.days (요약/아카이브 여부와 무관하게 발견한 리포트 전체)
+
+        요약된 리포트만으로 기준을 만들면 본문 추출이 잘 되는 증권사/카테고리 키워드가 과대 집계되므로
+        수집 단계의 집계를 그대로 쓴다.
+        """
+        if not self.enabled or not days:
+            return
+        with self._lock:
+            try:
+                db = self._connect()
+                with db:
+                    for day, (keywords, reports) in days.items():
+                        db.execute("DELETE FROM keywords WHERE date = ?", (day,))
+                        db.executemany("INSERT INTO keywords (date, keyword, count) VALUES (?, ?, ?)",
+                                       [(day, k, c) for k, c in keywords.items()])
+                        db.execute("INSERT OR REPLACE INTO keyword_days (date, reports) VALUES (?, ?)",
+                                   (day, reports))
+                self._indexed_days.update(days)
+            except Exception as e:
+                log.warning("아카이브 키워드 색인 실패: %s", e)
+
+    def flush(self, run_metrics: dict = None):
+        """남은 행 기록 + 이번 실행에서 추가된 날짜(발견 시점에 색인한 날짜 제외)의 키워드 재계산 (+ 실행 계측 요약)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._write()
+            days, self._dirty_days = sorted(self._dirty_days - self._indexed_days), set()
+            if not days and run_metrics is None:
+                return
+            try:
+                db = self._connect()
+                with db:
+                    for day in days:
+                        analyzer = ReportAnalyzer(tag_entities=False)
+                        for title, company, category in db.execute(
+                                "SELECT title, company, category FROM reports WHERE date = ?", (day,)):
+                            analyzer.add({"title": title, "company": company, "category": category})
+                        db.execute("DELETE FROM keywords WHERE date = ?", (day,))
+                        db.executemany("INSERT INTO keywords (date, keyword, count) VALUES (?, ?, ?)",
+                                       [(day, k, c) for k, c in analyzer.keywords.items()])
+                        db.execute("INSERT OR REPLACE INTO keyword_days (date, reports) VALUES (?, ?)",
+                                   (day, len(analyzer.seen)))
+                    if run_metrics is not None:
+                        summary = {k: run_metrics.get(k) for k in ("elapsed_sec", "stages", "tokens", "cache",
+                                                                   "failures", "presummarize", "backfill")}
+                        db.execute("INSERT INTO runs (run_date, finished_at, metrics) VALUES (?, ?, ?)",
+                                   (run_metrics.get("run_date"), datetime.now().isoformat(timespec="seconds"),
+                                    json.dumps(summary, ensure_ascii=False)))
+            except Exception as e:
+                log.warning("아카이브 키워드/실행 기록 실패: %s", e)
+
+    # --- 조회 -------------------------------------------------
+    def _rows(self, sql: str, params: tuple) -> list:
+        with self._lock:
+            cur = self._connect().execute(sql, params)
+            names = [d[0] for d in cur.description]
+            return [dict(zip(names, row)) for row in cur.fetchall()]
+
+    def reports(self, company: str = None, stock: str = None, category: str = None, since: str = None,
+                until: str = None, limit: int = 50) -> list:
+        """조건별 리포트 (최신순). stock은 종목코드 또는 종목명/제목 일부"""
+        where, params = [], []
+        if company:
+            where.append("company = ?")
+            params.append(company)
+        if stock:
+            where.append("(ticker = ? OR stock = ? OR title LIKE ?)")
+            params += [stock, stock, f"%{stock}%"]
+        if category:
+            where.append("category = ?")
+            params.append(category)
+        if since:
+            where.append("date >= ?")
+            params.append(since)
+        if until:
+            where.append("date <= ?")
+            params.append(until)
+        sql = ("SELECT date, company, category, ticker, stock, title, rating, target_price, prev_target_price, "
+               "tp_change, summary FROM reports" + (" WHERE " + " AND ".join(where) if where else "")
+               + " ORDER BY date DESC, company LIMIT ?")
+        return self._rows(sql, tuple(params) + (limit,))
+
+    def target_prices(self, stock: str, since: str = None) -> list:
+        """종목의 목표주가 이력 (날짜순) + 같은 증권사 직전 목표주가 대비 변화"""
+        rows = self._rows(
+            "SELECT date, company, stock, ticker, rating, target_price, prev_target_price, tp_change, title "
+            "FROM reports WHERE target_price IS NOT NULL AND (ticker = ? OR stock = ? OR title LIKE ?) "
+            "AND date >= ? ORDER BY date, company", (stock, stock, f"%{stock}%", since or ""))
+        last = {}
+        for row in rows:
+            prev = row["prev_target_price"] or last.get(row["company"])
+            row["prev_target_price"] = prev
+            if prev and not row["tp_change"]:
+                row["tp_change"] = ("상향" if row["target_price"] > prev
+                                    else "하향" if row["target_price"] < prev else "유지")
+            row["change_pct"] = f"{(row['target_price'] / prev - 1) * 100:+.1f}%" if prev else None  # v13.4
+            last[row["company"]] = row["target_price"]
+        return rows
+
+    def previous_target(self, stock_key: str, company: str, before: str):
+        """같은 종목·같은 증권사의 before 이전 마지막 목표주가/투자의견 (기본키 색인 1회 탐색) → dict 또는 None
+
+        투자의견만 추출된 행은 건너뛴다 (그 행을 고르면 직전 목표주가가 없는 것으로 보여 변화율을 못 구함).
+        """
+        if not self.enabled or not stock_key or not os.path.exists(self.path):
+            return None
+        rows = self._rows("SELECT date, target_price, rating FROM tp_history WHERE stock_key = ? AND company = ? "
+                          "AND date < ? AND target_price IS NOT NULL ORDER BY date DESC LIMIT 1",
+                          (stock_key, company, before))
+        return rows[0] if rows else None
+
+    def keywords(self, since: str = None, until: str = None, top: int = 20) -> list:
+        return self._rows("SELECT keyword, SUM(count) AS count, COUNT(DISTINCT date) AS days FROM keywords "
+                          "WHERE date >= ? AND date <= ? GROUP BY keyword ORDER BY count DESC LIMIT ?",
+                          (since or "", until or "9999-12-31", top))
+
+    def keyword_trends(self, day: str, counts: Counter, total: int) -> dict:
+        """day의 키워드 수(counts, 리포트 total건) vs 직전 TREND_LONG_DAYS개 발행일 기준 → 급증/신규/이탈 키워드
+
+        기준은 날짜별 키워드 비중(키워드 수 / 그날 리포트 수)이며, 색인에서 기준 기간 행만 읽으므로
+        아카이브 기간이 길어져도 실행당 비용은 일정하다.
+        - rising: z = (오늘 비중 - 긴 기준 평균) / 긴 기준 표준편차(최소 리포트 1건분) ≥ TREND_Z, 2회 이상
+                  lift = (오늘 수 + 1) / (짧은 기준 평균 비중 × 오늘 리포트 수 + 1)
+        - new: 긴 기준 기간에 한 번도 없던 키워드 (2회 이상)
+        - dropped: 짧은 기준 기간 평균 2회 이상(오늘 규모 환산)이었는데 오늘 0회
+        """
+        if not self.enabled or not total or not os.path.exists(self.path):
+            return {}
+        import math
+        days = self._rows("SELECT date, reports FROM keyword_days WHERE date < ? AND reports > 0 "
+                          "ORDER BY date DESC LIMIT ?", (day, TREND_LONG_DAYS))
+        if len(days) < TREND_MIN_DAYS:
+            return {"baseline_days": len(days)}
+        reports = {row["date"]: row["reports"] for row in days}
+        short_days = [row["date"] for row in days[:TREND_SHORT_DAYS]]
+        shares = {}  # 키워드 → {날짜: 비중}
+        for row in self._rows(f"SELECT date, keyword, count FROM keywords WHERE date IN "
+                              f"({', '.join('?' * len(reports))})", tuple(reports)):
+            shares.setdefault(row["keyword"], {})[row["date"]] = row["count"] / reports[row["date"]]
+        n_long, floor = len(reports), 1 / (sum(reports.values()) / len(reports))
+        rising, new, dropped = [], [], []
+        for keyword in set(counts) | set(shares):
+            count, history = counts.get(keyword, 0), shares.get(keyword, {})
+            short_mean = sum(history.get(d, 0.0) for d in short_days) / len(short_days)
+            if not history:
+                if count >= 2:
+                    new.append({"keyword": keyword, "count": count})
+                continue
+            if not count:
+                expected = short_mean * total
+                if expected >= 2:
+                    dropped.append({"keyword": keyword, "expected": round(expected, 1)})
+                continue
+            mean = sum(history.values()) / n_long
+            std = math.sqrt(sum((history.get(d, 0.0) - mean) ** 2 for d in reports) / n_long)
+            z = (count / total - mean) / max(std, floor)
+            if count >= 2 and z >= TREND_Z:
+                rising.append({"keyword": keyword, "count": count, "z": round(z, 1),
+                               "lift": round((count + 1) / (short_mean * total + 1), 1)})
+        rising.sort(key=lambda r: (-r["z"], r["keyword"]))
+        new.sort(key=lambda r: (-r["count"], r["keyword"]))
+        dropped.sort(key=lambda r: (-r["expected"], r["keyword"]))
+        return {"baseline_days": n_long, "rising": rising[:10], "new": new[:10], "dropped": dropped[:10]}
+
+    def stats(self) -> dict:
+        rows = self._rows("SELECT COUNT(*) AS reports, MIN(date) AS first, MAX(date) AS last, "
+                          "COUNT(DISTINCT date) AS days, COUNT(target_price) AS with_target_price FROM reports", ())
+        runs = self._rows("SELECT COUNT(*) AS runs FROM runs", ())
+        return {**rows[0], **runs[0]}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+archive = ReportArchive(ARCHIVE_PATH)
+
+def target_price_delta(summary: dict, day: str) -> dict:
+    """요약 레코드(정형 필드 + 종목) vs 아카이브의 같은 증권사 직전 리포트 → 변화 dict (비교 대상 없으면 {})"""
+    fields = summary.get("fields") or {}
+    if not (fields.get("target_price") or fields.get("rating")):
+        return {}
+    prev = archive.previous_target(summary.get("ticker") or summary.get("stock"), summary.get("company"), day)
+    if not prev:
+        return {}
+    delta = {"prev_date": prev["date"], "days": (datetime.strptime(day, "%Y-%m-%d")
+                                                 - datetime.strptime(prev["date"], "%Y-%m-%d")).days}
+    tp, prev_tp = fields.get("target_price"), prev["target_price"]
+    if tp and prev_tp:
+        delta.update(prev_target_price=prev_tp, target_price=tp, change_pct=round((tp / prev_tp - 1) * 100, 1),
+                     tp_change="상향" if tp > prev_tp else "하향" if tp < prev_tp else "유지")
+    if fields.get("rating") and prev["rating"]:
+        delta.update(prev_rating=prev["rating"], rating=fields["rating"])
+    return delta
+
+def format_tp_delta(delta: dict) -> str:
+    """변화 → 한 줄 ("직전 2025-09-12 대비 목표주가 95,000원 → 110,000원 (+15.8%, 상향) / 투자의견 HOLD → BUY / 37일 만")"""
+    parts = []
+    if delta.get("target_price"):
+        parts.append(f"목표주가 {delta['prev_target_price']:,}원 → {delta['target_price']:,}원 "
+                     f"({delta['change_pct']:+.1f}%, {delta['tp_change']})")
+    if delta.get("rating"):
+        parts.append(f"투자의견 {delta['prev_rating']} → {delta['rating']}" if delta["rating"] != delta["prev_rating"]
+                     else f"투자의견 유지({delta['rating']})")
+    return f"직전 {delta['prev_date']} 대비 " + " / ".join(parts + [f"{delta['days']}일 만"])
+
+def archive_cli(args) -> list:
+    """archive 하위 명령 → 결과 행 (표 출력 + 소요 ms)"""
+    store = ReportArchive(args.db)
+    since = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d") if args.days else None
+    start = time.perf_counter()
+    if args.action == "tp":
+        rows = store.target_prices(args.stock, since=since)
+        columns = ("date", "company", "stock", "rating", "target_price", "prev_target_price", "change_pct", "tp_change")
+    elif args.action == "keywords":
+        rows = store.keywords(since=since, top=args.limit)
+        columns = ("keyword", "count", "days")
+    elif args.action == "stats":
+        rows = [store.stats()]
+        columns = tuple(rows[0])
+    else:
+        rows = store.reports(company=args.company, stock=args.stock, category=args.category, since=since,
+                             limit=args.limit)
+        columns = ("date", "company", "category", "stock", "title", "rating", "target_price", "tp_change")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    store.close()
+    print(" | ".join(columns))
+    for row in rows:
+        print(" | ".join("" if row.get(c) is None else f"{row[c]:,}" if isinstance(row[c], int) and c != "days"
+                         else str(row[c])[:40] for c in columns))
+    print(f"[ARCHIVE] {len(rows)}행 / {elapsed_ms:.1f}ms ({args.db})")
+    return rows
+
+# ----------------------------------------------------------
+# 📒 처리 원장 (v14.1: 리포트별 처리 상태를 실행 간 누적 → 증분 실행은 새/실패 리포트만 처리하고 기존 요약과 병합)
+# ----------------------------------------------------------
+def ledger_key(report: dict) -> str:
+    """실행 간 안정적인 리포트 식별자: 출처 + nid(없으면 URL) + 증권사 + 정규화한 제목 (공백/기호 제거, 소문자)"""
+    title = re.sub(r"[\W_]+", "", report.get("title", "")).lower()
+    key = f"{report.get('source', '')}|{report_ref(report)}|{report.get('company', '')}|{title}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+class ReportLedger:
+    """SQLite 처리 원장 (LEDGER_PATH)
+
+    - ledger: 리포트 1건 = 1행 (ledger_key 기준), 상태 discovered → extracted → summarized → published (+ failed)
+    - 상태는 앞으로만 진행 (failed는 summarized/published가 아닐 때만, 시도 횟수 증가)
+    - 요약 레코드를 함께 저장 → 증분 실행은 이번에 처리하지 않은 리포트의 요약을 원장에서 가져와 병합
+    - failed는 LEDGER_MAX_ATTEMPTS번까지 다음 실행에서 재시도 (본문 없이 제목으로 만든 요약도 failed로 남겨 재시도)
+    """
+
+    RANK = {"discovered": 0, "failed": 1, "extracted": 2, "summarized": 3, "published": 4}
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+        self.run = Counter()  # 이번 실행: new/pending/skipped + 상태별 전이 수
+        self.run_keys = []    # 이번 실행에서 요약이 기록되거나 재사용된 키 (게시 표시 대상)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self):
+        if self._db is None:
+            import sqlite3
+            self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS ledger (
+                    key TEXT PRIMARY KEY, report_id TEXT, source TEXT, ref TEXT, company TEXT, title TEXT,
+                    date TEXT, state TEXT, attempts INTEGER DEFAULT 0, error TEXT, summary TEXT,
+                    first_seen TEXT, updated_at TEXT, run_date TEXT);
+                CREATE INDEX IF NOT EXISTS ledger_date ON ledger (date, state);
+            """)
+        return self._db
+
+    def _insert(self, db, key: str, report: dict, now: str) -> bool:
+        cur = db.execute(
+            "INSERT OR IGNORE INTO ledger (key, report_id, source, ref, company, title, date, state, first_seen, "
+            "updated_at, run_date) VALUES (?, ?, ?, ?, ?, ?, ?, 'discovered', ?, ?, ?)",
+            (key, report_id(report), report.get("source"), report_ref(report), report.get("company"),
+             report.get("title"), normalize_date(report.get("date", "")), now, now, today_file))
+        return cur.rowcount > 0
+
+    def discover(self, report: dict) -> bool:
+        """발견 기록 → 이번 실행에서 처리할 리포트인지 (새 리포트, 요약 전, 재시도 횟수가 남은 실패)"""
+        if not self.enabled:
+            return True
+        key = ledger_key(report)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            db = self._connect()
+            with db:
+                if self._insert(db, key, report, now):
+                    self.run["new"] += 1
+                state, attempts = db.execute("SELECT state, attempts FROM ledger WHERE key = ?", (key,)).fetchone()
+            todo = state not in ("summarized", "published") and not (state == "failed" and attempts >= LEDGER_MAX_ATTEMPTS)
+            self.run["pending" if todo else "skipped"] += 1
+        return todo
+
+    def pending(self, reports) -> list:
+        return [report for report in reports if self.discover(report)]
+
+    def mark(self, report: dict, state: str, summary: dict = None, error: str = ""):
+        """상태 전이 기록 (되돌리는 전이는 무시, 원장에 없으면 추가 - 백필/worker 경로)"""
+        if not self.enabled:
+            return
+        key = ledger_key(report)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            db = self._connect()
+            with db:
+                self._insert(db, key, report, now)
+                current = db.execute("SELECT state FROM ledger WHERE key = ?", (key,)).fetchone()[0]
+                if state == "failed":
+                    if current in ("summarized", "published"):
+                        return
+                elif self.RANK[state] <= self.RANK.get(current, 0) and current != "failed":
+                    return
+                db.execute(
+                    "UPDATE ledger SET state = ?, attempts = attempts + ?, error = ?, "
+                    "summary = COALESCE(?, summary), updated_at = ?, run_date = ? WHERE key = ?",
+                    (state, state == "failed", error[:200] or None,
+                     json.dumps(summary, ensure_ascii=False) if summary else None, now, today_file, key))
+            self.run[state] += 1
+            if summary:
+                self.run_keys.append(key)
+
+    def record(self, report: dict, summary: dict, source_type: str):
+        """요약 단계 결과 → summarized / failed (요약 실패, 또는 본문 없이 제목으로 만든 요약)"""
+        if summary is None:  # 시간 예산으로 생략 → 상태 유지, 다음 실행에서 다시 처리
+            return
+        if summary["summary"].startswith("[요약 실패"):
+            self.mark(report, "failed", error=summary["summary"])
+        elif source_type == "없음":
+            self.mark(report, "failed", summary=summary, error="no_text")
+        else:
+            self.mark(report, "summarized", summary=summary)
+
+    def summary(self, report: dict):
+        """ledger_key로 저장된 요약 (summarized/published일 때만, 없으면 None)"""
+        if not self.enabled or not os.path.exists(self.path):
+            return None
+        with self._lock:
+            row = self._connect().execute("SELECT summary FROM ledger WHERE key = ? AND summary IS NOT NULL "
+                                          "AND state IN ('summarized', 'published')",
+                                          (ledger_key(report),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def reuse(self, report: dict):
+        """원장 요약을 그대로 브리핑에 쓴 리포트 → 게시 표시 대상에 추가 (상태는 그대로)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.run["reused"] += 1
+            self.run_keys.append(ledger_key(report))
+
+    def summaries(self, dates) -> tuple:
+        """해당 날짜들의 저장된 요약 (처음 발견된 순) → (키 리스트, 요약 리스트) - 증분 실행의 병합 결과"""
+        days = sorted({normalize_date(d) for d in dates if normalize_date(d)})
+        if not self.enabled or not days:
+            return [], []
+        with self._lock:
+            rows = self._connect().execute(
+                f"SELECT key, summary FROM ledger WHERE date IN ({', '.join('?' * len(days))}) "
+                "AND summary IS NOT NULL ORDER BY first_seen, rowid", days).fetchall()
+        return [key for key, _ in rows], [json.loads(summary) for _, summary in rows]
+
+    def unpublished(self, dates) -> int:
+        """요약은 됐지만 아직 게시되지 않은 리포트 수 (직전 업로드 실패 등)"""
+        days = sorted({normalize_date(d) for d in dates if normalize_date(d)})
+        if not self.enabled or not days:
+            return 0
+        with self._lock:
+            return self._connect().execute(
+                f"SELECT COUNT(*) FROM ledger WHERE date IN ({', '.join('?' * len(days))}) AND state = 'summarized'",
+                days).fetchone()[0]
+
+    def publish(self, keys):
+        """브리핑에 포함되어 업로드된 리포트 → published (제목 요약으로 남은 failed는 재시도 대상으로 유지)"""
+        keys = list(dict.fromkeys(keys))
+        if not self.enabled or not keys:
+            return
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            db = self._connect()
+            with db:
+                cur = db.executemany("UPDATE ledger SET state = 'published', updated_at = ? "
+                                     "WHERE key = ? AND state = 'summarized'", [(now, key) for key in keys])
+            self.run["published"] += cur.rowcount
+
+    def states(self, day: str = None) -> dict:
+        """상태별 리포트 수 (day: YYYY-MM-DD)"""
+        with self._lock:
+            sql = "SELECT state, COUNT(*) FROM ledger" + (" WHERE date = ?" if day else "") + " GROUP BY state"
+            return dict(self._connect().execute(sql, (day,) if day else ()).fetchall())
+
+    def rows(self, day: str = None, state: str = None, limit: int = 50) -> list:
+        where, params = [], []
+        if day:
+            where.append("date = ?")
+            params.append(day)
+        if state:
+            where.append("state = ?")
+            params.append(state)
+        sql = ("SELECT date, state, attempts, company, title, error, updated_at FROM ledger"
+               + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY first_seen DESC LIMIT ?")
+        with self._lock:
+            cur = self._connect().execute(sql, params + [limit])
+            columns = [c[0] for c in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+    def reset_stats(self):
+        with self._lock:
+            self.run = Counter()
+            self.run_keys = []
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.run)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+ledger = ReportLedger(LEDGER_PATH)
+
+def ledger_cli(args) -> list:
+    """ledger 하위 명령: 날짜별 상태 수 + 리포트 행 (--state failed로 재시도 대상 확인)"""
+    store = ReportLedger(args.db)
+    day = args.date.strftime("%Y-%m-%d") if args.date else None
+    states = store.states(day)
+    rows = store.rows(day, args.state, args.limit)
+    store.close()
+    columns = ("date", "state", "attempts", "company", "title", "error")
+    print(" | ".join(columns))
+    for row in rows:
+        print(" | ".join("" if row[c] is None else str(row[c])[:40] for c in columns))
+    print(f"[LEDGER] {day or '전체'}: " + " / ".join(f"{s} {states[s]}" for s in ReportLedger.RANK if s in states))
+    return rows
+
+# ----------------------------------------------------------
+# 🔎 전문 검색 (v13.3: 아카이브 본문/요약 BM25 역색인, 불변 세그먼트 파일 mmap + 세그먼트 병합)
+# ----------------------------------------------------------
+SEARCH_WORD = re.compile(r"[가-힣]+|[A-Za-z][A-Za-z0-9]*|\d+(?:\.\d+)?")
+SEARCH_ALPHA_PREFIX = re.compile(r"[a-z]*")
+
+def search_tokens(text: str) -> list:
+    """검색용 토큰: 영문은 소문자(숫자 붙은 토큰은 영문 접두어도 - HBM3E → hbm3e, hbm),
+    한글은 조사 제거 단어 + 3자 이상이면 음절 bigram (원전수출 → 원전수출, 원전, 전수, 수출)"""
+    tokens = []
+    for word in SEARCH_WORD.findall(text or ""):
+        if "가" <= word[0] <= "힣":
+            if len(word) > 2:
+                word = ExtractiveSummarizer.JOSA.sub("", word)
+            if len(word) >= 2:
+                tokens.append(word)
+            if len(word) >= 3:
+                tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        elif word[0].isdigit():
+            tokens.append(word)
+        else:
+            word = word.lower()
+            if len(word) >= 2:
+                tokens.append(word)
+            alpha = SEARCH_ALPHA_PREFIX.match(word).group()
+            if alpha != word and len(alpha) >= 2:
+                tokens.append(alpha)
+    return tokens
+
+class SearchSegment:
+    """불변 세그먼트 파일 1개 (mmap, 로드 시 전체를 읽지 않음)
+
+    헤더: magic, 문서 수, 용어 수, 전체 토큰 수, 섹션 오프셋 6개
+    섹션: 문서 길이 u32[n] | 문서 메타 오프셋 u64[n+1] | 문서 메타(JSON) | 용어 색인 (문자열 위치, 포스팅 위치, df)[용어순]
+          | 용어 문자열 | 포스팅 (문서 번호 u32, tf u32)[df]
+    용어 조회는 용어 색인 이분 탐색 (O(log V)), 포스팅은 memoryview로 바로 읽는다.
+    """
+
+    MAGIC = b"BRSG0001"
+    HEADER = "<8sIIQ6Q"
+    TERM = "<QIQI"  # 문자열 오프셋, 문자열 길이, 포스팅 오프셋, df
+
+    def __init__(self, path: str):
+        import mmap, struct
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.n_docs, self.n_terms, self.total_len, *offsets = struct.unpack_from(self.HEADER, self._mm, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"세그먼트 형식 오류: {path}")
+        (self._lens_off, self._meta_idx_off, self._meta_off, self._terms_off,
+         self._strs_off, self._post_off) = offsets
+        self._meta_idx = memoryview(self._mm)[self._meta_idx_off:self._meta_idx_off + 8 * (self.n_docs + 1)].cast("Q")
+        self._term_size = struct.calcsize(self.TERM)
+        self._unpack_term = struct.Struct(self.TERM).unpack_from
+
+    @staticmethod
+    def write(path: str, docs: list):
+        """[(메타 dict, Counter(토큰))] → 세그먼트 파일 (임시 파일에 쓴 뒤 rename)"""
+        import struct
+        from array import array
+        postings = {}
+        lens = array("I")
+        metas = []
+        for doc, (meta, counts) in enumerate(docs):
+            lens.append(sum(counts.values()))
+            metas.append(json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+            for term, tf in counts.items():
+                postings.setdefault(term.encode("utf-8"), array("I")).extend((doc, tf))
+        meta_idx = array("Q", [0])
+        for blob in metas:
+            meta_idx.append(meta_idx[-1] + len(blob))
+        terms, strs, posts = bytearray(), bytearray(), bytearray()
+        for term in sorted(postings):
+            plist = postings[term]
+            terms += struct.pack(SearchSegment.TERM, len(strs), len(term), len(posts), len(plist) // 2)
+            strs += term
+            posts += plist.tobytes()
+        sections = [lens.tobytes(), meta_idx.tobytes(), b"".join(metas), bytes(terms), bytes(strs), bytes(posts)]
+        offsets, pos = [], struct.calcsize(SearchSegment.HEADER)
+        for blob in sections:
+            pos = (pos + 7) // 8 * 8  # u64 정렬
+            offsets.append(pos)
+            pos += len(blob)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(struct.pack(SearchSegment.HEADER, SearchSegment.MAGIC, len(docs), len(postings),
+                                sum(lens), *offsets))
+            for off, blob in zip(offsets, sections):
+                f.write(b"\0" * (off - f.tell()))
+                f.write(blob)
+        os.replace(tmp, path)
+
+    def _term_at(self, i: int) -> tuple:
+        str_off, str_len, post_off, df = self._unpack_term(self._mm, self._terms_off + i * self._term_size)
+        start = self._strs_off + str_off
+        return self._mm[start:start + str_len], post_off, df
+
+    def lookup(self, term: str):
+        """용어 → (포스팅 오프셋, df) 또는 None"""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, post_off, df = self._term_at(mid)
+            if found < key:
+                lo = mid + 1
+            elif found > key:
+                hi = mid
+            else:
+                return post_off, df
+        return None
+
+    def postings(self, post_off: int, df: int):
+        start = self._post_off + post_off
+        return memoryview(self._mm)[start:start + 8 * df].cast("I")
+
+    def meta(self, doc: int) -> dict:
+        start, end = self._meta_idx[doc], self._meta_idx[doc + 1]
+        return json.loads(self._mm[self._meta_off + start:self._meta_off + end])
+
+    def iter_terms(self):
+        for i in range(self.n_terms):
+            term, post_off, df = self._term_at(i)
+            with self.postings(post_off, df) as plist:  # mmap을 닫을 수 있도록 view는 바로 해제
+                yield term.decode("utf-8"), plist
+
+    def close(self):
+        self._meta_idx.release()
+        self._mm.close()
+        self._file.close()
+
+class SearchIndex:
+    """세그먼트 목록(manifest.json) + BM25 검색
+
+    - update(): 아카이브에서 마지막 색인 이후 기록된 리포트(rowid 기준)만 읽어 새 세그먼트 1개 추가
+      (같은 리포트가 다시 아카이브되면 새 세그먼트에 들어가고, 검색/병합 시 최신 세그먼트 것이 우선)
+    - 세그먼트가 SEARCH_MAX_SEGMENTS개를 넘으면 작은 세그먼트부터 묶어 병합 (과거 버전 문서 제거)
+    """
+
+    K1, B = 1.2, 0.75
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._segments = {}  # 파일명 → SearchSegment
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.directory, "manifest.json")
+
+    def _manifest(self) -> dict:
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"segments": [], "last_rowid": 0, "next_id": 0}
+
+    def _save_manifest(self, manifest: dict):
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path())
+
+    def _segment(self, name: str) -> SearchSegment:
+        if name not in self._segments:
+            self._segments[name] = SearchSegment(os.path.join(self.directory, name))
+        return self._segments[name]
+
+    def _new_segment(self, manifest: dict, docs: list) -> str:
+        name = f"seg_{manifest['next_id']:06d}.bin"
+        manifest["next_id"] += 1
+        SearchSegment.write(os.path.join(self.directory, name), docs)
+        return name
+
+    def update(self, store: "ReportArchive") -> int:
+        """아카이브의 새 리포트 색인 → 추가된 문서 수"""
+        if not self.enabled or not store.enabled or not os.path.exists(store.path):
+            return 0
+        import zlib
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            manifest = self._manifest()
+            docs, last = [], manifest["last_rowid"]
+            for row in store._rows(
+                    "SELECT r.rowid AS rowid, r.report_id, r.date, r.company, r.category, r.stock, r.title, "
+                    "r.summary, t.text FROM reports r LEFT JOIN texts t ON t.report_id = r.report_id "
+                    "WHERE r.rowid > ? ORDER BY r.rowid", (last,)):
+                body = zlib.decompress(row["text"]).decode("utf-8") if row["text"] else ""
+                counts = Counter(search_tokens(" ".join(filter(None, (row["title"], row["summary"], body)))))
+                meta = {k: row[k] for k in ("report_id", "date", "company", "category", "stock", "title")}
+                docs.append((meta, counts))
+                last = row["rowid"]
+            if not docs:
+                return 0
+            manifest["segments"].append({"name": self._new_segment(manifest, docs), "docs": len(docs)})
+            manifest["last_rowid"] = last
+            if len(manifest["segments"]) > SEARCH_MAX_SEGMENTS:
+                self._merge(manifest, len(manifest["segments"]) - SEARCH_MAX_SEGMENTS // 2)
+            self._save_manifest(manifest)
+            return len(docs)
+
+    def compact(self):
+        """전체 세그먼트를 1개로 병합"""
+        with self._lock:
+            manifest = self._manifest()
+            if len(manifest["segments"]) > 1:
+                self._merge(manifest, len(manifest["segments"]))
+                self._save_manifest(manifest)
+
+    def _merge(self, manifest: dict, count: int):
+        """가장 작은 세그먼트 count개 → 1개 (나중 세그먼트에 같은 리포트가 있으면 이전 것은 버림)"""
+        order = {seg["name"]: i for i, seg in enumerate(manifest["segments"])}
+        victims = sorted(manifest["segments"], key=lambda seg: seg["docs"])[:count]
+        victims.sort(key=lambda seg: order[seg["name"]])
+        newest = {}  # report_id → (세그먼트 순서, 문서 번호)
+        for seg in victims:
+            segment = self._segment(seg["name"])
+            for doc in range(segment.n_docs):
+                newest[segment.meta(doc)["report_id"]] = (seg["name"], doc)
+        keep = {key: i for i, key in enumerate(sorted(newest.values(), key=lambda k: (order[k[0]], k[1])))}
+        docs = [None] * len(keep)
+        for (name, doc), new_doc in keep.items():
+            docs[new_doc] = (self._segment(name).meta(doc), Counter())
+        for seg in victims:
+            for term, plist in self._segment(seg["name"]).iter_terms():
+                for i in range(0, len(plist), 2):
+                    new_doc = keep.get((seg["name"], plist[i]))
+                    if new_doc is not None:
+                        docs[new_doc][1][term] = plist[i + 1]
+        merged = {"name": self._new_segment(manifest, docs), "docs": len(docs)}
+        names = {seg["name"] for seg in victims}
+        first = min(order[name] for name in names)
+        segments = [seg for seg in manifest["segments"] if seg["name"] not in names]
+        segments.insert(first, merged)  # 병합본은 병합된 세그먼트 중 가장 오래된 자리 (이후 세그먼트가 우선)
+        manifest["segments"] = segments
+        for name in names:
+            self._segments.pop(name).close()
+            os.remove(os.path.join(self.directory, name))
+        log.info("[SEARCH] 세그먼트 %d개 병합 → %s (%d건)", len(names), merged["name"], len(docs))
+
+    def search(self, query: str, limit: int = 10, company: str = None, category: str = None,
+               since: str = None, until: str = None) -> list:
+        """BM25 상위 리포트 [{score, report_id, date, company, category, stock, title}]
+
+        세그먼트별 점수 배열에 용어 포스팅을 numpy로 누적 (포스팅은 mmap에서 복사 없이 읽음).
+        """
+        import math
+        import numpy as np
+        if not self.enabled:
+            return []
+        with self._lock:
+            segments = [self._segment(seg["name"]) for seg in self._manifest()["segments"]]
+            terms = list(dict.fromkeys(search_tokens(query)))
+            n_docs = sum(seg.n_docs for seg in segments)
+            if not terms or not n_docs:
+                return []
+            avgdl = sum(seg.total_len for seg in segments) / n_docs
+            hits = {term: [seg.lookup(term) for seg in segments] for term in terms}
+            scores = [None] * len(segments)
+            for term, found in hits.items():
+                df = sum(hit[1] for hit in found if hit)
+                if not df:
+                    continue
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for rank, (seg, hit) in enumerate(zip(segments, found)):
+                    if not hit:
+                        continue
+                    plist = np.frombuffer(seg._mm, dtype=np.uint32, count=2 * hit[1], offset=seg._post_off + hit[0])
+                    docs, tf = plist[0::2], plist[1::2].astype(np.float64)
+                    lens = np.frombuffer(seg._mm, dtype=np.uint32, count=seg.n_docs, offset=seg._lens_off)[docs]
+                    if scores[rank] is None:
+                        scores[rank] = np.zeros(seg.n_docs)
+                    scores[rank][docs] += idf * tf * (self.K1 + 1) / (tf + self.K1 * (1 - self.B + self.B * lens / avgdl))
+                    del plist, docs, lens  # mmap export 해제
+            # 후보: (점수, 세그먼트 순서, 문서 번호) - 필터가 없으면 세그먼트별 상위 일부만
+            filtered = company or category or since or until
+            candidates = []
+            for rank, seg_scores in enumerate(scores):
+                if seg_scores is None:
+                    continue
+                docs = np.flatnonzero(seg_scores)
+                if not filtered and len(docs) > limit * 4 + 10:
+                    docs = docs[np.argpartition(-seg_scores[docs], limit * 4 + 10)[:limit * 4 + 10]]
+                candidates.extend(zip(seg_scores[docs].tolist(), [rank] * len(docs), docs.tolist()))
+            # 재아카이브된 리포트는 점수와 무관하게 최신 사본(뒤 세그먼트/뒤 문서)만 남긴 뒤 점수순 정렬
+            newest = {}  # report_id → (세그먼트 순서, 문서 번호, 점수, 메타)
+            for score, rank, doc in candidates:
+                meta = segments[rank].meta(doc)
+                best = newest.get(meta["report_id"])
+                if best is None or (rank, doc) > best[:2]:
+                    newest[meta["report_id"]] = (rank, doc, score, meta)
+            results = []
+            for rank, doc, score, meta in sorted(newest.values(), key=lambda x: (-x[2], -x[0], -x[1])):
+                if (company and meta.get("company") != company) or (category and meta.get("category") != category) \
+                        or (since and (meta.get("date") or "") < since) or (until and (meta.get("date") or "") > until):
+                    continue
+                results.append({"score": round(score, 3), **meta})
+                if len(results) >= limit:
+                    break
+            return results
+
+    def stats(self) -> dict:
+        manifest = self._manifest()
+        size = sum(os.path.getsize(os.path.join(self.directory, seg["name"])) for seg in manifest["segments"])
+        return {"segments": len(manifest["segments"]), "docs": sum(seg["docs"] for seg in manifest["segments"]),
+                "bytes": size, "last_rowid": manifest["last_rowid"]}
+
+    def close(self):
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments.clear()
+
+search_index = SearchIndex(SEARCH_INDEX_DIR)
+
+def search_cli(args) -> list:
+    """search 하위 명령: (--update 시 아카이브 새 리포트 색인 후) BM25 검색 결과 출력 + 소요 ms"""
+    index = SearchIndex(args.index)
+    if args.update or args.compact:
+        added = index.update(ReportArchive(args.db))
+        if args.compact:
+            index.compact()
+        print(f"[SEARCH] 색인 추가 {added}건 / {index.stats()}")
+    if not args.query:
+        index.close()
+        return []
+    since = (datetime.now() - timedelta(days=args.days)).strftime("%Y-%m-%d") if args.days else None
+    start = time.perf_counter()
+    rows = index.search(args.query, limit=args.limit, company=args.company, category=args.category, since=since)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    index.close()
+    for i, row in enumerate(rows, 1):
+        print(f"{i:>3}. {row['score']:>7.2f} | {row['date']} | {row['company']} | {row['category']} | {row['title'][:50]}")
+    by_company = Counter(row["company"] for row in rows)
+    if by_company:
+        print("[SEARCH] 증권사별: " + ", ".join(f"{k} {v}건" for k, v in by_company.most_common()))
+    print(f"[SEARCH] '{args.query}' {len(rows)}건 / {elapsed_ms:.1f}ms ({args.index})")
+    return rows
+
+# ----------------------------------------------------------
+# 📅 백필 (v12.6: 기간 지정 → 리포트당 1회 추출/요약 → 날짜별 브리핑/Notion)
+# ----------------------------------------------------------
+def _backfill_day(day: datetime, analysis: dict, summaries: list, upload: bool) -> dict:
+    """하루치 브리핑 → Notion 업로드 (v12.8: 분석은 수집 중 ReportAnalyzer로 누적된 결과 사용)"""
+    briefing = FinalBriefingTool()._run(str(summaries), str(analysis), run_date=day)
+    result = NotionUploadTool()._run(briefing, str(analysis), run_date=day) if upload else "[SKIP] 업로드 생략"
+    return {"date": day.strftime("%Y-%m-%d"), "reports": analysis["total_reports"], "summaries": len(summaries),
+            "briefing_chars": len(briefing), "notion": result}
+
+def run_backfill(start: datetime, end: datetime, upload: bool = True, weekdays_only: bool = True,
+                 queue_path: str = "", local_workers: int = 0) -> list:
+    """start~end 기간 백필
+    
+    1) 기간 전체 날짜로 목록을 페이지 넘기며 수집 (네이버 카테고리별 / 한경 sdate~edate 검색)
+    2) (제목, 증권사) 기준 중복 제거 후 리포트당 1회 추출/요약 (PDF/요약 캐시 공유 → 재실행 시 재사용)
+       v12.7: queue_path 지정 시 작업 큐에 넣고 worker 프로세스들이 처리 (이 프로세스는 코디네이터)
+    3) 실제 리포트 날짜로 분할해 날짜별 브리핑/Notion 페이지를 병렬 생성
+    v12.8: 1)~2)는 generator로 연결 (수집 → 중복 제거 → 날짜별 분석 누적 → 요약), 리포트 목록/본문은 보관하지 않고
+           날짜별 요약만 남김 → 기간이 길어도 메모리는 요약 크기만큼만 증가
+    """
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+    
+    setup_logging()
+    days = days_in_range(start, end, weekdays_only)
+    day_keys = {d.strftime("%Y-%m-%d"): d for d in days}
+    dates = [f for d in days for f in (d.strftime("%Y.%m.%d"), d.strftime("%y.%m.%d"))]
+    set_run_date(end, dates)
+    label = f"{start.strftime('%Y-%m-%d')}_{end.strftime('%Y-%m-%d')}"
+    print(f"[START] 백필 {label} ({len(days)}일, v12.6 - 기간 백필)")
+    
+    metrics.reset(run_date=label)
+    deadline.reset(0, workers=LLM_CONCURRENCY)  # 백필은 마감 시간 없음
+    pools.reset_stats()
+    presummarizer.reset_stats()
+    rules.reset_stats()
+    load_caches()
+    started = time.perf_counter()
+    
+    collected = Counter()
+    analyzers = {}  # 날짜(YYYY-MM-DD) → ReportAnalyzer
+    
+    def in_range():
+        for tool in source_tools():
+            for report in tool.iter_reports(dates=dates, max_pages=BACKFILL_MAX_PAGES):
+                collected["all"] += 1
+                if normalize_date(report.get("date", "")) in day_keys:
+                    yield report
+    
+    def analyzed(reports):
+        for idx, report in enumerate(reports):
+            analyzers.setdefault(normalize_date(report["date"]), ReportAnalyzer()).add(report)
+            yield idx, report
+    
+    unique = analyzed(iter_unique(in_range()))
+    if queue_path:
+        print(f"\n[1-2/3] 리포트 수집 → 요약 중 (작업 큐 {queue_path}, 로컬 worker {local_workers}개)...")
+        results = summarize_via_queue((report for _, report in unique), queue_path, local_workers)
+    else:
+        print("\n[1-2/3] 리포트 수집 → 요약 중 (페이지 넘김, 리포트당 1회, 캐시 공유)...")
+        results = ReportSummarizerTool().iter_summaries(unique)
+    by_day = {}  # 날짜 → [(인덱스, 요약)]
+    for idx, report, summary in results:
+        if summary is not None:
+            by_day.setdefault(normalize_date(report["date"]), []).append((idx, summary))
+    n_reports = sum(len(a.seen) for a in analyzers.values())
+    n_summaries = sum(len(v) for v in by_day.values())
+    summarize_sec = time.perf_counter() - started
+    print(f"[OK] 수집 {collected['all']}건 → 중복 제거 {n_reports}건 → 요약 {n_summaries}건")
+    if not n_reports:
+        print("[INFO] 리포트 없음")
+        return []
+    
+    # v13.2: 기간 내 앞선 날짜의 키워드가 뒤 날짜 추세 기준에 들어가도록 색인 먼저 갱신 (발견한 리포트 전체 기준)
+    for analyzer in analyzers.values():
+        archive.index_keywords(analyzer.days)
+    archive.flush()
+    print(f"\n[3/3] 날짜별 브리핑 생성 중 ({BACKFILL_DAY_WORKERS}일 동시)...")
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, BACKFILL_DAY_WORKERS)) as executor:
+        futures = [executor.submit(_backfill_day, day_keys[key], analyzer.result(key),
+                                   [s for _, s in sorted(by_day.get(key, []), key=lambda x: x[0])], upload)
+                   for key, analyzer in sorted(analyzers.items())]
+        for future in futures:
+            rows.append(future.result())
+    
+    elapsed = time.perf_counter() - started
+    throughput = {"days": len(rows), "reports": n_reports, "summaries": n_summaries,
+                  "elapsed_sec": round(elapsed, 1), "summarize_sec": round(summarize_sec, 1),
+                  "reports_per_min": round(n_reports / (elapsed / 60), 2) if elapsed else 0.0}
+    metrics.extra["backfill"] = {**throughput, "per_day": rows}
+    print(f"\n{'날짜':<12}{'리포트':>8}{'요약':>6}  Notion")
+    for row in rows:
+        print(f"{row['date']:<12}{row['reports']:>8}{row['summaries']:>6}  {row['notion'][:60]}")
+    print(f"[BACKFILL] {throughput['days']}일 / {throughput['reports']}건 / {throughput['elapsed_sec']}초 "
+          f"→ {throughput['reports_per_min']} reports/min")
+    finish_run()
+    return rows
+
+# ----------------------------------------------------------
+# 🗂️ 분산 작업 큐 (v12.7: 코디네이터가 리포트 작업 등록 → worker가 임대해 추출/요약 → 코디네이터가 결과 수집)
+# ----------------------------------------------------------
+class JobQueue:
+    """SQLite 기반 내구성 작업 큐
+    
+    - 작업 ID는 report_id(nid/URL + 날짜 포함) → 같은 큐 파일로 재실행하면 완료된 작업은 다시 처리하지 않고,
+      시도 횟수를 모두 써서 failed가 된 작업은 다시 등록하면 처음부터 재시도
+    - lease: 대기 중이거나 임대가 만료된 작업을 BEGIN IMMEDIATE 트랜잭션으로 원자적으로 임대
+    - worker가 죽으면 visibility 타임아웃 후 다른 worker가 다시 가져감 (시도 횟수 증가)
+    - 실패 시 지수 백오프 후 재시도, max_attempts를 모두 쓰면 failed
+    여러 머신에서 쓸 때는 모든 worker가 같은 파일을 볼 수 있는 공유 디렉터리에 둔다.
+    """
+    
+    def __init__(self, path: str, max_attempts: int = 0):
+        import sqlite3
+        self.path = path
+        self.max_attempts = max_attempts or QUEUE_MAX_ATTEMPTS
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY, kind TEXT NOT NULL, payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued', attempts INTEGER NOT NULL DEFAULT 0,
+            lease_until REAL NOT NULL DEFAULT 0, worker TEXT, result TEXT, error TEXT,
+            created REAL NOT NULL, updated REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, lease_until)")
+    
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+    
+    def enqueue(self, jobs: list, kind: str = "summarize") -> int:
+        """[(job_id, payload dict)] 등록 (대기/완료 중인 ID는 무시, failed는 재대기) → 새로 등록/재대기된 수"""
+        now = time.time()
+        with self._transaction() as db:
+            before = db.total_changes
+            db.executemany("INSERT INTO jobs (id, kind, payload, created, updated) VALUES (?, ?, ?, ?, ?) "
+                           "ON CONFLICT (id) DO UPDATE SET payload = excluded.payload, status = 'queued', "
+                           "attempts = 0, lease_until = 0, worker = NULL, result = NULL, error = NULL, "
+                           "updated = excluded.updated WHERE jobs.status = 'failed'",
+                           [(job_id, kind, json.dumps(payload, ensure_ascii=False), now, now)
+                            for job_id, payload in jobs])
+            return db.total_changes - before
+    
+    def lease(self, worker: str, limit: int, visibility: float = 0.0) -> list:
+        """최대 limit개 임대 → [{"id", "payload", "attempts"}]"""
+        now = time.time()
+        until = now + (visibility or QUEUE_VISIBILITY_SEC)
+        leased = []
+        with self._transaction() as db:
+            rows = db.execute("SELECT id, payload, attempts FROM jobs WHERE status IN ('queued', 'leased') "
+                              "AND lease_until <= ? ORDER BY created, id LIMIT ?", (now, limit)).fetchall()
+            for job_id, payload, attempts in rows:
+                if attempts >= self.max_attempts:
+                    # 임대 만료로 돌아온 작업이 시도 횟수를 모두 쓴 경우 (worker 비정상 종료 반복)
+                    db.execute("UPDATE jobs SET status = 'failed', error = COALESCE(error, 'lease expired'), "
+                               "updated = ? WHERE id = ?", (now, job_id))
+                    continue
+                db.execute("UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_until = ?, "
+                           "worker = ?, updated = ? WHERE id = ?", (until, worker, now, job_id))
+                leased.append({"id": job_id, "payload": json.loads(payload), "attempts": attempts + 1})
+        return leased
+    
+    def extend(self, job_ids: list, worker: str, visibility: float = 0.0):
+        """처리 중인 작업의 임대 연장 (heartbeat)"""
+        if not job_ids:
+            return
+        until = time.time() + (visibility or QUEUE_VISIBILITY_SEC)
+        with self._transaction() as db:
+            db.executemany("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                           [(until, job_id, worker) for job_id in job_ids])
+    
+    def complete(self, job_id: str, result) -> bool:
+        """결과 저장 (임대 만료 후 다른 worker가 먼저 끝냈으면 무시)"""
+        with self._transaction() as db:
+            cur = db.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, updated = ? "
+                             "WHERE id = ? AND status != 'done'",
+                             (json.dumps(result, ensure_ascii=False), time.time(), job_id))
+            return cur.rowcount > 0
+    
+    def fail(self, job_id: str, worker: str, error: str, result=None) -> str:
+        """실패 기록 → 시도 횟수가 남았으면 백오프 후 재대기('queued'), 아니면 'failed'
+        
+        임대 만료 후 다른 worker가 가져간 작업이면 무시하고 현재 상태를 돌려준다 (extend와 같은 소유자 확인).
+        """
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute("SELECT attempts, status, worker FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not row or row[1] != "leased" or row[2] != worker:
+                return row[1] if row else ""
+            status = "failed" if row[0] >= self.max_attempts else "queued"
+            db.execute("UPDATE jobs SET status = ?, lease_until = ?, error = ?, result = ?, updated = ? "
+                       "WHERE id = ? AND worker = ?",
+                       (status, now + min(60, 2 ** row[0]), error[:500],
+                        json.dumps(result, ensure_ascii=False) if result is not None else None, now, job_id, worker))
+            return status
+    
+    def counts(self) -> dict:
+        with self._lock:
+            return dict(self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+    
+    def results(self, job_ids: list) -> dict:
+        """job_id → {"status", "result", "error", "attempts", "worker"}"""
+        wanted = set(job_ids)
+        with self._lock:
+            rows = self._db.execute("SELECT id, status, result, error, attempts, worker FROM jobs").fetchall()
+        return {job_id: {"status": status, "result": json.loads(result) if result else None, "error": error,
+                         "attempts": attempts, "worker": worker}
+                for job_id, status, result, error, attempts, worker in rows if job_id in wanted}
+    
+    def close(self):
+        self._db.close()
+
+def _job_error(summary) -> str:
+    """worker 처리 결과 → 재시도할 실패 사유 (정상이면 빈 문자열)"""
+    if isinstance(summary, dict) and summary.get("summary", "").startswith("[요약 실패"):
+        return summary["summary"]
+    return ""
+
+def run_worker(queue_path: str, jobs: int = 8, idle_timeout: float = 30.0) -> dict:
+    """작업 큐 worker: 리포트 작업을 임대해 기존 작업 그래프(fetch → browser → llm 풀)로 처리
+    
+    최대 jobs개를 동시에 임대하고, 처리 중인 작업은 poll마다 임대를 연장한다.
+    대기/임대 중인 작업이 idle_timeout초 동안 없으면 종료. 캐시 파일은 읽기만 하고 아카이브/원장도 쓰지 않는다
+    (작업 결과에 source_type/본문을 실어 보내면 코디네이터가 요약 캐시·아카이브·원장에 기록).
+    """
+    import socket
+    setup_logging()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    metrics.reset(run_date=f"worker_{socket.gethostname()}_{os.getpid()}")
+    deadline.reset(0, workers=jobs)  # 마감 시간은 코디네이터 몫
+    pools.reset_stats()
+    presummarizer.reset_stats()
+    load_caches()
+    job_queue = JobQueue(queue_path)
+    tool = ReportSummarizerTool(record=False)
+    active = {}  # future → job
+    stats = Counter()
+    idle_since = time.monotonic()
+    log.info("[WORKER] %s 시작 (큐: %s, 동시 작업 %d)", worker_id, queue_path, jobs)
+    try:
+        while True:
+            if len(active) < jobs:
+                leased = job_queue.lease(worker_id, jobs - len(active))
+                total = sum(job_queue.counts().values()) if leased else 0
+                for job in leased:
+                    active[tool._submit_report(job["payload"], stats["leased"], total)] = job
+                    stats["leased"] += 1
+            if not active:
+                counts = job_queue.counts()
+                if counts.get("queued", 0) + counts.get("leased", 0) == 0 \
+                        and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(QUEUE_POLL_SEC)
+                continue
+            done, _ = wait(active, timeout=QUEUE_POLL_SEC, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = active.pop(future)
+                summary = future.result()
+                error = _job_error(summary)
+                if error:
+                    status = job_queue.fail(job["id"], worker_id, error, summary)
+                    stats["retried" if status == "queued" else "failed"] += 1
+                    log.warning("[WORKER] 작업 실패 (%d회째 → %s): %.60s", job["attempts"], status, error)
+                else:
+                    job_queue.complete(job["id"], summary)
+                    stats["done"] += 1
+            job_queue.extend([job["id"] for job in active.values()], worker_id)
+            idle_since = time.monotonic()
+    finally:
+        job_queue.close()
+        metrics.extra["worker"] = {"id": worker_id, **stats}
+        metrics.extra["pools"] = pools.stats()
+        metrics.extra["aimd"] = pools.adaptive_stats()
+        metrics.extra["presummarize"] = presummarizer.stats()
+        pools.shutdown()
+        metrics.write()
+    log.info("[WORKER] %s 종료: 완료 %d / 재시도 %d / 실패 %d", worker_id,
+             stats["done"], stats["retried"], stats["failed"])
+    return dict(stats)
+
+def _spawn_workers(queue_path: str, count: int) -> list:
+    """이 머신에서 worker 프로세스 실행 (큐가 비면 바로 종료)"""
+    import subprocess
+    cmd = [sys.executable, os.path.abspath(__file__), "worker", "--queue", os.path.abspath(queue_path),
+           "--idle-timeout", "0"]
+    return [subprocess.Popen(cmd) for _ in range(count)]
+
+def summarize_via_queue(reports, queue_path: str, local_workers: int = 0):
+    """코디네이터: 요약 캐시에 없는 리포트를 큐에 등록 → 완료 대기 → 입력 순서대로 (인덱스, 리포트, 요약) yield
+    
+    local_workers가 0이면 다른 터미널/머신에서 `worker --queue`로 띄운 worker를 기다린다.
+    v12.8: reports는 generator여도 됨 - ENQUEUE_BATCH건씩 등록하고 식별 정보(제목/증권사/카테고리/날짜/URL 등)만 보관
+    worker는 아카이브/원장을 쓰지 않으므로 결과를 받을 때 코디네이터가 요약 캐시와 함께 기록한다.
+    """
+    job_queue = JobQueue(queue_path)
+    entries, batch, added = [], [], 0  # entries: (job_id, 식별 정보)
+    for report in reports:
+        job_id = report_id(report)
+        entries.append((job_id, {k: report.get(k) for k in ("source", "title", "company", "category", "date",
+                                                            "url", "pdf_url", "ticker", "stock")}))
+        if job_id not in _summary_cache:
+            batch.append((job_id, report))
+            if len(batch) >= ENQUEUE_BATCH:
+                added += job_queue.enqueue(batch)
+                batch = []
+    added += job_queue.enqueue(batch)
+    ids = [job_id for job_id, _ in entries]
+    pending = [job_id for job_id in ids if job_id not in _summary_cache]
+    print(f"[QUEUE] 작업 {len(pending)}건 (신규 {added}, 요약 캐시 적중 {len(ids) - len(pending)})")
+    procs = _spawn_workers(queue_path, local_workers) if pending and local_workers > 0 else []
+    
+    try:
+        last = None
+        while pending:
+            status = job_queue.results(pending)
+            open_jobs = sum(1 for st in status.values() if st["status"] in ("queued", "leased"))
+            if open_jobs != last:
+                print(f"[QUEUE] 진행 {len(pending) - open_jobs}/{len(pending)} (전체 큐: {job_queue.counts()})")
+                last = open_jobs
+            if open_jobs == 0:
+                break
+            if procs and all(p.poll() is not None for p in procs):
+                log.warning("로컬 worker가 모두 종료됨 - 미완료 작업 %d건은 실패로 처리", open_jobs)
+                break
+            time.sleep(QUEUE_POLL_SEC)
+    finally:
+        for p in procs:
+            p.wait()
+    
+    results = job_queue.results(pending)
+    job_queue.close()
+    failed = sum(1 for job_id in pending if results.get(job_id, {}).get("status") != "done")
+    metrics.extra["queue"] = {"path": queue_path, "jobs": len(pending), "added": added, "failed": failed,
+                              "workers": dict(Counter(st["worker"] for st in results.values() if st["worker"]))}
+    print(f"[QUEUE] 완료: 작업 {len(pending)}건 (실패 {failed}건)")
+    for idx, (job_id, report) in enumerate(entries):
+        cached = cached_summary(job_id)
+        if cached is not None:
+            ledger.mark(report, "summarized", summary=cached)  # v14.1
+            yield idx, report, cached
+            continue
+        st = results.get(job_id, {})
+        summary = st.get("result")
+        source_type, text = "", ""
+        if isinstance(summary, dict):
+            summary = dict(summary)
+            source_type, text = summary.pop("source_type", ""), summary.pop("text", "")
+        if st.get("status") == "done":
+            # worker는 캐시 파일/아카이브/원장을 쓰지 않으므로 코디네이터가 저장
+            if summary and not _job_error(summary):
+                if source_type != "없음":
+                    cache_summary(job_id, summary)
+                archive.record(report, summary, text, source_type)  # v13.1
+        else:
+            summary = summary or {"title": report["title"], "company": report["company"],
+                                  "category": report["category"],
+                                  "summary": f"[요약 실패: {st.get('error') or '작업 미완료'}]"}
+        ledger.record(report, summary, source_type)  # v14.1
+        yield idx, report, summary
+
+def _parse_day(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d")
+
+def main(argv=None):
+    """CLI: 인자 없으면 오늘 브리핑 (--incremental: 증분, v14.1), backfill 하위 명령은 기간 백필 (v12.6), archive/search는 아카이브 조회/전문 검색 (v13.1/v13.3)"""
+    import argparse
+    parser = argparse.ArgumentParser(description="증권사 리포트 Daily Briefing")
+    parser.add_argument("--incremental", action="store_true",
+                        help="처리 원장 기준 새/실패 리포트만 처리하고 오늘 기존 요약과 병합 (v14.1)")
+    sub = parser.add_subparsers(dest="command")
+    bf = sub.add_parser("backfill", help="기간 백필 (날짜별 브리핑/Notion 페이지 생성)")
+    bf.add_argument("--from", dest="start", type=_parse_day, required=True, help="시작일 YYYY-MM-DD")
+    bf.add_argument("--to", dest="end", type=_parse_day, default=None, help="종료일 YYYY-MM-DD (기본: 시작일)")
+    bf.add_argument("--no-upload", action="store_true", help="Notion 업로드 생략")
+    bf.add_argument("--include-weekends", action="store_true", help="주말 포함")
+    bf.add_argument("--queue", default="", help="SQLite 작업 큐 경로 (지정 시 worker 프로세스로 분산 요약)")
+    bf.add_argument("--local-workers", type=int, default=0, help="이 머신에서 띄울 worker 프로세스 수")
+    wk = sub.add_parser("worker", help="작업 큐 worker (리포트 추출/요약)")
+    wk.add_argument("--queue", required=True, help="SQLite 작업 큐 경로 (공유 디렉터리)")
+    wk.add_argument("--jobs", type=int, default=8, help="동시에 임대할 작업 수")
+    wk.add_argument("--idle-timeout", type=float, default=30.0, help="큐가 빈 상태로 이 시간(초)이 지나면 종료")
+    ar = sub.add_parser("archive", help="리포트 아카이브 조회 (v13.1)")
+    ar.add_argument("action", choices=["query", "tp", "keywords", "stats"],
+                    help="query: 리포트 목록 / tp: 종목 목표주가 이력 / keywords: 기간 키워드 / stats: 요약 통계")
+    ar.add_argument("--db", default=ARCHIVE_PATH or "briefing_archive.db", help="아카이브 경로")
+    ar.add_argument("--company", default=None, help="증권사")
+    ar.add_argument("--stock", default=None, help="종목코드 또는 종목명 (tp는 필수)")
+    ar.add_argument("--category", default=None, help="카테고리")
+    ar.add_argument("--days", type=int, default=0, help="최근 N일 (0: 전체)")
+    ar.add_argument("--limit", type=int, default=50, help="최대 행 수")
+    en = sub.add_parser("entities", help="종목 사전 (v13.5, Aho-Corasick)")
+    en.add_argument("action", choices=["refresh", "match", "stats"],
+                    help="refresh: KRX 상장법인 목록으로 사전 갱신 / match: 텍스트 태깅 / stats: 사전 통계")
+    en.add_argument("text", nargs="?", default="", help="match할 텍스트")
+    se = sub.add_parser("search", help="리포트 본문/요약 전문 검색 (v13.3, BM25)")
+    se.add_argument("query", nargs="?", default="", help="검색어 (예: \"HBM 원전\")")
+    se.add_argument("--index", default=SEARCH_INDEX_DIR or "search_index", help="색인 디렉터리")
+    se.add_argument("--db", default=ARCHIVE_PATH or "briefing_archive.db", help="아카이브 경로 (--update용)")
+    se.add_argument("--update", action="store_true", help="검색 전에 아카이브의 새 리포트 색인")
+    se.add_argument("--compact", action="store_true", help="색인 후 세그먼트를 1개로 병합")
+    se.add_argument("--company", default=None, help="증권사")
+    se.add_argument("--category", default=None, help="카테고리")
+    se.add_argument("--days", type=int, default=0, help="최근 N일 (0: 전체)")
+    se.add_argument("--limit", type=int, default=10, help="결과 수")
+    sl = sub.add_parser("selectors", help="본문 선택자 적중 통계 (v13.7)")
+    sl.add_argument("--file", default=SELECTOR_STATS_FILE or "selector_stats.json", help="통계 파일")
+    sl.add_argument("--domain", default=None, help="도메인 (예: finance.naver.com)")
+    sl.add_argument("--limit", type=int, default=50, help="출력 행 수")
+    lg = sub.add_parser("ledger", help="리포트 처리 원장 상태 (v14.1)")
+    lg.add_argument("--db", default=LEDGER_PATH or "report_ledger.db", help="원장 경로")
+    lg.add_argument("--date", type=_parse_day, default=None, help="리포트 날짜 YYYY-MM-DD (기본: 전체)")
+    lg.add_argument("--state", default=None, choices=list(ReportLedger.RANK), help="상태 필터")
+    lg.add_argument("--limit", type=int, default=50, help="출력 행 수")
+    args = parser.parse_args(argv)
+    
+    if args.command == "backfill":
+        run_backfill(args.start, args.end or args.start, upload=not args.no_upload,
+                     weekdays_only=not args.include_weekends,
+                     queue_path=args.queue, local_workers=args.local_workers)
+        return
+    if args.command == "worker":
+        run_worker(args.queue, jobs=args.jobs, idle_timeout=args.idle_timeout)
+        return
+    if args.command == "archive":
+        if args.action == "tp" and not args.stock:
+            parser.error("archive tp에는 --stock이 필요합니다")
+        archive_cli(args)
+        return
+    if args.command == "search":
+        search_cli(args)
+        return
+    if args.command == "entities":
+        entities_cli(args)
+        return
+    if args.command == "selectors":
+        selectors_cli(args)
+        return
+    if args.command == "ledger":
+        ledger_cli(args)
+        return
+    
+    now = datetime.now()
+    weekday = now.weekday()
     
     # 평일(0-4)에만 실행, 주말(5-6)은 스킵
     if weekday >= 5:
-        print(f"[SKIP] 주말 스킵 - {today_display} ({'토요일' if weekday == 5 else '일요일'})")
+        print(f"[SKIP] 주말 스킵 - {now.strftime('%Y.%m.%d')} ({'토요일' if weekday == 5 else '일요일'})")
     else:
-        result = run_daily_briefing()
+        result = run_daily_briefing(run_date=now, incremental=args.incremental or None)
         
         print("\n" + "=" * 60)
         print("최종 브리핑 미리보기:")
         print("=" * 60)
         print(result[:800] + "..." if len(result) > 800 else result)
+
+if __name__ == "__main__":
+    main()